@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Account Name Index
+Local trigram index of ultimate_parent_company_name values, so finding an
+account does not need an ILIKE scan over rds.rep_job_metrics.
+
+Names are matched after normalisation: case, umlaut spellings (Müller =
+Mueller), accents, punctuation and legal-form suffixes (GmbH, AG, SE, ...) are
+ignored. Candidates are ranked as exact match, then names containing the
+query, then fuzzy matches by trigram overlap and edit similarity, which
+catches typos (and Muller for Müller). Queries shorter than a trigram ("DB")
+only match exactly or as a name prefix.
+
+The index remembers the latest date_dt it has seen. A refresh only reads
+rows from that date on, so after the first build it is cheap enough to run
+before every report.
+
+Usage:
+    python account_index.py refresh <source_url> [--since 2020-01-01]
+    python account_index.py lookup <name> [--limit 10] [--active-since 2025-01-01]
+
+Options:
+    --index: Index file (default: ~/.cache/customer-report/account_index.sqlite)
+
+Example:
+    python account_index.py refresh redshift://user:pw@host:5439/snowplow
+    python account_index.py lookup "rewe markt gmbh"
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import unicodedata
+from difflib import SequenceMatcher
+
+from report_queries import ACCOUNT_NAMES, connect, run_query
+
+DEFAULT_INDEX_PATH = os.path.expanduser("~/.cache/customer-report/account_index.sqlite")
+
+# Start of the first refresh when no --since is given
+DEFAULT_SINCE = "2015-01-01"
+
+# Legal forms dropped from names before matching, longest first
+LEGAL_FORMS = (
+    "gmbh co kgaa", "gmbh co kg", "ag co kg", "se co kg", "gmbh co ohg", "kgaa", "gmbh", "mbh", "ggmbh",
+    "ag", "se", "kg", "ohg", "ug", "ev", "gbr", "co", "ltd", "limited", "inc", "llc", "plc", "sa", "sarl",
+    "sas", "bv", "nv", "spa", "srl", "ab", "as", "oy", "holding",
+)
+_LEGAL_FORM_SUFFIX = re.compile(r"(?:\s(?:" + "|".join(re.escape(f) for f in LEGAL_FORMS) + r"))+$")
+
+# Umlauts are spelled out, so Müller and Mueller match alike; a bare "ue" in Bauer or Blue stays as it is
+_TRANSLITERATIONS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss", "æ": "ae", "ø": "o", "œ": "oe"})
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS names (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    normalized TEXT NOT NULL,
+    trigram_count INTEGER NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS trigrams (
+    trigram TEXT NOT NULL,
+    name_id INTEGER NOT NULL,
+    PRIMARY KEY (trigram, name_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS trigram_counts (
+    trigram TEXT PRIMARY KEY,
+    names INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Fuzzy candidates re-ranked by edit similarity per lookup
+FUZZY_CANDIDATES = 50
+
+# Rarest query trigrams used to collect fuzzy candidates
+SELECTIVE_TRIGRAMS = 4
+
+# Queries shorter than this are matched exactly or as a name prefix only; their trigrams are mostly padding
+SHORT_QUERY_LENGTH = 3
+
+
+def normalize(name):
+    """Return the matching form of a company name: lower case ASCII words without legal form."""
+    # Composed first, so a decomposed "u" + diaeresis is spelled out like "ü"
+    text = unicodedata.normalize("NFC", name).casefold().translate(_TRANSLITERATIONS)
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = text.replace("&", " ")
+    text = " ".join(re.sub(r"[^a-z0-9]+", " ", text.replace(".", "")).split())
+    stripped = _LEGAL_FORM_SUFFIX.sub("", text).strip()
+    # A name that is nothing but a legal form ("AG") keeps it
+    return stripped or text
+
+
+def trigrams(normalized):
+    """Return the set of word trigrams, padded like pg_trgm ("  r", " re", "rew", "ewe", "we ")."""
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def score(query, normalized, shared, query_count, name_count):
+    """Rank a candidate: 1.0 exact, 0.8-1.0 contains the query, up to 0.8 fuzzy."""
+    if normalized == query:
+        return 1.0
+    if query and query in normalized:
+        return 0.8 + 0.2 * len(query) / len(normalized)
+    jaccard = shared / (query_count + name_count - shared) if shared else 0.0
+    return 0.8 * max(jaccard, SequenceMatcher(None, query, normalized).ratio())
+
+
+class AccountIndex:
+    """Trigram index of account names in a local SQLite file."""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    @property
+    def watermark(self):
+        """Latest date_dt seen by a refresh, or None before the first one."""
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'watermark'").fetchone()
+        return row[0] if row else None
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM names").fetchone()[0]
+
+    def add(self, names):
+        """Add or update names from (name, last_seen) pairs. Returns the number of new names."""
+        added = 0
+        with self.db:
+            for name, last_seen in names:
+                if not name:
+                    continue
+                last_seen = str(last_seen)[:10]
+                row = self.db.execute("SELECT id, last_seen FROM names WHERE name = ?", (name,)).fetchone()
+                if row is not None:
+                    if last_seen > row[1]:
+                        self.db.execute("UPDATE names SET last_seen = ? WHERE id = ?", (last_seen, row[0]))
+                    continue
+                normalized = normalize(name)
+                grams = trigrams(normalized)
+                name_id = self.db.execute(
+                    "INSERT INTO names (name, normalized, trigram_count, last_seen) VALUES (?, ?, ?, ?)",
+                    (name, normalized, len(grams), last_seen)).lastrowid
+                self.db.executemany("INSERT INTO trigrams VALUES (?, ?)", [(gram, name_id) for gram in grams])
+                self.db.executemany(
+                    "INSERT INTO trigram_counts VALUES (?, 1) ON CONFLICT (trigram) DO UPDATE SET names = names + 1",
+                    [(gram,) for gram in grams])
+                added += 1
+            latest = self.db.execute("SELECT MAX(last_seen) FROM names").fetchone()[0]
+            if latest:
+                self.db.execute("INSERT OR REPLACE INTO meta VALUES ('watermark', ?)", (latest,))
+        return added
+
+    def refresh(self, conn, dialect, since=None):
+        """Read names seen since the watermark (or `since`) from the warehouse. Returns the number of new names."""
+        # Rows of the watermark day may still have been loading during the last refresh
+        start = since or self.watermark or DEFAULT_SINCE
+        return self.add(run_query(conn, ACCOUNT_NAMES, dialect, (start,), ()))
+
+    def lookup(self, query, limit=10, active_since=None, min_score=0.3):
+        """Return up to `limit` [(name, score, last_seen)] ranked best first."""
+        normalized = normalize(query)
+        grams = trigrams(normalized)
+        if not grams:
+            return []
+        active = "AND n.last_seen >= ?" if active_since else ""
+        active_params = (active_since,) if active_since else ()
+
+        if len(normalized) < SHORT_QUERY_LENGTH:
+            # Exact name or name prefix ("DB" finds "DB AG" and "DB Cargo", not "Sandbox")
+            rows = self.db.execute(
+                f"SELECT n.name, n.normalized, n.last_seen FROM names n "
+                f"WHERE substr(n.normalized, 1, ?) = ? {active}",
+                (len(normalized), normalized) + active_params)
+            ranked = [(name, round(score(normalized, candidate, 0, 0, 0), 3), last_seen)
+                      for name, candidate, last_seen in rows]
+            ranked.sort(key=lambda item: (-item[1], item[0]))
+            return ranked[:limit]
+
+        candidates = {}
+        # Names containing the query
+        for row in self.db.execute(
+                f"SELECT n.name, n.normalized, n.trigram_count, n.last_seen FROM names n "
+                f"WHERE instr(n.normalized, ?) > 0 {active}", (normalized,) + active_params):
+            candidates[row[0]] = row + (len(grams),)
+        # Fuzzy matches: names sharing the rarest query trigrams, ranked by overlap with all of them
+        grams = tuple(grams)
+        placeholders = ", ".join("?" * len(grams))
+        counts = dict(self.db.execute(
+            f"SELECT trigram, names FROM trigram_counts WHERE trigram IN ({placeholders})", grams))
+        selective = sorted(counts, key=counts.get)[:SELECTIVE_TRIGRAMS]
+        if selective:
+            ids = [row[0] for row in self.db.execute(
+                f"SELECT name_id FROM trigrams WHERE trigram IN ({', '.join('?' * len(selective))}) "
+                f"GROUP BY name_id ORDER BY COUNT(*) DESC LIMIT {FUZZY_CANDIDATES * 4}", selective)]
+            for row in self.db.execute(
+                    f"SELECT n.name, n.normalized, n.trigram_count, n.last_seen, COUNT(*) AS shared "
+                    f"FROM trigrams t JOIN names n ON n.id = t.name_id "
+                    f"WHERE t.trigram IN ({placeholders}) AND t.name_id IN ({', '.join('?' * len(ids))}) {active} "
+                    f"GROUP BY n.id ORDER BY shared DESC LIMIT {FUZZY_CANDIDATES}",
+                    grams + tuple(ids) + active_params):
+                candidates.setdefault(row[0], row)
+
+        ranked = []
+        for name, candidate, name_count, last_seen, shared in candidates.values():
+            value = score(normalized, candidate, shared, len(grams), name_count)
+            if value >= min_score:
+                ranked.append((name, round(value, 3), last_seen))
+        ranked.sort(key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+
+def format_candidates(candidates):
+    return "\n".join(f"{score:>5.2f}  {name}  (last seen {last_seen})" for name, score, last_seen in candidates)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local index of account names.")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    refresh = commands.add_parser("refresh", help="Add names seen since the last refresh")
+    refresh.add_argument("source_url")
+    refresh.add_argument("--since", help="Read names from this date on (YYYY-MM-DD) instead of the watermark")
+
+    lookup = commands.add_parser("lookup", help="Find accounts by (part of) their name")
+    lookup.add_argument("name")
+    lookup.add_argument("--limit", type=int, default=10)
+    lookup.add_argument("--active-since", help="Only names with rows from this date on (YYYY-MM-DD)")
+
+    args = parser.parse_args()
+    index = AccountIndex(args.index)
+
+    if args.command == "refresh":
+        conn, dialect = connect(args.source_url)
+        added = index.refresh(conn, dialect, since=args.since)
+        print(f"Added {added} new name(s), {len(index)} indexed, data up to {index.watermark}")
+    elif args.command == "lookup":
+        candidates = index.lookup(args.name, limit=args.limit, active_since=args.active_since)
+        if not candidates:
+            print(f"No account matches: {args.name}", file=sys.stderr)
+            sys.exit(1)
+        print(format_candidates(candidates))
+    index.close()
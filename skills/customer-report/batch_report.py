@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Batch Customer Report Generator
+Generates PowerPoint reports for many accounts in one run using a process pool.
+
+Usage:
+    python batch_report.py <input> [template_path] [output_dir] [--workers N] [--fast] [--chart-workbooks MODE]
+                           [--max-chart-points N] [--downsample lttb|calendar] [--slim] [--compress-level N]
+                           [--benchmarks PATH] [--profile json|chrome] [--profile-memory]
+
+Arguments:
+    input: Directory of REPORT_DATA JSON (or .crd) files, a JSONL file with one payload per line,
+           or a .crd file of binary records (see report_model.py)
+    template_path: Path to HeyJobs template (default: ~/Desktop/Template.pptx)
+    output_dir: Directory for the reports and manifest.json (default: ~/Desktop/Customer_Reports)
+    --workers: Number of worker processes (default: number of CPUs)
+    --fast: Use the direct OOXML writer (see customer_report_generator.py)
+    --chart-workbooks: embedded (default), shared or none (see customer_report_generator.py)
+    --max-chart-points / --downsample: Downsample long monthly series (see customer_report_generator.py)
+    --slim / --compress-level: Smaller output packages (see customer_report_generator.py)
+    --benchmarks: Benchmark artifact for peer comparison markers (see portfolio_benchmarks.py)
+    --profile: Write stage timings next to each report and add percentiles to manifest.json
+    --profile-memory: Also record tracemalloc allocation peaks per stage (slower)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from customer_report_generator import CHART_WORKBOOK_MODES, chart_points, generate_report, preload
+from report_model import BINARY_EXTENSIONS, read_payloads
+from report_profiling import PROFILE_FORMATS, Profiler, TimingStats, write_profile
+
+
+def load_payloads(input_path):
+    """Yield (source, data, error) for every payload in a directory, JSONL or .crd file.
+
+    Payloads are checked when they are read (see report_model.py), so data is
+    a ReportData. A payload that cannot be parsed or fails the check is
+    yielded with data=None and the error, so that one broken payload does not
+    abort the whole batch.
+    """
+    if os.path.isdir(input_path):
+        for name in sorted(os.listdir(input_path)):
+            if name.endswith(('.json',) + BINARY_EXTENSIONS):
+                yield from read_payloads(os.path.join(input_path, name))
+    else:
+        yield from read_payloads(input_path)
+
+
+def report_filename(account_name, taken):
+    """Return a unique, filesystem-safe report file name for an account."""
+    safe = "".join(c if c.isalnum() or c in " -_." else "_" for c in account_name).strip() or "Unknown"
+    name = f"{safe}_Customer_Report.pptx"
+    n = 2
+    while name in taken:
+        name = f"{safe}_Customer_Report_{n}.pptx"
+        n += 1
+    taken.add(name)
+    return name
+
+
+def _build_one(source, data, template_path, output_path, options=None, profile=None, profile_memory=False):
+    """Build a single report, returning a manifest entry instead of raising.
+
+    options: keyword arguments for generate_report.
+    """
+    start = time.perf_counter()
+    entry = {
+        "source": source,
+        "account_name": data.get('account_name', ''),
+        "output_path": output_path,
+    }
+    profiler = Profiler(memory=profile_memory) if profile else None
+    try:
+        generate_report(data, template_path, output_path, profiler=profiler, **(options or {}))
+        entry["status"] = "ok"
+        entry["file_size"] = os.path.getsize(output_path)
+        if profiler is not None:
+            entry["profile_path"] = write_profile(profiler, output_path, profile)
+            entry["stages"] = {name: round(seconds, 6) for name, seconds in profiler.seconds().items()}
+    except Exception as e:
+        entry["status"] = "failed"
+        entry["error"] = "".join(traceback.format_exception_only(type(e), e)).strip()
+    finally:
+        if profiler is not None:
+            profiler.close()
+    entry["seconds"] = round(time.perf_counter() - start, 3)
+    return entry
+
+
+def _worker_failure(entry, error):
+    """Manifest entry of a report whose worker process died (BrokenProcessPool, OOM kill)."""
+    return dict(entry, status="failed", error="".join(traceback.format_exception_only(type(error), error)).strip())
+
+
+def run_batch(input_path, template_path, output_dir, workers=None, fast=False, chart_workbooks="embedded",
+              profile=None, profile_memory=False, max_chart_points=None, downsample="lttb", slim=False,
+              compresslevel=None, benchmarks=None):
+    """Generate one report per payload and write manifest.json to output_dir."""
+    options = {"fast": fast, "chart_workbooks": chart_workbooks, "max_chart_points": max_chart_points,
+               "downsample": downsample, "slim": slim, "compresslevel": compresslevel, "benchmarks": benchmarks}
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    started_at = datetime.now().isoformat(timespec='seconds')
+    start = time.perf_counter()
+
+    entries = []
+    taken = set()
+    with ProcessPoolExecutor(max_workers=workers, initializer=preload,
+                             initargs=(template_path,)) as pool:
+        futures = {}
+        for index, (source, data, error) in enumerate(load_payloads(input_path)):
+            if error is not None:
+                entries.append((index, {
+                    "source": source,
+                    "status": "failed",
+                    "error": error,
+                }))
+                continue
+            output_path = os.path.join(output_dir, report_filename(data.get('account_name', ''), taken))
+            entry = {"source": source, "account_name": data.get('account_name', ''), "output_path": output_path}
+            try:
+                futures[pool.submit(_build_one, source, data, template_path, output_path, options,
+                                     profile, profile_memory)] = (index, entry)
+            except Exception as e:
+                # The pool broke (a worker died); the remaining reports fail instead of the batch
+                entries.append((index, _worker_failure(entry, e)))
+        for future in as_completed(futures):
+            index, entry = futures[future]
+            try:
+                entries.append((index, future.result()))
+            except Exception as e:
+                entries.append((index, _worker_failure(entry, e)))
+
+    reports = [entry for _, entry in sorted(entries, key=lambda item: item[0])]
+    succeeded = sum(1 for r in reports if r["status"] == "ok")
+    manifest = {
+        "started_at": started_at,
+        "finished_at": datetime.now().isoformat(timespec='seconds'),
+        "elapsed_seconds": round(time.perf_counter() - start, 3),
+        "template_path": template_path,
+        "workers": workers,
+        "total": len(reports),
+        "succeeded": succeeded,
+        "failed": len(reports) - succeeded,
+        "reports": reports,
+    }
+    if profile:
+        stats = TimingStats()
+        for report in reports:
+            if "stages" in report:
+                stats.add(report["seconds"], report["stages"])
+        manifest["timing"] = stats.summary()
+    manifest_path = os.path.join(output_dir, "manifest.json")
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    print(f"Batch finished: {succeeded}/{len(reports)} reports in {manifest['elapsed_seconds']}s")
+    print(f"Manifest saved to: {manifest_path}")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate customer reports for many accounts.")
+    parser.add_argument("input", help="Directory of JSON payloads, a JSONL file or a .crd file")
+    parser.add_argument("template_path", nargs="?", default=os.path.expanduser("~/Desktop/Template.pptx"))
+    parser.add_argument("output_dir", nargs="?", default=os.path.expanduser("~/Desktop/Customer_Reports"))
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--fast", action="store_true", help="Use the direct OOXML writer")
+    parser.add_argument("--chart-workbooks", choices=CHART_WORKBOOK_MODES, default="embedded",
+                        help="Embed a workbook per chart, one shared workbook, or none")
+    parser.add_argument("--max-chart-points", type=chart_points, metavar="N",
+                        help="Downsample longer monthly series to this many points (at least 2)")
+    parser.add_argument("--downsample", choices=("lttb", "calendar"), default="lttb")
+    parser.add_argument("--slim", action="store_true",
+                        help="Leave unused layouts, masters and template extras out and merge identical media")
+    parser.add_argument("--compress-level", type=int, choices=range(10), metavar="0-9",
+                        help="Deflate level of the saved packages")
+    parser.add_argument("--benchmarks", metavar="PATH",
+                        help="Benchmark artifact to compare CPA and conversion with (see portfolio_benchmarks.py)")
+    parser.add_argument("--profile", choices=PROFILE_FORMATS,
+                        help="Write stage timings next to each report and percentiles to the manifest")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="Also record tracemalloc allocation peaks per stage")
+    args = parser.parse_args()
+
+    manifest = run_batch(args.input, args.template_path, args.output_dir, workers=args.workers, fast=args.fast,
+                         chart_workbooks=args.chart_workbooks,
+                         profile=args.profile or ("json" if args.profile_memory else None),
+                         profile_memory=args.profile_memory, max_chart_points=args.max_chart_points,
+                         downsample=args.downsample, slim=args.slim, compresslevel=args.compress_level,
+                         benchmarks=args.benchmarks)
+    sys.exit(1 if manifest["failed"] else 0)
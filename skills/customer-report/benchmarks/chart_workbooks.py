@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Chart Workbook Benchmark
+Compares the chart workbook modes of the report generator: time to build and
+save a report, output size, and the saving per chart against the default of
+one embedded workbook per chart.
+
+Usage:
+    python benchmarks/chart_workbooks.py [template_path] [--months 12] [--repeat 10]
+"""
+
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from customer_report_generator import CHART_WORKBOOK_MODES, generate_report, load_template  # noqa: E402
+from synthetic_data import make_report_data  # noqa: E402
+
+
+def measure(data, template_path, mode, repeat):
+    """Return (median seconds, output bytes) of building the report in memory."""
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        buffer = io.BytesIO()
+        start = time.perf_counter()
+        generate_report(data, template_path, buffer, chart_workbooks=mode)
+        timings.append(time.perf_counter() - start)
+        size = len(buffer.getvalue())
+    return statistics.median(timings), size
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the chart workbook modes.")
+    parser.add_argument("template_path", nargs="?", default=os.path.expanduser("~/Desktop/Template.pptx"))
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    data = make_report_data(months=args.months)
+    charts = 4
+    load_template(args.template_path)  # keep the one-off template parse out of the timings
+
+    results = {mode: measure(data, args.template_path, mode, args.repeat) for mode in CHART_WORKBOOK_MODES}
+    base_seconds, base_size = results["embedded"]
+    print(f"{args.months} months, {charts} charts, median of {args.repeat} runs")
+    print(f"{'mode':<10} {'time (ms)':>10} {'size (KB)':>10} {'saved/chart (ms)':>17} {'saved/chart (KB)':>17}")
+    for mode, (seconds, size) in results.items():
+        print(f"{mode:<10} {seconds * 1000:>10.1f} {size / 1024:>10.1f} "
+              f"{(base_seconds - seconds) * 1000 / charts:>17.1f} {(base_size - size) / 1024 / charts:>17.1f}")
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Report Benchmark Suite
+Builds synthetic reports over a grid of month counts, account counts and
+empty vs populated monthly series, and records per case:
+
+    seconds      median wall time per report
+    sections     median seconds per stage (template load, each slide, save)
+    peak_rss_kb  peak resident memory of the process that built the case
+    file_size    median .pptx size in bytes
+
+Each case runs in a fresh process so peak RSS belongs to that case alone.
+Results are compared with a baseline file; the run fails (exit code 1) when
+seconds, peak_rss_kb or file_size of any case grew by more than the threshold.
+Without a baseline file the results become the baseline.
+
+Usage:
+    python benchmarks/run_benchmarks.py [template_path] [options]
+
+Options:
+    --months: Comma-separated month counts (default: 6,12,24,60)
+    --accounts: Comma-separated account counts per case (default: 1,10)
+    --repeat: Rounds over the accounts of a case (default: 3)
+    --baseline: Baseline file (default: benchmarks/baseline.json)
+    --threshold: Allowed growth as a fraction of the baseline (default: 0.25)
+    --update-baseline: Overwrite the baseline with this run's results
+    --output: Also write this run's results to a file
+    --fast / --chart-workbooks: Passed on to generate_report
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from customer_report_generator import CHART_WORKBOOK_MODES  # noqa: E402
+from synthetic_data import make_accounts  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Metrics compared against the baseline
+COMPARED_METRICS = ("seconds", "peak_rss_kb", "file_size")
+
+
+def case_id(months, populated, accounts):
+    return f"months={months},series={'populated' if populated else 'empty'},accounts={accounts}"
+
+
+def peak_rss_kb():
+    """Return the peak resident set size of this process in KB, or None where unsupported."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_case(template_path, months, populated, accounts, repeat, fast=False, chart_workbooks="embedded"):
+    """Build the reports of one case and return its measurements. Runs in a fresh worker process."""
+    from customer_report_generator import generate_report
+    from report_profiling import Profiler
+
+    payloads = make_accounts(accounts, months, populated)
+    # Untimed warm-up: imports and the one-off template parse
+    generate_report(payloads[0], template_path, io.BytesIO(), fast=fast, chart_workbooks=chart_workbooks)
+
+    totals, sections, sizes = [], {}, []
+    for _ in range(repeat):
+        for data in payloads:
+            profiler = Profiler()
+            buffer = io.BytesIO()
+            start = time.perf_counter()
+            generate_report(data, template_path, buffer, fast=fast, chart_workbooks=chart_workbooks,
+                            profiler=profiler)
+            totals.append(time.perf_counter() - start)
+            sizes.append(len(buffer.getvalue()))
+            for name, seconds in profiler.seconds().items():
+                sections.setdefault(name, []).append(seconds)
+
+    return {
+        "months": months,
+        "series": "populated" if populated else "empty",
+        "accounts": accounts,
+        "reports": len(totals),
+        "seconds": round(statistics.median(totals), 6),
+        "max_seconds": round(max(totals), 6),
+        "sections": {name: round(statistics.median(values), 6) for name, values in sections.items()},
+        "peak_rss_kb": peak_rss_kb(),
+        "file_size": int(statistics.median(sizes)),
+    }
+
+
+def run_suite(template_path, month_counts, account_counts, repeat, fast=False, chart_workbooks="embedded"):
+    """Run every case of the grid and return {case id: measurements}."""
+    cases = {}
+    spawn = multiprocessing.get_context("spawn")
+    for months in month_counts:
+        for populated in (True, False):
+            for accounts in account_counts:
+                with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                    result = pool.submit(run_case, template_path, months, populated, accounts, repeat,
+                                         fast, chart_workbooks).result()
+                key = case_id(months, populated, accounts)
+                cases[key] = result
+                print(f"{key:<45} {result['seconds'] * 1000:>8.1f} ms  {result['peak_rss_kb'] or 0:>8} KB RSS"
+                      f"  {result['file_size'] / 1024:>7.1f} KB")
+    return cases
+
+
+def compare(cases, baseline_cases, threshold):
+    """Return [(case, metric, baseline, current)] for every metric that grew by more than threshold."""
+    regressions = []
+    for key, result in cases.items():
+        base = baseline_cases.get(key)
+        if base is None:
+            continue
+        for metric in COMPARED_METRICS:
+            if result.get(metric) is None or not base.get(metric):
+                continue
+            if result[metric] > base[metric] * (1 + threshold):
+                regressions.append((key, metric, base[metric], result[metric]))
+    return regressions
+
+
+def environment():
+    import pptx
+    return {
+        "python": platform.python_version(),
+        "python_pptx": pptx.__version__,
+        "platform": platform.platform(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark report generation on synthetic data.")
+    parser.add_argument("template_path", nargs="?", default=os.path.expanduser("~/Desktop/Template.pptx"))
+    parser.add_argument("--months", default="6,12,24,60")
+    parser.add_argument("--accounts", default="1,10")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output")
+    parser.add_argument("--fast", action="store_true")
+    parser.add_argument("--chart-workbooks", choices=CHART_WORKBOOK_MODES, default="embedded")
+    args = parser.parse_args()
+
+    month_counts = [int(m) for m in args.months.split(",")]
+    account_counts = [int(a) for a in args.accounts.split(",")]
+    results = {
+        "created_at": datetime.now().isoformat(timespec='seconds'),
+        "environment": environment(),
+        "settings": {"repeat": args.repeat, "fast": args.fast, "chart_workbooks": args.chart_workbooks},
+        "cases": run_suite(args.template_path, month_counts, account_counts, args.repeat,
+                           args.fast, args.chart_workbooks),
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to: {args.baseline}")
+        sys.exit(0)
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    if baseline.get("environment") != results["environment"] or baseline.get("settings") != results["settings"]:
+        print("Warning: baseline was recorded with a different environment or settings", file=sys.stderr)
+    regressions = compare(results["cases"], baseline.get("cases", {}), args.threshold)
+    for key, metric, base, current in regressions:
+        print(f"REGRESSION {key} {metric}: {base} -> {current} (+{(current / base - 1) * 100:.0f}%)")
+    print(f"{len(regressions)} regression(s) above {args.threshold * 100:.0f}% against {args.baseline}")
+    sys.exit(1 if regressions else 0)
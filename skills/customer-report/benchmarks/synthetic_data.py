@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Synthetic Report Data
+Generates REPORT_DATA payloads of any size for benchmarks and load tests.
+Payloads are built with metrics_aggregation.build_report_data from random
+but plausible monthly metrics, so they follow the real schema and rounding.
+The same account name and settings always produce the same payload.
+
+Usage:
+    python benchmarks/synthetic_data.py <output_path> [--months 12] [--accounts 1] [--empty]
+
+Arguments:
+    output_path: JSON file for a single account, JSONL file (one payload per line) otherwise
+    --months: Months covered by each report (default: 12)
+    --accounts: Number of accounts (default: 1)
+    --empty: Leave the monthly_cpa / monthly_apps series empty
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from metrics_aggregation import PRODUCT_TYPES, build_report_data  # noqa: E402
+
+# Last month covered by synthetic reports
+END_MONTH = "2026-01"
+
+
+def _months(count, end_month=END_MONTH):
+    """Return the last `count` 'YYYY-MM' months up to end_month."""
+    year, month = int(end_month[:4]), int(end_month[5:7])
+    index = year * 12 + month - 1
+    return [f"{i // 12}-{i % 12 + 1:02d}" for i in range(index - count + 1, index + 1)]
+
+
+def make_report_data(account_name="Synthetic", months=12, populated=True, end_month=END_MONTH):
+    """Return a REPORT_DATA dict for one synthetic account.
+
+    With populated=False the monthly series are empty, which skips the chart
+    slides, while the totals keep their values.
+    """
+    rng = random.Random(zlib.crc32(f"{account_name}|{months}|{end_month}".encode("utf-8")))
+    month_keys = _months(months, end_month)
+
+    monthly = {}
+    totals = {}
+    budget = {}
+    for product in PRODUCT_TYPES:
+        scale = rng.uniform(0.2, 5.0)
+        series = {}
+        for month in month_keys:
+            jobs = int(rng.uniform(200, 2000) * scale)
+            page_views = jobs * rng.uniform(50, 200)
+            started = page_views * rng.uniform(0.03, 0.12)
+            sent = started * rng.uniform(0.25, 0.6)
+            series[month] = {
+                "jobs": jobs,
+                "page_views": page_views,
+                "applications_started": started,
+                "applications_sent": sent,
+                "spend": sent * rng.uniform(8, 40),
+            }
+        monthly[product] = series
+        totals[product] = {key: sum(m[key] for m in series.values())
+                           for key in ("page_views", "applications_started", "applications_sent", "spend")}
+        # Jobs run for several months, so distinct jobs over the range are fewer than the monthly sum
+        totals[product]["jobs"] = int(sum(m["jobs"] for m in series.values()) * rng.uniform(0.3, 0.7))
+        spend = totals[product]["spend"]
+        budget[product] = {"booked": round(spend * rng.uniform(1.0, 1.5), 2),
+                           "remaining": round(spend * rng.uniform(0.0, 0.5), 2)}
+
+    return build_report_data(account_name, totals, monthly if populated else {}, budget=budget,
+                             start_month=month_keys[0], end_month=month_keys[-1])
+
+
+def make_accounts(count, months=12, populated=True):
+    """Return REPORT_DATA dicts for `count` synthetic accounts."""
+    return [make_report_data(f"Account {i + 1:04d}", months, populated) for i in range(count)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic REPORT_DATA payloads.")
+    parser.add_argument("output_path")
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--accounts", type=int, default=1)
+    parser.add_argument("--empty", action="store_true", help="Leave the monthly series empty")
+    args = parser.parse_args()
+    jsonl = args.output_path.endswith(".jsonl")
+    if args.accounts > 1 and not jsonl:
+        parser.error("more than one account needs a .jsonl output_path")
+
+    payloads = make_accounts(args.accounts, args.months, populated=not args.empty)
+    with open(args.output_path, 'w') as f:
+        if jsonl:
+            for payload in payloads:
+                f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+        else:
+            json.dump(payloads[0], f, indent=2, ensure_ascii=False)
+    print(f"Wrote {len(payloads)} payload(s) to: {args.output_path}")
@@ -1,21 +1,38 @@
 #!/usr/bin/env python3
 """
 Customer Performance Report Generator
-Generates PowerPoint reports for any customer account with REACH/HIRE split.
+Generates PowerPoint reports for any customer account, with a section per product (REACH/HIRE by default).
 
 Usage:
-    python customer_report_generator.py <account_name> [months] [template_path] [output_path]
+    python customer_report_generator.py <data_file> [template_path] [output_path] [--incremental]
+    python customer_report_generator.py --find-account <name> [--active-since YYYY-MM-DD]
 
 Arguments:
-    account_name: Ultimate parent company name to search for
-    months: Number of months to analyze (default: 12)
+    data_file: JSON (or binary .crd, see report_model.py) file with the REPORT_DATA structure below
     template_path: Path to HeyJobs template (default: ~/Desktop/Template.pptx)
     output_path: Output file path (default: ~/Desktop/<account>_Customer_Report.pptx)
+    --incremental: Reuse slides whose data did not change since the previous report at output_path
+    --fast: Write text, KPI boxes and tables as XML directly (same look, less object-model overhead)
+    --chart-workbooks embedded|shared|none: Workbook per chart (default), one shared workbook, or none
+    --profile json|chrome: Write stage and per-slide timings next to the report
+    --profile-memory: Also record tracemalloc allocation peaks per stage (slower)
+    --max-chart-points N: Downsample longer monthly series to N chart points
+    --downsample lttb|calendar: Keep peak points (default) or aggregate into calendar buckets
+    --slim: Drop unused layouts, masters and template extras, merge identical media (see package_slimming.py)
+    --compress-level 0-9: Deflate level of the saved package (default: zlib's default)
+    --benchmarks PATH: Show peer CPA/conversion percentiles from a benchmark artifact (see portfolio_benchmarks.py)
+    --find-account: Look up account names in the local index (see account_index.py) and exit
 """
 
 import sys
 import os
+import io
+import re
 import json
+import hashlib
+import argparse
+from concurrent.futures import Executor
+from contextlib import nullcontext
 from datetime import datetime, timedelta
 
 # Report data structure (to be populated by Claude via Redshift queries)
@@ -37,6 +54,10 @@ REPORT_DATA = {
         "avg_cpa": 0,
     },
 
+    # Product blocks in report order, one report section each (optional, default: ["reach", "hire"]).
+    # Every listed key needs a block shaped like "reach" below.
+    # "products": ["reach", "hire"],
+
     # REACH metrics
     "reach": {
         "booked_budget": 0,
@@ -69,18 +90,287 @@ REPORT_DATA = {
 }
 
 
-def generate_report(data, template_path, output_path):
-    """Generate PowerPoint report from data."""
+# Stripped template packages, keyed by (absolute path, mtime, size)
+_TEMPLATE_CACHE = {}
+
+# Bump when slide rendering changes, so incremental runs do not reuse outdated slides
+MANIFEST_VERSION = 4
+
+# Relationship types that belong to the slide itself rather than to its content
+_SLIDE_OWN_RELS = ("/slideLayout", "/notesSlide")
+
+# How chart data is embedded: a workbook per chart (python-pptx default),
+# one workbook shared by all charts, or cached values only
+CHART_WORKBOOK_MODES = ("embedded", "shared", "none")
+
+
+def load_template(template_path):
+    """Return a fresh Presentation cloned from the cached, slide-free template.
+
+    The template is parsed and stripped of its slides only once per file
+    version; every call then opens an in-memory copy of the stripped package.
+    Saving the stripped package also drops the slide parts that deleting
+    slides would otherwise leave orphaned.
+    """
     from pptx import Presentation
+
+    path = os.path.abspath(template_path)
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    blob = _TEMPLATE_CACHE.get(key)
+    if blob is None:
+        prs = Presentation(path)
+        # Delete all existing slides
+        while len(prs.slides) > 0:
+            rId = prs.slides._sldIdLst[0].rId
+            prs.part.drop_rel(rId)
+            del prs.slides._sldIdLst[0]
+        buffer = io.BytesIO()
+        prs.save(buffer)
+        blob = buffer.getvalue()
+        for stale in [k for k in _TEMPLATE_CACHE if k[0] == path]:
+            del _TEMPLATE_CACHE[stale]
+        _TEMPLATE_CACHE[key] = blob
+    return Presentation(io.BytesIO(blob))
+
+
+def template_fingerprint(template_path):
+    """Return a string identifying the current version of a template file."""
+    stat = os.stat(template_path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def _hashable(value):
+    """json.dumps fallback: report_model records as plain JSON, anything else as text."""
+    return value.to_json() if hasattr(value, "to_json") else str(value)
+
+
+def slide_hash(key, inputs):
+    """Hash the data a slide is built from."""
+    payload = json.dumps([key, inputs], sort_keys=True, ensure_ascii=False, default=_hashable)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def load_previous_slides(output_path, manifest_path, fingerprint, chart_workbooks="embedded"):
+    """Return {slide key: (hash, slide)} from the previous report, or {} if it cannot be reused."""
+    from pptx import Presentation
+    from pptx.exc import PackageNotFoundError
+
+    try:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        previous = Presentation(output_path)
+    except (OSError, ValueError, PackageNotFoundError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("template") != fingerprint:
+        return {}
+    if manifest.get("chart_workbooks", "embedded") != chart_workbooks:
+        return {}
+    slides = list(previous.slides)
+    if len(slides) != len(manifest.get("slides", [])):
+        return {}
+    return {entry["key"]: (entry["hash"], slide) for entry, slide in zip(manifest["slides"], slides)}
+
+
+def _rehome_part(part, package, seen):
+    """Give a part copied from another package (and its own parts) free partnames in package."""
+    from pptx.opc.packuri import PackURI
+
+    if id(part) in seen:
+        return
+    seen.add(id(part))
+    template = re.sub(r"\d+(?=\.\w+$)", "%d", str(part.partname))
+    if "%d" in template:
+        part.partname = PackURI(package.next_partname(template))
+    for rel in part.rels.values():
+        if not rel.is_external:
+            _rehome_part(rel.target_part, package, seen)
+
+
+def copy_slide_content(source, target):
+    """Copy the shapes of a slide from a previous report, including chart parts, verbatim."""
+    from copy import deepcopy
+    from pptx.oxml.ns import qn
+
+    rid_map = {}
+    package = target.part.package
+    seen = set()
+    for rel in source.part.rels.values():
+        if rel.reltype.endswith(_SLIDE_OWN_RELS):
+            continue
+        if rel.is_external:
+            rid_map[rel.rId] = target.part.relate_to(rel.target_ref, rel.reltype, is_external=True)
+        else:
+            rid_map[rel.rId] = target.part.relate_to(rel.target_part, rel.reltype)
+            _rehome_part(rel.target_part, package, seen)
+
+    sp_tree = deepcopy(source.shapes._spTree)
+    r_id = qn("r:id")
+    r_embed = qn("r:embed")
+    r_link = qn("r:link")
+    for element in sp_tree.iter():
+        for attr in (r_id, r_embed, r_link):
+            old = element.get(attr)
+            if old in rid_map:
+                element.set(attr, rid_map[old])
+    target_tree = target.shapes._spTree
+    target_tree.getparent().replace(target_tree, sp_tree)
+
+
+def add_chart_without_workbook(slide, chart_type, x, y, cx, cy, chart_data):
+    """Add a chart that carries its values only as the chart XML's cached values.
+
+    Same as slide.shapes.add_chart(), minus writing an Excel workbook to embed
+    with the chart. PowerPoint draws charts from the cached values, so the
+    chart looks the same; it just has no data to edit.
+    """
+    from pptx.opc.constants import CONTENT_TYPE as CT, RELATIONSHIP_TYPE as RT
+    from pptx.parts.chart import ChartPart
+
+    package = slide.part.package
+    chart_part = ChartPart.load(partname=package.next_partname(ChartPart.partname_template),
+                                content_type=CT.DML_CHART, package=package,
+                                blob=chart_data.xml_bytes(chart_type))
+    rId = slide.part.relate_to(chart_part, RT.CHART)
+    graphic_frame = slide.shapes._add_chart_graphicFrame(rId, x, y, cx, cy)
+    return slide.shapes._shape_factory(graphic_frame)
+
+
+def embed_shared_workbook(package, charts):
+    """Embed one workbook for all charts, with a worksheet per chart.
+
+    charts: [(chart_part, chart_data)] of charts added without a workbook,
+    or copied from a previous report's shared workbook. Their formulas are
+    pointed at their own worksheet, so editing the data of any chart in
+    PowerPoint still works.
+    """
+    import xlsxwriter
+    from pptx.oxml.ns import qn
+    from pptx.parts.embeddedpackage import EmbeddedXlsxPart
+
+    xlsx_file = io.BytesIO()
+    workbook = xlsxwriter.Workbook(xlsx_file, {"in_memory": True})
+    for idx, (chart_part, chart_data) in enumerate(charts, 1):
+        sheet = f"Chart{idx}"
+        chart_data._workbook_writer._populate_worksheet(workbook, workbook.add_worksheet(sheet))
+        for formula in chart_part._element.iter(qn("c:f")):
+            # "Sheet1!" for new charts, "ChartN!" for charts reused from an earlier shared workbook
+            formula.text = re.sub(r"^(?:'[^']*'|[^!]*)!", f"{sheet}!", formula.text, count=1)
+    workbook.close()
+
+    xlsx_part = EmbeddedXlsxPart.new(xlsx_file.getvalue(), package)
+    for chart_part, _ in charts:
+        # A chart copied from a previous report still points at that report's workbook; drop it,
+        # so the stale workbook is not saved next to the new one
+        old_rId = chart_part._element.xlsx_part_rId
+        if old_rId is not None:
+            chart_part.drop_rel(old_rId)
+        chart_part.chart_workbook.xlsx_part = xlsx_part
+
+
+def cached_chart_data(chart):
+    """Return CategoryChartData holding the categories and series values cached in a chart's XML."""
+    from pptx.chart.data import CategoryChartData
+
+    plot = chart.plots[0]
+    chart_data = CategoryChartData()
+    chart_data.categories = list(plot.categories)
+    for series in plot.series:
+        chart_data.add_series(series.name, series.values)
+    return chart_data
+
+
+def chart_points(value):
+    """argparse type of --max-chart-points: an integer of at least 2."""
+    try:
+        points = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if points < 2:
+        raise argparse.ArgumentTypeError(f"must be at least 2, got {points}")
+    return points
+
+
+def preload(template_path):
+    """Import python-pptx and cache the template ahead of the first report.
+
+    Used as the initializer of long-lived worker processes.
+    """
+    import pptx.chart.data  # noqa: F401
+    try:
+        load_template(template_path)
+    except OSError:
+        # A missing template is reported by the first generate_report call
+        pass
+
+
+def generate_report(data, template_path, output_path, incremental=False, fast=False, chart_workbooks="embedded",
+                    profiler=None, max_chart_points=None, downsample="lttb", slim=False, compresslevel=None,
+                    benchmarks=None, product_workers=None, sections=None):
+    """Generate PowerPoint report from data.
+
+    With incremental=True, slides whose input data hashes match the sidecar
+    manifest of the previous report at output_path are copied from it instead
+    of being rebuilt. With fast=True, text boxes, KPI boxes and tables are
+    written as XML directly (see ooxml_writer.py) and the package is saved
+    with its own zip writer; the slides look the same.
+
+    chart_workbooks is one of CHART_WORKBOOK_MODES. "shared" writes a single
+    workbook for all charts when the report is saved, "none" writes none at
+    all (charts keep their cached values but cannot be edited in PowerPoint).
+
+    Pass a report_profiling.Profiler to record how long the template load,
+    every slide, the KPI boxes, tables and charts on it, and the save take.
+
+    With max_chart_points, longer monthly series are reduced to that many
+    chart points with the downsample method ("lttb" or "calendar", see
+    series_downsampling.py). KPIs and totals are not affected.
+
+    data may be a REPORT_DATA dict or a report_model.ReportData. It is
+    checked before the template is loaded; report_model.ReportDataError
+    lists every missing or malformed value.
+
+    With slim=True, layouts, masters and media the slides do not use are
+    left out of the saved package (see package_slimming.py). compresslevel
+    sets the deflate level (0-9) of the saved package.
+
+    benchmarks is a portfolio_benchmarks.Benchmarks or the path of a
+    benchmark artifact. With it, the executive summary and the summary
+    dashboard show how the account's CPA and conversion compare to its peers
+    (see portfolio_benchmarks.py).
+
+    Product sections follow the payload's "products" list (REACH then HIRE
+    by default), one section per product. product_workers is a long-lived
+    concurrent.futures Executor owned by the caller (e.g. a
+    ProcessPoolExecutor with initializer=preload). With it, the sections of
+    products whose slides cannot be reused are built on the executor while
+    this process builds the other slides, and are copied into the report in
+    order. sections is used by those workers (see build_product_sections()).
+    """
+    if chart_workbooks not in CHART_WORKBOOK_MODES:
+        raise ValueError(f"chart_workbooks must be one of {', '.join(CHART_WORKBOOK_MODES)}")
+    if product_workers is not None and not isinstance(product_workers, Executor):
+        raise TypeError("product_workers must be a concurrent.futures.Executor")
+
     from pptx.util import Inches, Pt
     from pptx.dml.color import RGBColor
     from pptx.enum.text import PP_ALIGN
     from pptx.enum.shapes import MSO_SHAPE
     from pptx.chart.data import CategoryChartData
     from pptx.enum.chart import XL_CHART_TYPE, XL_LEGEND_POSITION
+    from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+
+    def stage(name, category="stage"):
+        return profiler.stage(name, category) if profiler is not None else nullcontext()
 
-    # Load template
-    prs = Presentation(template_path)
+    # Check the payload before any expensive work
+    from report_model import load_report_data
+    with stage("validate"):
+        data = load_report_data(data)
+
+    # Load template (parsed once, cloned per report)
+    with stage("load_template"):
+        prs = load_template(template_path)
 
     # HeyJobs brand colors
     HEYJOBS_PURPLE = RGBColor(102, 45, 145)
@@ -102,12 +392,6 @@ def generate_report(data, template_path, output_path):
     LAYOUT_SECTION = prs.slide_layouts[2]
     LAYOUT_CONTENT = prs.slide_layouts[3]
 
-    # Delete all existing slides
-    while len(prs.slides) > 0:
-        rId = prs.slides._sldIdLst[0].rId
-        prs.part.drop_rel(rId)
-        del prs.slides._sldIdLst[0]
-
     def add_textbox(slide, left, top, width, height, text, font_size=12, bold=False, color=HEYJOBS_DARK, align=PP_ALIGN.LEFT):
         txBox = slide.shapes.add_textbox(Inches(left), Inches(top), Inches(width), Inches(height))
         tf = txBox.text_frame
@@ -120,15 +404,15 @@ def generate_report(data, template_path, output_path):
         p.alignment = align
         return txBox
 
-    def add_kpi_box(slide, left, top, width, height, value, label, bg_color):
+    def add_kpi_box(slide, left, top, width, height, value, label, bg_color, value_size=24, label_size=10):
         shape = slide.shapes.add_shape(MSO_SHAPE.ROUNDED_RECTANGLE, Inches(left), Inches(top), Inches(width), Inches(height))
         shape.fill.solid()
         shape.fill.fore_color.rgb = bg_color
         shape.line.fill.background()
         add_textbox(slide, left, top + 0.15, width, 0.6, value,
-                    font_size=24, bold=True, color=RGBColor(255,255,255), align=PP_ALIGN.CENTER)
+                    font_size=value_size, bold=True, color=RGBColor(255,255,255), align=PP_ALIGN.CENTER)
         add_textbox(slide, left, top + 0.65, width, 0.4, label,
-                    font_size=10, bold=False, color=RGBColor(255,255,255), align=PP_ALIGN.CENTER)
+                    font_size=label_size, bold=False, color=RGBColor(255,255,255), align=PP_ALIGN.CENTER)
 
     def add_table(slide, left, top, width, height, table_data, header_color=HEYJOBS_PURPLE):
         rows = len(table_data)
@@ -159,14 +443,24 @@ def generate_report(data, template_path, output_path):
                         para.alignment = PP_ALIGN.CENTER
         return table
 
+    # Charts waiting for the shared workbook: [(chart_part, chart_data)], chart_data None for reused charts
+    shared_charts = []
+
     def add_line_chart(slide, left, top, width, height, categories, series_data, colors):
         chart_data = CategoryChartData()
         chart_data.categories = categories
         for name, values in series_data:
             chart_data.add_series(name, values)
-        chart = slide.shapes.add_chart(
-            XL_CHART_TYPE.LINE, Inches(left), Inches(top), Inches(width), Inches(height), chart_data
-        ).chart
+        if chart_workbooks == "embedded":
+            chart = slide.shapes.add_chart(
+                XL_CHART_TYPE.LINE, Inches(left), Inches(top), Inches(width), Inches(height), chart_data
+            ).chart
+        else:
+            graphic_frame = add_chart_without_workbook(
+                slide, XL_CHART_TYPE.LINE, Inches(left), Inches(top), Inches(width), Inches(height), chart_data)
+            chart = graphic_frame.chart
+            if chart_workbooks == "shared":
+                shared_charts.append((graphic_frame.chart_part, chart_data))
         chart.has_legend = True
         chart.legend.position = XL_LEGEND_POSITION.BOTTOM
         chart.legend.include_in_layout = False
@@ -180,6 +474,33 @@ def generate_report(data, template_path, output_path):
                 chart.series[i].format.line.width = Pt(2.5)
         return chart
 
+    if fast:
+        # Direct OOXML fast path: same XML as above, emitted from templates in one parse per shape group
+        from ooxml_writer import append_shapes, next_shape_id, rounded_rect_xml, table_xml, textbox_xml
+
+        ALIGN_XML = {PP_ALIGN.LEFT: "l", PP_ALIGN.CENTER: "ctr", PP_ALIGN.RIGHT: "r"}
+
+        def add_textbox(slide, left, top, width, height, text, font_size=12, bold=False, color=HEYJOBS_DARK, align=PP_ALIGN.LEFT):
+            append_shapes(slide, textbox_xml(next_shape_id(slide), left, top, width, height, text,
+                                             font_size, bold, str(color), ALIGN_XML[align]))
+
+        def add_kpi_box(slide, left, top, width, height, value, label, bg_color, value_size=24, label_size=10):
+            shape_id = next_shape_id(slide)
+            append_shapes(slide, "".join((
+                rounded_rect_xml(shape_id, left, top, width, height, str(bg_color)),
+                textbox_xml(shape_id + 1, left, top + 0.15, width, 0.6, value, value_size, True, "FFFFFF", "ctr"),
+                textbox_xml(shape_id + 2, left, top + 0.65, width, 0.4, label, label_size, False, "FFFFFF", "ctr"),
+            )))
+
+        def add_table(slide, left, top, width, height, table_data, header_color=HEYJOBS_PURPLE):
+            append_shapes(slide, table_xml(next_shape_id(slide), left, top, width, height, table_data,
+                                           str(header_color), str(HEYJOBS_DARK)))
+
+    if profiler is not None:
+        add_kpi_box = profiler.wrap(add_kpi_box, "kpi_box", "shape")
+        add_table = profiler.wrap(add_table, "table", "shape")
+        add_line_chart = profiler.wrap(add_line_chart, "chart", "shape")
+
     def clear_placeholders(slide):
         """Remove all placeholder text (like 'Click to add title') from a slide."""
         for shape in slide.shapes:
@@ -208,288 +529,506 @@ def generate_report(data, template_path, output_path):
             return f"€{num:,.0f}".replace(',', '.')
         return f"€{num:.2f}".replace('.', ',')
 
+    # Product blocks in report order (the payload's "products" list, default REACH then HIRE)
+    product_keys = list(data.products)
+    products = {key: data[key] for key in product_keys}
+
+    if max_chart_points is not None and max_chart_points < 2:
+        raise ValueError(f"max_chart_points must be at least 2, got {max_chart_points}")
+    if max_chart_points:
+        from series_downsampling import DOWNSAMPLE_METHODS, downsample_apps, downsample_cpa
+        if downsample not in DOWNSAMPLE_METHODS:
+            raise ValueError(f"downsample must be one of {', '.join(DOWNSAMPLE_METHODS)}")
+        products = {
+            key: dict(product,
+                      monthly_cpa=downsample_cpa(product['monthly_cpa'], max_chart_points, downsample,
+                                                 product['monthly_apps']),
+                      monthly_apps=downsample_apps(product['monthly_apps'], max_chart_points, downsample))
+            for key, product in products.items()
+        }
+
+    # Colors per product: accent (headings, badges, chart lines), light (dashboard heading), KPI box colors,
+    # and whether the CPA chart shows jobs in thousands (None: when a month has 1000 jobs or more)
+    PRODUCT_STYLES = {
+        "reach": {"accent": HEYJOBS_PURPLE, "light": LIGHT_PURPLE,
+                  "kpi_colors": (LIGHT_PURPLE, LIGHT_BLUE, LIGHT_TEAL, LIGHT_GREEN), "jobs_in_thousands": True},
+        "hire": {"accent": LIGHT_ORANGE, "light": LIGHT_ORANGE,
+                 "kpi_colors": (LIGHT_ORANGE, LIGHT_CORAL, LIGHT_CORAL, LIGHT_ORANGE), "jobs_in_thousands": False},
+    }
+    # Styles of further products, assigned in order
+    EXTRA_STYLES = (
+        {"accent": HEYJOBS_TEAL, "light": LIGHT_TEAL,
+         "kpi_colors": (LIGHT_TEAL, LIGHT_BLUE, LIGHT_GREEN, LIGHT_TEAL), "jobs_in_thousands": None},
+        {"accent": HEYJOBS_GRAY, "light": LIGHT_BLUE,
+         "kpi_colors": (LIGHT_BLUE, LIGHT_PURPLE, LIGHT_TEAL, LIGHT_GREEN), "jobs_in_thousands": None},
+    )
+    extra_keys = [key for key in product_keys if key not in PRODUCT_STYLES]
+    styles = {key: PRODUCT_STYLES.get(key) or EXTRA_STYLES[extra_keys.index(key) % len(EXTRA_STYLES)]
+              for key in product_keys}
+    labels = {key: key.upper() for key in product_keys}
+
+    # Peer comparison from the precomputed portfolio benchmarks
+    markers = {}
+    benchmarks_date = None
+    if benchmarks is not None:
+        from portfolio_benchmarks import Benchmarks, benchmark_markers, load_benchmarks
+        with stage("benchmarks"):
+            if not isinstance(benchmarks, Benchmarks):
+                benchmarks = load_benchmarks(benchmarks)
+            markers = benchmark_markers(benchmarks, data)
+            benchmarks_date = benchmarks.generated_at.strftime('%d.%m.%Y')
+
+    def segment_label(segment):
+        if segment.startswith("industry:"):
+            return f"Branche {segment[len('industry:'):]}"
+        return {"size:small": "Kunden mit < €10.000 Budget", "size:medium": "Kunden mit €10.000 - €100.000 Budget",
+                "size:large": "Kunden mit > €100.000 Budget"}.get(segment, "alle Kunden")
+
+    def benchmark_text(product):
+        """One line per benchmarked metric, e.g. 'CPA besser als 70% (Median €12,40, alle Kunden)'."""
+        lines = []
+        cpa = markers.get(product, {}).get('avg_cpa')
+        if cpa:
+            lines.append(f"CPA besser als {cpa['better_than']}% (Median €{cpa['median']:.2f}".replace('.', ',')
+                         + f", {segment_label(cpa['segment'])})")
+        conversion = markers.get(product, {}).get('conversion_rate')
+        if conversion:
+            lines.append(f"Conversion besser als {conversion['better_than']}% (Median {conversion['median']:.1f}%"
+                         .replace('.', ',') + f", {segment_label(conversion['segment'])})")
+        return lines
+
+    def columns(count, width, gap=0.2, left=0.3, total_width=9.4):
+        """Return (left edges, column width) for count side-by-side columns, each at most width wide."""
+        width = min(width, (total_width - (count - 1) * gap) / count)
+        return [round(left + i * (width + gap), 2) for i in range(count)], width
+
+    def text_height(lines, font_size, width):
+        """Return the height (inches) of a text box holding lines at font_size, wrapped at width inches."""
+        # About half an em per character, 1.2 line spacing, 0.05in top and bottom insets
+        per_line = max(1, int(width * 72 / (font_size * 0.5)))
+        rows = sum(max(1, -(-len(line) // per_line)) for line in lines)
+        return round(0.1 + rows * font_size * 1.2 / 72, 2)
+
+    def fit_font_size(texts, width, font_size, em=0.6):
+        """Return font_size, or the largest smaller size at which the longest of texts fits on one line in width inches."""
+        # 0.1in left and right insets; em is the average character width in ems
+        longest = max(len(text) for text in texts)
+        return min(font_size, int((width - 0.2) * 72 / (longest * em)))
+
+    def add_section_title(slide, title):
+        add_textbox(slide, 0.5, 2.2, 9, 0.8, title,
+                    font_size=28, bold=True, color=RGBColor(255, 255, 255), align=PP_ALIGN.LEFT)
+
     # ============================================================
     # SLIDE 1: Title Slide
     # ============================================================
-    slide = prs.slides.add_slide(LAYOUT_TITLE)
-    clear_placeholders(slide)
-
-    add_textbox(slide, 0.5, 1.6, 9, 1.0, f"{data['account_name']} Customer Report",
-                font_size=36, bold=True, color=RGBColor(0, 0, 0), align=PP_ALIGN.LEFT)
-    add_textbox(slide, 0.5, 2.8, 9, 0.6, "Ihre HeyJobs-Performance Analyse",
-                font_size=18, bold=False, color=HEYJOBS_DARK, align=PP_ALIGN.LEFT)
-    add_textbox(slide, 0.5, 3.5, 9, 0.5, f"Zeitraum: {data['date_from']} - {data['date_to']} ({data['time_range_months']} Monate)",
-                font_size=12, bold=False, color=HEYJOBS_GRAY, align=PP_ALIGN.LEFT)
+    def build_title(slide):
+        add_textbox(slide, 0.5, 1.6, 9, 1.0, f"{data['account_name']} Customer Report",
+                    font_size=36, bold=True, color=RGBColor(0, 0, 0), align=PP_ALIGN.LEFT)
+        add_textbox(slide, 0.5, 2.8, 9, 0.6, "Ihre HeyJobs-Performance Analyse",
+                    font_size=18, bold=False, color=HEYJOBS_DARK, align=PP_ALIGN.LEFT)
+        add_textbox(slide, 0.5, 3.5, 9, 0.5, f"Zeitraum: {data['date_from']} - {data['date_to']} ({data['time_range_months']} Monate)",
+                    font_size=12, bold=False, color=HEYJOBS_GRAY, align=PP_ALIGN.LEFT)
 
     # ============================================================
     # SLIDE 2: Executive Summary (Minimalistic)
     # ============================================================
-    slide = prs.slides.add_slide(LAYOUT_CONTENT)
-    clear_placeholders(slide)
-
-    add_textbox(slide, 0.3, 0.2, 9, 0.5, "Performance Analyse im Überblick",
-                font_size=20, bold=True, color=RGBColor(0, 0, 0))
-    add_textbox(slide, 0.3, 0.55, 9, 0.3, f"Letzte {data['time_range_months']} Monate (REACH + HIRE)",
-                font_size=10, bold=False, color=HEYJOBS_GRAY)
-
-    # KPI Row 1
-    add_kpi_box(slide, 0.3, 0.95, 2.2, 0.9, format_currency(data['total']['booked_budget']), "Gebuchtes Budget", LIGHT_PURPLE)
-    add_kpi_box(slide, 2.6, 0.95, 2.2, 0.9, format_currency(data['total']['used_budget']), "Genutztes Budget", LIGHT_BLUE)
-    add_kpi_box(slide, 4.9, 0.95, 2.2, 0.9, format_currency(data['total']['available_budget']), "Verfügbares Budget", LIGHT_GREEN)
-    add_kpi_box(slide, 7.2, 0.95, 2.2, 0.9, f"€{data['total']['avg_cpa']:.2f}".replace('.', ','), "⌀ CPA", LIGHT_ORANGE)
-
-    # KPI Row 2
-    add_kpi_box(slide, 0.3, 2.0, 2.2, 0.9, format_number(data['total']['total_jobs']), "Jobs", LIGHT_PURPLE)
-    add_kpi_box(slide, 2.6, 2.0, 2.2, 0.9, format_number(data['total']['page_views']), "Stellenaufrufe", LIGHT_BLUE)
-    add_kpi_box(slide, 4.9, 2.0, 2.2, 0.9, format_number(data['total']['applications_started']), "Bew. gestartet", LIGHT_BLUE)
-    add_kpi_box(slide, 7.2, 2.0, 2.2, 0.9, format_number(data['total']['applications_sent']), "Bew. gesendet", LIGHT_GREEN)
-
-    # Key insights
-    add_textbox(slide, 0.3, 3.1, 9, 0.3, "REACH vs HIRE:",
-                font_size=11, bold=True, color=RGBColor(0, 0, 0))
-
-    reach = data['reach']
-    hire = data['hire']
-    insights = f"""REACH: {format_number(reach['total_jobs'])} Jobs  |  CPA €{reach['avg_cpa']:.2f}  |  {format_number(reach['applications_sent'])} Bewerbungen  |  {reach['conversion_rate']:.0f}% Conversion
-HIRE: {format_number(hire['total_jobs'])} Jobs  |  CPA €{hire['avg_cpa']:.2f}  |  {format_number(hire['applications_sent'])} Bewerbungen  |  {hire['conversion_rate']:.0f}% Conversion""".replace('.', ',')
-
-    add_textbox(slide, 0.3, 3.4, 9, 1.2, insights,
-                font_size=9, bold=False, color=HEYJOBS_DARK)
-
-    # ============================================================
-    # SLIDE 3: Section - Budget Overview
-    # ============================================================
-    slide = prs.slides.add_slide(LAYOUT_SECTION)
-    clear_placeholders(slide)
-    add_textbox(slide, 0.5, 2.2, 9, 0.8, "1. Budget-Übersicht",
-                font_size=28, bold=True, color=RGBColor(255, 255, 255), align=PP_ALIGN.LEFT)
+    def build_executive_summary(slide):
+        add_textbox(slide, 0.3, 0.2, 9, 0.5, "Performance Analyse im Überblick",
+                    font_size=20, bold=True, color=RGBColor(0, 0, 0))
+        add_textbox(slide, 0.3, 0.55, 9, 0.3,
+                    f"Letzte {data['time_range_months']} Monate ({' + '.join(labels.values())})",
+                    font_size=10, bold=False, color=HEYJOBS_GRAY)
+
+        # KPI Row 1
+        add_kpi_box(slide, 0.3, 0.95, 2.2, 0.9, format_currency(data['total']['booked_budget']), "Gebuchtes Budget", LIGHT_PURPLE)
+        add_kpi_box(slide, 2.6, 0.95, 2.2, 0.9, format_currency(data['total']['used_budget']), "Genutztes Budget", LIGHT_BLUE)
+        add_kpi_box(slide, 4.9, 0.95, 2.2, 0.9, format_currency(data['total']['available_budget']), "Verfügbares Budget", LIGHT_GREEN)
+        add_kpi_box(slide, 7.2, 0.95, 2.2, 0.9, f"€{data['total']['avg_cpa']:.2f}".replace('.', ','), "⌀ CPA", LIGHT_ORANGE)
+
+        # KPI Row 2
+        add_kpi_box(slide, 0.3, 2.0, 2.2, 0.9, format_number(data['total']['total_jobs']), "Jobs", LIGHT_PURPLE)
+        add_kpi_box(slide, 2.6, 2.0, 2.2, 0.9, format_number(data['total']['page_views']), "Stellenaufrufe", LIGHT_BLUE)
+        add_kpi_box(slide, 4.9, 2.0, 2.2, 0.9, format_number(data['total']['applications_started']), "Bew. gestartet", LIGHT_BLUE)
+        add_kpi_box(slide, 7.2, 2.0, 2.2, 0.9, format_number(data['total']['applications_sent']), "Bew. gesendet", LIGHT_GREEN)
+
+        # Key insights
+        add_textbox(slide, 0.3, 3.1, 9, 0.3, f"{' vs '.join(labels.values())}:",
+                    font_size=11, bold=True, color=RGBColor(0, 0, 0))
+
+        insights = "\n".join(
+            f"{labels[key]}: {format_number(p['total_jobs'])} Jobs  |  CPA €{p['avg_cpa']:.2f}  |  "
+            f"{format_number(p['applications_sent'])} Bewerbungen  |  {p['conversion_rate']:.0f}% Conversion"
+            for key, p in products.items()).replace('.', ',')
+
+        if not markers:
+            add_textbox(slide, 0.3, 3.4, 9, 1.2, insights,
+                        font_size=9, bold=False, color=HEYJOBS_DARK)
+            return
+
+        # Insights box fitted to its lines, the benchmark lines right below it
+        insights_height = text_height(insights.split("\n"), 9, 9)
+        add_textbox(slide, 0.3, 3.4, 9, insights_height, insights,
+                    font_size=9, bold=False, color=HEYJOBS_DARK)
+        lines = [f"Benchmark (Stand {benchmarks_date}):"]
+        for key in product_keys:
+            if key in markers:
+                lines.append(f"{labels[key]}: " + "  |  ".join(benchmark_text(key)))
+        add_textbox(slide, 0.3, 3.4 + insights_height, 9, text_height(lines, 8, 9), "\n".join(lines),
+                    font_size=8, bold=False, color=HEYJOBS_GRAY)
 
     # ============================================================
     # SLIDE 4: Budget Details by Product
     # ============================================================
-    slide = prs.slides.add_slide(LAYOUT_CONTENT)
-    clear_placeholders(slide)
-
-    add_textbox(slide, 0.3, 0.2, 9, 0.5, "Budget-Übersicht nach Produkt",
-                font_size=18, bold=True, color=RGBColor(0, 0, 0))
-
-    # REACH Budget
-    add_textbox(slide, 0.3, 0.7, 4.5, 0.3, "REACH", font_size=14, bold=True, color=HEYJOBS_PURPLE)
-    reach_fin = [
-        ["Metrik", "Betrag (EUR)"],
-        ["Gebuchtes Budget", format_currency(reach['booked_budget'])],
-        ["Genutztes Budget", format_currency(reach['used_budget'])],
-        ["Verfügbares Budget", format_currency(reach['available_budget'])],
-    ]
-    add_table(slide, 0.3, 1.0, 4.5, 1.6, reach_fin)
-
-    # HIRE Budget
-    add_textbox(slide, 5.0, 0.7, 4.5, 0.3, "HIRE", font_size=14, bold=True, color=LIGHT_ORANGE)
-    hire_fin = [
-        ["Metrik", "Betrag (EUR)"],
-        ["Gebuchtes Budget", format_currency(hire['booked_budget'])],
-        ["Genutztes Budget", format_currency(hire['used_budget'])],
-        ["Verfügbares Budget", format_currency(hire['available_budget'])],
-    ]
-    add_table(slide, 5.0, 1.0, 4.5, 1.6, hire_fin, header_color=LIGHT_ORANGE)
-
-    # Performance comparison
-    add_textbox(slide, 0.3, 2.8, 9, 0.3, "Performance Vergleich", font_size=14, bold=True, color=RGBColor(0, 0, 0))
-    perf_compare = [
-        ["Metrik", "REACH", "HIRE"],
-        ["Jobs", format_number(reach['total_jobs']), format_number(hire['total_jobs'])],
-        ["Stellenaufrufe", format_number(reach['page_views']), format_number(hire['page_views'])],
-        ["Bewerbungsstarts", format_number(reach['applications_started']), format_number(hire['applications_started'])],
-        ["Gesendete Bewerbungen", format_number(reach['applications_sent']), format_number(hire['applications_sent'])],
-        ["⌀ CPA", f"€{reach['avg_cpa']:.2f}".replace('.', ','), f"€{hire['avg_cpa']:.2f}".replace('.', ',')],
-    ]
-    add_table(slide, 0.3, 3.1, 9.4, 2.2, perf_compare)
-
-    # ============================================================
-    # SLIDE 5: Section - REACH Performance
-    # ============================================================
-    slide = prs.slides.add_slide(LAYOUT_SECTION)
-    clear_placeholders(slide)
-    add_textbox(slide, 0.5, 2.2, 9, 0.8, "2. REACH Performance",
-                font_size=28, bold=True, color=RGBColor(255, 255, 255), align=PP_ALIGN.LEFT)
+    def build_budget_details(slide):
+        add_textbox(slide, 0.3, 0.2, 9, 0.5, "Budget-Übersicht nach Produkt",
+                    font_size=18, bold=True, color=RGBColor(0, 0, 0))
+
+        # Budget table per product, side by side
+        lefts, width = columns(len(product_keys), 4.5)
+        for key, left in zip(product_keys, lefts):
+            p = products[key]
+            accent = styles[key]["accent"]
+            add_textbox(slide, left, 0.7, width, 0.3, labels[key], font_size=14, bold=True, color=accent)
+            fin = [
+                ["Metrik", "Betrag (EUR)"],
+                ["Gebuchtes Budget", format_currency(p['booked_budget'])],
+                ["Genutztes Budget", format_currency(p['used_budget'])],
+                ["Verfügbares Budget", format_currency(p['available_budget'])],
+            ]
+            add_table(slide, left, 1.0, width, 1.6, fin, header_color=accent)
+
+        # Performance comparison
+        add_textbox(slide, 0.3, 2.8, 9, 0.3, "Performance Vergleich", font_size=14, bold=True, color=RGBColor(0, 0, 0))
+        perf_compare = [
+            ["Metrik"] + list(labels.values()),
+            ["Jobs"] + [format_number(p['total_jobs']) for p in products.values()],
+            ["Stellenaufrufe"] + [format_number(p['page_views']) for p in products.values()],
+            ["Bewerbungsstarts"] + [format_number(p['applications_started']) for p in products.values()],
+            ["Gesendete Bewerbungen"] + [format_number(p['applications_sent']) for p in products.values()],
+            ["⌀ CPA"] + [f"€{p['avg_cpa']:.2f}".replace('.', ',') for p in products.values()],
+        ]
+        add_table(slide, 0.3, 3.1, 9.4, 2.2, perf_compare)
 
     # ============================================================
-    # SLIDE 6: REACH CPA Chart
+    # Product sections (one per product): CPA Chart
     # ============================================================
-    if reach['monthly_cpa']:
-        slide = prs.slides.add_slide(LAYOUT_CONTENT)
-        clear_placeholders(slide)
-
-        add_textbox(slide, 0.3, 0.15, 7, 0.4, "REACH: CPA Trending",
+    def build_product_cpa(slide, key):
+        p = products[key]
+        style = styles[key]
+        add_textbox(slide, 0.3, 0.15, 7, 0.4, f"{labels[key]}: CPA Trending",
                     font_size=16, bold=True, color=RGBColor(0, 0, 0))
 
         # Average CPA badge
         shape = slide.shapes.add_shape(MSO_SHAPE.ROUNDED_RECTANGLE, Inches(7.8), Inches(0.1), Inches(1.8), Inches(0.45))
         shape.fill.solid()
-        shape.fill.fore_color.rgb = HEYJOBS_PURPLE
+        shape.fill.fore_color.rgb = style["accent"]
         shape.line.fill.background()
-        add_textbox(slide, 7.8, 0.15, 1.8, 0.35, f"⌀ CPA: €{reach['avg_cpa']:.2f}".replace('.', ','),
+        add_textbox(slide, 7.8, 0.15, 1.8, 0.35, f"⌀ CPA: €{p['avg_cpa']:.2f}".replace('.', ','),
                     font_size=11, bold=True, color=RGBColor(255,255,255), align=PP_ALIGN.CENTER)
 
-        categories = [m[0] for m in reach['monthly_cpa']]
-        cpa_values = tuple(m[1] for m in reach['monthly_cpa'])
-        jobs_values = tuple(m[2]/1000 for m in reach['monthly_cpa'])  # Convert to thousands
+        categories = [m[0] for m in p['monthly_cpa']]
+        cpa_values = tuple(m[1] for m in p['monthly_cpa'])
+        thousands = style["jobs_in_thousands"]
+        if thousands is None:
+            thousands = max(m[2] for m in p['monthly_cpa']) >= 1000
+        if thousands:
+            jobs_series = ('Jobs (Tsd.)', tuple(m[2]/1000 for m in p['monthly_cpa']))
+        else:
+            jobs_series = ('Jobs', tuple(m[2] for m in p['monthly_cpa']))
 
         add_line_chart(slide, 0.3, 0.6, 9.4, 4.3, categories,
-                       [('CPA (€)', cpa_values), ('Jobs (Tsd.)', jobs_values)],
-                       [HEYJOBS_CORAL, HEYJOBS_PURPLE])
+                       [('CPA (€)', cpa_values), jobs_series],
+                       [HEYJOBS_CORAL, style["accent"]])
 
     # ============================================================
-    # SLIDE 7: REACH Applications Chart
+    # Product sections (one per product): Applications Chart
     # ============================================================
-    if reach['monthly_apps']:
-        slide = prs.slides.add_slide(LAYOUT_CONTENT)
-        clear_placeholders(slide)
-
-        add_textbox(slide, 0.3, 0.15, 7, 0.4, "REACH: Bewerbungen Trending",
+    def build_product_apps(slide, key):
+        p = products[key]
+        add_textbox(slide, 0.3, 0.15, 7, 0.4, f"{labels[key]}: Bewerbungen Trending",
                     font_size=16, bold=True, color=RGBColor(0, 0, 0))
 
-        categories = [m[0] for m in reach['monthly_apps']]
-        starts = tuple(m[1]/1000 for m in reach['monthly_apps'])
-        sent = tuple(m[2]/1000 for m in reach['monthly_apps'])
+        categories = [m[0] for m in p['monthly_apps']]
+        starts = tuple(m[1]/1000 for m in p['monthly_apps'])
+        sent = tuple(m[2]/1000 for m in p['monthly_apps'])
 
         add_line_chart(slide, 0.3, 0.55, 6.5, 4.3, categories,
                        [('Bewerbungsstarts (Tsd.)', starts), ('Gesendete Bew. (Tsd.)', sent)],
-                       [HEYJOBS_PURPLE, HEYJOBS_TEAL])
+                       [styles[key]["accent"], HEYJOBS_TEAL])
 
         # Summary stats
-        add_textbox(slide, 7.0, 0.6, 2.8, 0.35, "REACH Summen",
+        add_textbox(slide, 7.0, 0.6, 2.8, 0.35, f"{labels[key]} Summen",
                     font_size=12, bold=True, color=RGBColor(0, 0, 0))
         stats_text = f"""Bew. gestartet:
-{format_number(reach['applications_started'])}
+{format_number(p['applications_started'])}
 
 Bew. gesendet:
-{format_number(reach['applications_sent'])}
+{format_number(p['applications_sent'])}
 
 ⌀ Conversion:
-{reach['conversion_rate']:.1f}%""".replace('.', ',')
+{p['conversion_rate']:.1f}%""".replace('.', ',')
         add_textbox(slide, 7.0, 1.0, 2.8, 4.0, stats_text, font_size=10, bold=False, color=HEYJOBS_DARK)
 
     # ============================================================
-    # SLIDE 8: Section - HIRE Performance
-    # ============================================================
-    slide = prs.slides.add_slide(LAYOUT_SECTION)
-    clear_placeholders(slide)
-    add_textbox(slide, 0.5, 2.2, 9, 0.8, "3. HIRE Performance",
-                font_size=28, bold=True, color=RGBColor(255, 255, 255), align=PP_ALIGN.LEFT)
-
-    # ============================================================
-    # SLIDE 9: HIRE CPA Chart
+    # Summary: Performance Summary Dashboard (Minimalistic)
     # ============================================================
-    if hire['monthly_cpa']:
-        slide = prs.slides.add_slide(LAYOUT_CONTENT)
-        clear_placeholders(slide)
-
-        add_textbox(slide, 0.3, 0.15, 7, 0.4, "HIRE: CPA Trending",
-                    font_size=16, bold=True, color=RGBColor(0, 0, 0))
-
-        # Average CPA badge
-        shape = slide.shapes.add_shape(MSO_SHAPE.ROUNDED_RECTANGLE, Inches(7.8), Inches(0.1), Inches(1.8), Inches(0.45))
-        shape.fill.solid()
-        shape.fill.fore_color.rgb = LIGHT_ORANGE
-        shape.line.fill.background()
-        add_textbox(slide, 7.8, 0.15, 1.8, 0.35, f"⌀ CPA: €{hire['avg_cpa']:.2f}".replace('.', ','),
-                    font_size=11, bold=True, color=RGBColor(255,255,255), align=PP_ALIGN.CENTER)
-
-        categories = [m[0] for m in hire['monthly_cpa']]
-        cpa_values = tuple(m[1] for m in hire['monthly_cpa'])
-        jobs_values = tuple(m[2] for m in hire['monthly_cpa'])
-
-        add_line_chart(slide, 0.3, 0.6, 9.4, 4.3, categories,
-                       [('CPA (€)', cpa_values), ('Jobs', jobs_values)],
-                       [HEYJOBS_CORAL, LIGHT_ORANGE])
+    def build_summary_dashboard(slide):
+        add_textbox(slide, 0.3, 0.2, 9, 0.5, f"Gesamtperformance - {' vs '.join(labels.values())}",
+                    font_size=18, bold=True, color=RGBColor(0, 0, 0))
+
+        # KPIs per product, side by side
+        lefts, width = columns(len(product_keys), 4.6)
+        box = round((width - 0.2) / 2, 2)
+        kpi_values = {key: (format_number(p['total_jobs']), format_number(p['applications_sent']),
+                            f"{p['conversion_rate']:.1f}%".replace('.', ','), f"€{p['avg_cpa']:.2f}".replace('.', ','))
+                      for key, p in products.items()}
+        kpi_labels = ("Jobs", "Bew. gesendet", "Conversion", "⌀ CPA")
+        # With more products the boxes get narrower; all boxes share one size so they stay comparable
+        sizes = {"value_size": fit_font_size([v for values in kpi_values.values() for v in values], box, 24),
+                 "label_size": fit_font_size(kpi_labels, box, 10, em=0.5)}
+        for key, left in zip(product_keys, lefts):
+            right = round(left + box + 0.1, 2)
+            jobs, sent, conversion, cpa = kpi_values[key]
+            jobs_color, sent_color, conversion_color, cpa_color = styles[key]["kpi_colors"]
+            add_textbox(slide, left, 0.6, width, 0.3, labels[key], font_size=13, bold=True, color=styles[key]["light"])
+            add_kpi_box(slide, left, 0.9, box, 0.9, jobs, kpi_labels[0], jobs_color, **sizes)
+            add_kpi_box(slide, right, 0.9, box, 0.9, sent, kpi_labels[1], sent_color, **sizes)
+            add_kpi_box(slide, left, 1.95, box, 0.9, conversion, kpi_labels[2], conversion_color, **sizes)
+            add_kpi_box(slide, right, 1.95, box, 0.9, cpa, kpi_labels[3], cpa_color, **sizes)
+
+        # Footer
+        add_textbox(slide, 0.3, 3.1, 9.4, 0.3,
+                    f"Zeitraum: {data['date_from']} - {data['date_to']} | Account: {data['account_name']}",
+                    font_size=8, bold=False, color=HEYJOBS_GRAY, align=PP_ALIGN.CENTER)
+
+        # Peer comparison under each product's KPIs
+        for key, left in zip(product_keys, lefts):
+            if key in markers:
+                add_textbox(slide, left, 3.5, width, 0.6,
+                            "\n".join(benchmark_text(key) + [f"Benchmark Stand {benchmarks_date}"]),
+                            font_size=8, bold=False, color=HEYJOBS_GRAY)
 
     # ============================================================
-    # SLIDE 10: HIRE Applications Chart
+    # Slide plan: (key, layout, inputs the slide depends on, builder)
     # ============================================================
-    if hire['monthly_apps']:
-        slide = prs.slides.add_slide(LAYOUT_CONTENT)
-        clear_placeholders(slide)
-
-        add_textbox(slide, 0.3, 0.15, 7, 0.4, "HIRE: Bewerbungen Trending",
-                    font_size=16, bold=True, color=RGBColor(0, 0, 0))
-
-        categories = [m[0] for m in hire['monthly_apps']]
-        starts = tuple(m[1]/1000 for m in hire['monthly_apps'])
-        sent = tuple(m[2]/1000 for m in hire['monthly_apps'])
-
-        add_line_chart(slide, 0.3, 0.55, 6.5, 4.3, categories,
-                       [('Bewerbungsstarts (Tsd.)', starts), ('Gesendete Bew. (Tsd.)', sent)],
-                       [LIGHT_ORANGE, HEYJOBS_TEAL])
-
-        # Summary stats
-        add_textbox(slide, 7.0, 0.6, 2.8, 0.35, "HIRE Summen",
-                    font_size=12, bold=True, color=RGBColor(0, 0, 0))
-        stats_text = f"""Bew. gestartet:
-{format_number(hire['applications_started'])}
-
-Bew. gesendet:
-{format_number(hire['applications_sent'])}
+    header = {k: data[k] for k in ('account_name', 'date_from', 'date_to', 'time_range_months')}
+    kpis = {key: {k: v for k, v in p.items() if not k.startswith('monthly_')} for key, p in products.items()}
+    # Benchmark markers only enter the hashes when shown, so reports without them keep their hashes
+    benchmark_inputs = [markers, benchmarks_date] if markers else []
+
+    plan = [
+        ("title", LAYOUT_TITLE, header, build_title),
+        ("executive_summary", LAYOUT_CONTENT,
+         [data['time_range_months'], data['total']] + list(kpis.values()) + benchmark_inputs,
+         build_executive_summary),
+        ("section_budget", LAYOUT_SECTION, "1. Budget-Übersicht",
+         lambda slide: add_section_title(slide, "1. Budget-Übersicht")),
+        ("budget_details", LAYOUT_CONTENT, list(kpis.values()), build_budget_details),
+    ]
+    # Slide keys of each product's section, in order
+    section_keys = {}
+    for number, key in enumerate(product_keys, 2):
+        title = f"{number}. {labels[key]} Performance"
+        section = [(f"section_{key}", LAYOUT_SECTION, title, lambda slide, title=title: add_section_title(slide, title))]
+        if products[key]['monthly_cpa']:
+            section.append((f"{key}_cpa", LAYOUT_CONTENT, [products[key]['avg_cpa'], products[key]['monthly_cpa']],
+                            lambda slide, key=key: build_product_cpa(slide, key)))
+        if products[key]['monthly_apps']:
+            section.append((f"{key}_apps", LAYOUT_CONTENT, [kpis[key], products[key]['monthly_apps']],
+                            lambda slide, key=key: build_product_apps(slide, key)))
+        section_keys[key] = [entry[0] for entry in section]
+        plan.extend(section)
+    summary_title = f"{len(product_keys) + 2}. Performance Zusammenfassung"
+    plan.append(("section_summary", LAYOUT_SECTION, summary_title,
+                 lambda slide: add_section_title(slide, summary_title)))
+    plan.append(("summary_dashboard", LAYOUT_CONTENT, [header] + list(kpis.values()) + benchmark_inputs,
+                 build_summary_dashboard))
+
+    # Incremental mode: reuse slides whose inputs did not change since the previous output
+    previous = {}
+    manifest_path = None
+    fingerprint = template_fingerprint(template_path)
+    if incremental and isinstance(output_path, str):
+        manifest_path = os.path.splitext(output_path)[0] + ".manifest.json"
+        previous = load_previous_slides(output_path, manifest_path, fingerprint, chart_workbooks)
+
+    if sections is not None:
+        # Worker of build_product_sections(): only these products' section slides
+        wanted = {key for product in sections for key in section_keys[product]}
+        plan = [entry for entry in plan if entry[0] in wanted]
+
+    digests = {key: slide_hash(key, inputs) for key, _, inputs, _ in plan}
+
+    def reusable(key):
+        return previous.get(key) is not None and previous[key][0] == digests[key]
+
+    # Product sections to build in worker processes while this one builds the other slides. Shared
+    # workbooks need every chart's data in this process, so that mode builds all slides here.
+    futures = {}
+    if product_workers is not None and sections is None and chart_workbooks != "shared":
+        pending = [product for product in product_keys
+                   if not all(reusable(key) for key in section_keys[product])]
+        if len(pending) > 1:
+            options = {"fast": fast, "chart_workbooks": chart_workbooks,
+                       "max_chart_points": max_chart_points, "downsample": downsample}
+            futures = {product: product_workers.submit(build_product_sections, data, template_path, [product],
+                                                       options)
+                       for product in pending}
+
+    # Slides built by workers, per product: {slide key: slide}
+    worker_slides = {}
+    section_product = {key: product for product, keys in section_keys.items() for key in keys}
+
+    def worker_slide(key):
+        from pptx import Presentation
+
+        product = section_product[key]
+        if product not in worker_slides:
+            with stage(f"wait_{product}", "sections"):
+                worker_prs = Presentation(io.BytesIO(futures[product].result()))
+            worker_slides[product] = dict(zip(section_keys[product], worker_prs.slides))
+        return worker_slides[product][key]
+
+    manifest = {"version": MANIFEST_VERSION, "template": fingerprint, "chart_workbooks": chart_workbooks,
+                "slides": []}
+    reused = 0
+    try:
+        for key, layout, inputs, build in plan:
+            with stage(key, "slide"):
+                slide = prs.slides.add_slide(layout)
+                if reusable(key):
+                    copy_slide_content(previous[key][1], slide)
+                    reused += 1
+                    if chart_workbooks == "shared":
+                        shared_charts.extend((rel.target_part, None) for rel in slide.part.rels.values()
+                                             if rel.reltype == RT.CHART)
+                elif section_product.get(key) in futures:
+                    copy_slide_content(worker_slide(key), slide)
+                else:
+                    clear_placeholders(slide)
+                    build(slide)
+            manifest["slides"].append({"key": key, "hash": digests[key]})
+    finally:
+        # The executor is the caller's; only drop what is still queued for this report
+        for future in futures.values():
+            future.cancel()
+    # Only rebuilt when a chart changed; reused charts then move into the new workbook with their cached values
+    if any(chart_data is not None for _, chart_data in shared_charts):
+        with stage("embed_workbooks"):
+            embed_shared_workbook(prs.part.package, [
+                (chart_part, chart_data if chart_data is not None else cached_chart_data(chart_part.chart))
+                for chart_part, chart_data in shared_charts])
+
+    if slim:
+        from package_slimming import slim_package
+        with stage("slim"):
+            slim_package(prs)
+
+    # Save presentation (output_path may also be a writable binary stream)
+    with stage("save"):
+        if fast or compresslevel is not None:
+            from ooxml_writer import write_package
+            write_package(prs, output_path, compresslevel)
+        else:
+            prs.save(output_path)
+    if isinstance(output_path, str):
+        print(f"Report saved to: {output_path}")
+    if manifest_path:
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        print(f"Reused {reused} of {len(plan)} slides from the previous report")
+    return output_path
 
-⌀ Conversion:
-{hire['conversion_rate']:.1f}%""".replace('.', ',')
-        add_textbox(slide, 7.0, 1.0, 2.8, 4.0, stats_text, font_size=10, bold=False, color=HEYJOBS_DARK)
 
-    # ============================================================
-    # SLIDE 11: Section - Performance Summary
-    # ============================================================
-    slide = prs.slides.add_slide(LAYOUT_SECTION)
-    clear_placeholders(slide)
-    add_textbox(slide, 0.5, 2.2, 9, 0.8, "4. Performance Zusammenfassung",
-                font_size=28, bold=True, color=RGBColor(255, 255, 255), align=PP_ALIGN.LEFT)
+def build_product_sections(data, template_path, product_keys, options):
+    """Build only the section slides of the given products and return the saved package as bytes.
 
-    # ============================================================
-    # SLIDE 12: Performance Summary Dashboard (Minimalistic)
-    # ============================================================
-    slide = prs.slides.add_slide(LAYOUT_CONTENT)
-    clear_placeholders(slide)
-
-    add_textbox(slide, 0.3, 0.2, 9, 0.5, "Gesamtperformance - REACH vs HIRE",
-                font_size=18, bold=True, color=RGBColor(0, 0, 0))
-
-    # REACH KPIs
-    add_textbox(slide, 0.3, 0.6, 4.6, 0.3, "REACH", font_size=13, bold=True, color=LIGHT_PURPLE)
-    add_kpi_box(slide, 0.3, 0.9, 2.2, 0.9, format_number(reach['total_jobs']), "Jobs", LIGHT_PURPLE)
-    add_kpi_box(slide, 2.6, 0.9, 2.2, 0.9, format_number(reach['applications_sent']), "Bew. gesendet", LIGHT_BLUE)
-    add_kpi_box(slide, 0.3, 1.95, 2.2, 0.9, f"{reach['conversion_rate']:.1f}%".replace('.', ','), "Conversion", LIGHT_TEAL)
-    add_kpi_box(slide, 2.6, 1.95, 2.2, 0.9, f"€{reach['avg_cpa']:.2f}".replace('.', ','), "⌀ CPA", LIGHT_GREEN)
-
-    # HIRE KPIs
-    add_textbox(slide, 5.1, 0.6, 4.6, 0.3, "HIRE", font_size=13, bold=True, color=LIGHT_ORANGE)
-    add_kpi_box(slide, 5.1, 0.9, 2.2, 0.9, format_number(hire['total_jobs']), "Jobs", LIGHT_ORANGE)
-    add_kpi_box(slide, 7.4, 0.9, 2.2, 0.9, format_number(hire['applications_sent']), "Bew. gesendet", LIGHT_CORAL)
-    add_kpi_box(slide, 5.1, 1.95, 2.2, 0.9, f"{hire['conversion_rate']:.1f}%".replace('.', ','), "Conversion", LIGHT_CORAL)
-    add_kpi_box(slide, 7.4, 1.95, 2.2, 0.9, f"€{hire['avg_cpa']:.2f}".replace('.', ','), "⌀ CPA", LIGHT_ORANGE)
-
-    # Footer
-    add_textbox(slide, 0.3, 3.1, 9.4, 0.3,
-                f"Zeitraum: {data['date_from']} - {data['date_to']} | Account: {data['account_name']}",
-                font_size=8, bold=False, color=HEYJOBS_GRAY, align=PP_ALIGN.CENTER)
-
-    # Save presentation
-    prs.save(output_path)
-    print(f"Report saved to: {output_path}")
-    return output_path
+    Runs in a worker process of generate_report(product_workers=...);
+    options are the generate_report arguments that affect those slides.
+    """
+    buffer = io.BytesIO()
+    generate_report(data, template_path, buffer, sections=product_keys, compresslevel=0, **options)
+    return buffer.getvalue()
 
 
 if __name__ == "__main__":
     # This script is meant to be called with data populated by Claude
-    # Example usage for testing:
-    if len(sys.argv) < 2:
-        print(__doc__)
-        sys.exit(1)
-
-    # Load data from JSON file if provided
-    data_file = sys.argv[1]
-    with open(data_file, 'r') as f:
-        data = json.load(f)
-
-    template_path = sys.argv[2] if len(sys.argv) > 2 else os.path.expanduser("~/Desktop/Template.pptx")
-    output_path = sys.argv[3] if len(sys.argv) > 3 else os.path.expanduser(f"~/Desktop/{data['account_name']}_Customer_Report.pptx")
-
-    generate_report(data, template_path, output_path)
+    parser = argparse.ArgumentParser(description="Generate a customer performance report.")
+    parser.add_argument("data_file", nargs="?", help="REPORT_DATA JSON or .crd file")
+    parser.add_argument("template_path", nargs="?", default=os.path.expanduser("~/Desktop/Template.pptx"))
+    parser.add_argument("output_path", nargs="?")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse unchanged slides from the previous report at output_path")
+    parser.add_argument("--fast", action="store_true",
+                        help="Write text, KPI boxes and tables as XML directly instead of via python-pptx")
+    parser.add_argument("--chart-workbooks", choices=CHART_WORKBOOK_MODES, default="embedded",
+                        help="Embed a workbook per chart, one shared workbook, or none (cached values only)")
+    parser.add_argument("--profile", choices=("json", "chrome"),
+                        help="Write stage timings next to the report as JSON or a Chrome trace")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="Also record tracemalloc allocation peaks per stage")
+    parser.add_argument("--max-chart-points", type=chart_points, metavar="N",
+                        help="Downsample longer monthly series to this many points (at least 2)")
+    parser.add_argument("--downsample", choices=("lttb", "calendar"), default="lttb",
+                        help="Keep peak-preserving points (lttb) or aggregate into calendar buckets")
+    parser.add_argument("--slim", action="store_true",
+                        help="Leave unused layouts, masters and template extras out and merge identical media")
+    parser.add_argument("--compress-level", type=int, choices=range(10), metavar="0-9",
+                        help="Deflate level of the saved package")
+    parser.add_argument("--benchmarks", metavar="PATH",
+                        help="Benchmark artifact to compare CPA and conversion with (see portfolio_benchmarks.py)")
+    parser.add_argument("--find-account", metavar="NAME",
+                        help="Print ranked account name candidates from the local index and exit")
+    parser.add_argument("--active-since", help="With --find-account: only accounts with data from this date on")
+    parser.add_argument("--account-index", help="Account index file (default: see account_index.py)")
+    args = parser.parse_args()
+
+    if args.find_account:
+        from account_index import DEFAULT_INDEX_PATH, AccountIndex, format_candidates
+        index = AccountIndex(args.account_index or DEFAULT_INDEX_PATH)
+        if not len(index):
+            sys.exit("Account index is empty, run: python account_index.py refresh <source_url>")
+        candidates = index.lookup(args.find_account, active_since=args.active_since)
+        index.close()
+        if not candidates:
+            sys.exit(f"No account matches: {args.find_account}")
+        print(format_candidates(candidates))
+        sys.exit(0)
+    if not args.data_file:
+        parser.error("data_file is required")
+
+    # Load data from a JSON or binary (.crd) file
+    from report_model import read_report_file
+    try:
+        data = read_report_file(args.data_file)
+    except ValueError as e:
+        sys.exit(f"{args.data_file}: {e}")
+
+    output_path = args.output_path or os.path.expanduser(f"~/Desktop/{data['account_name']}_Customer_Report.pptx")
+
+    benchmarks = None
+    if args.benchmarks:
+        from portfolio_benchmarks import DEFAULT_MAX_AGE_DAYS, load_benchmarks
+        try:
+            benchmarks = load_benchmarks(args.benchmarks)
+        except (OSError, ValueError) as e:
+            sys.exit(f"{args.benchmarks}: {e}")
+        if benchmarks.age_days() > DEFAULT_MAX_AGE_DAYS:
+            print(f"Warning: benchmarks are {benchmarks.age_days():.0f} days old, "
+                  f"rebuild with: python portfolio_benchmarks.py build ...", file=sys.stderr)
+
+    profiler = None
+    if args.profile or args.profile_memory:
+        from report_profiling import Profiler
+        profiler = Profiler(memory=args.profile_memory)
+
+    generate_report(data, args.template_path, output_path, incremental=args.incremental, fast=args.fast,
+                    chart_workbooks=args.chart_workbooks, profiler=profiler,
+                    max_chart_points=args.max_chart_points, downsample=args.downsample,
+                    slim=args.slim, compresslevel=args.compress_level, benchmarks=benchmarks)
+
+    if profiler is not None:
+        from report_profiling import write_profile
+        profiler.close()
+        print(f"Profile saved to: {write_profile(profiler, output_path, args.profile or 'json')}")
@@ -18,6 +18,20 @@ mkdir -p "$SKILL_DIR"
 echo "📁 Copying skill files..."
 cp "$SCRIPT_DIR/SKILL.md" "$SKILL_DIR/"
 cp "$SCRIPT_DIR/customer_report_generator.py" "$SKILL_DIR/"
+cp "$SCRIPT_DIR/batch_report.py" "$SKILL_DIR/"
+cp "$SCRIPT_DIR/report_server.py" "$SKILL_DIR/"
+cp "$SCRIPT_DIR/metrics_aggregation.py" "$SKILL_DIR/"
+cp "$SCRIPT_DIR/report_queries.py" "$SKILL_DIR/"
+cp "$SCRIPT_DIR/query_cache.py" "$SKILL_DIR/"
+cp "$SCRIPT_DIR/report_fetch.py" "$SKILL_DIR/"
+cp "$SCRIPT_DIR/account_index.py" "$SKILL_DIR/"
+cp "$SCRIPT_DIR/ooxml_writer.py" "$SKILL_DIR/"
+cp "$SCRIPT_DIR/report_profiling.py" "$SKILL_DIR/"
+cp "$SCRIPT_DIR/series_downsampling.py" "$SKILL_DIR/"
+cp "$SCRIPT_DIR/package_slimming.py" "$SKILL_DIR/"
+cp "$SCRIPT_DIR/report_model.py" "$SKILL_DIR/"
+cp "$SCRIPT_DIR/portfolio_benchmarks.py" "$SKILL_DIR/"
+cp "$SCRIPT_DIR/refresh_scheduler.py" "$SKILL_DIR/"
 
 # Copy template to Desktop
 echo "📄 Copying PowerPoint template..."
@@ -34,6 +48,15 @@ else
     python3 -m pip install python-pptx --user --quiet 2>/dev/null || \
     echo "   ⚠️  Could not install python-pptx automatically. Please run: pip3 install python-pptx"
 fi
+if python3 -c "import numpy" 2>/dev/null; then
+    echo "   ✓ numpy already installed"
+else
+    echo "   Installing numpy..."
+    pip3 install numpy --break-system-packages --quiet 2>/dev/null || \
+    pip3 install numpy --user --quiet 2>/dev/null || \
+    python3 -m pip install numpy --user --quiet 2>/dev/null || \
+    echo "   ⚠️  Could not install numpy automatically. Please run: pip3 install numpy"
+fi
 
 # Clean up old format files if they exist
 echo "🧹 Cleaning up old skill format..."
@@ -49,6 +72,20 @@ echo ""
 echo "📍 Files installed to:"
 echo "   - ~/.claude/skills/customer-report/SKILL.md"
 echo "   - ~/.claude/skills/customer-report/customer_report_generator.py"
+echo "   - ~/.claude/skills/customer-report/batch_report.py"
+echo "   - ~/.claude/skills/customer-report/report_server.py"
+echo "   - ~/.claude/skills/customer-report/metrics_aggregation.py"
+echo "   - ~/.claude/skills/customer-report/report_queries.py"
+echo "   - ~/.claude/skills/customer-report/query_cache.py"
+echo "   - ~/.claude/skills/customer-report/report_fetch.py"
+echo "   - ~/.claude/skills/customer-report/account_index.py"
+echo "   - ~/.claude/skills/customer-report/ooxml_writer.py"
+echo "   - ~/.claude/skills/customer-report/report_profiling.py"
+echo "   - ~/.claude/skills/customer-report/series_downsampling.py"
+echo "   - ~/.claude/skills/customer-report/package_slimming.py"
+echo "   - ~/.claude/skills/customer-report/report_model.py"
+echo "   - ~/.claude/skills/customer-report/portfolio_benchmarks.py"
+echo "   - ~/.claude/skills/customer-report/refresh_scheduler.py"
 echo "   - ~/Desktop/Template.pptx"
 echo ""
 echo "🎯 Usage in Claude Code:"
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Job Metrics Aggregation
+Builds REPORT_DATA from raw rep_job_metrics rows instead of pre-aggregated query results.
+
+Usage:
+    python metrics_aggregation.py <rows_file> <account_name> [output_path] [options]
+
+Arguments:
+    rows_file: CSV, JSONL or Parquet export of rds.rep_job_metrics rows
+    account_name: Ultimate parent company name (rows of other accounts are skipped)
+    output_path: Where to write the REPORT_DATA JSON (default: stdout)
+
+Options:
+    --start-date / --end-date: Only use rows within this date range (YYYY-MM-DD)
+    --budget: JSON file with booked/remaining budget per product,
+              e.g. {"Reach": {"booked": 980085, "remaining": 982200}}
+    --chunk-size: Rows per chunk (default: 100000)
+
+Rows are read in chunks and folded into per product/month sums with NumPy,
+so memory stays flat no matter how many rows the export has. Only the set of
+distinct job ids per product and month is kept, which is what exact
+COUNT(DISTINCT job_id) needs.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import datetime
+from itertools import islice
+
+import numpy as np
+
+PRODUCT_TYPES = ('Reach', 'Hire')
+
+# Raw columns needed from rds.rep_job_metrics
+ROW_COLUMNS = (
+    'ultimate_parent_company_name',
+    'product_type',
+    'date_dt',
+    'job_id',
+    'pageviews',
+    'active_application_start_count',
+    'passive_application_start_count',
+    'active_application_sent_count',
+    'passive_application_sent_count',
+    'net_revenue_eur',
+)
+
+# Summed metrics, in the order they are stored per product/month
+SUM_METRICS = ('page_views', 'applications_started', 'applications_sent', 'spend')
+
+
+def _numeric(values):
+    """Convert a column to float64, treating empty values as 0."""
+    try:
+        array = np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        array = np.array([float(v) if v not in ('', None) else 0.0 for v in values], dtype=np.float64)
+    return np.nan_to_num(array, copy=False)
+
+
+def _job_id(value):
+    """Return one job id as a string ('' if it is empty), numeric ids written as integers."""
+    if value is None:
+        return ''
+    if isinstance(value, (int, np.integer)):
+        return str(int(value))
+    if isinstance(value, str):
+        value = value.strip()
+        if value.lstrip('-').isdigit():
+            return str(int(value))
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return str(value)
+    if np.isnan(number):
+        return ''
+    return str(int(number)) if number.is_integer() else str(value)
+
+
+def _job_ids(values):
+    """Return (job ids as strings, mask of rows that have one).
+
+    Ids are always strings, numeric ones written as integers, so 2, 2.0 and '2'
+    are one job whichever chunk they come from. Rows without an id (None, NaN
+    or empty) are left out of the job counts, as in COUNT(DISTINCT job_id).
+    """
+    array = np.asarray(values)
+    if array.dtype.kind in 'iu':
+        return array.astype(str), np.ones(len(array), dtype=bool)
+    if array.dtype.kind == 'f':
+        present = ~np.isnan(array)
+        return np.where(present, np.nan_to_num(array).astype(np.int64).astype(str), ''), present
+    try:
+        return array.astype(np.int64).astype(str), np.ones(len(array), dtype=bool)
+    except (TypeError, ValueError):
+        ids = np.array([_job_id(value) for value in array.tolist()], dtype=str)
+        return ids, ids != ''
+
+
+class MetricsAccumulator:
+    """Folds chunks of raw job metric rows into per product/month aggregates."""
+
+    def __init__(self, account_name=None, start_date=None, end_date=None, product_types=PRODUCT_TYPES):
+        self.account_name = account_name
+        self.start_date = start_date
+        self.end_date = end_date
+        self.product_types = tuple(product_types)
+        self.rows_read = 0
+        self.rows_used = 0
+        self._sums = {}          # (product, month) -> np.array of SUM_METRICS
+        self._month_jobs = {}    # (product, month) -> set of job ids
+        self._product_jobs = {}  # product -> set of job ids
+
+    def add_chunk(self, chunk):
+        """Add one chunk of rows, given as a dict of column name -> sequence."""
+        products = np.asarray(chunk['product_type'], dtype=object)
+        self.rows_read += len(products)
+        dates = np.asarray(chunk['date_dt']).astype('U10')
+        keep = np.isin(products, self.product_types)
+        if self.account_name is not None and 'ultimate_parent_company_name' in chunk:
+            keep &= np.asarray(chunk['ultimate_parent_company_name'], dtype=object) == self.account_name
+        if self.start_date:
+            keep &= dates >= self.start_date
+        if self.end_date:
+            keep &= dates <= self.end_date
+        if not keep.any():
+            return
+        self.rows_used += int(keep.sum())
+
+        product_names, product_idx = np.unique(products[keep].astype(str), return_inverse=True)
+        month_names, month_idx = np.unique(dates[keep].astype('U7'), return_inverse=True)
+        group = product_idx * len(month_names) + month_idx
+        n_groups = len(product_names) * len(month_names)
+
+        metrics = {
+            'page_views': _numeric(chunk['pageviews'])[keep],
+            'applications_started': (_numeric(chunk['active_application_start_count'])
+                                     + _numeric(chunk['passive_application_start_count']))[keep],
+            'applications_sent': (_numeric(chunk['active_application_sent_count'])
+                                  + _numeric(chunk['passive_application_sent_count']))[keep],
+            'spend': _numeric(chunk['net_revenue_eur'])[keep],
+        }
+        sums = np.stack([np.bincount(group, weights=metrics[name], minlength=n_groups) for name in SUM_METRICS],
+                        axis=1)
+        present = np.bincount(group, minlength=n_groups) > 0
+
+        # Distinct (group, job) pairs of this chunk, sorted by group
+        job_ids, has_job = _job_ids(chunk['job_id'])
+        with_job = has_job[keep]
+        job_values, job_idx = np.unique(job_ids[keep][with_job], return_inverse=True)
+        n_jobs = max(len(job_values), 1)
+        pairs = np.unique(group[with_job].astype(np.int64) * n_jobs + job_idx)
+        pair_groups = pairs // n_jobs
+        pair_jobs = job_values[pairs % n_jobs]
+        bounds = np.searchsorted(pair_groups, np.arange(n_groups + 1))
+
+        for g in np.flatnonzero(present):
+            key = (str(product_names[g // len(month_names)]), str(month_names[g % len(month_names)]))
+            if key in self._sums:
+                self._sums[key] += sums[g]
+            else:
+                self._sums[key] = sums[g].copy()
+            jobs = pair_jobs[bounds[g]:bounds[g + 1]].tolist()
+            self._month_jobs.setdefault(key, set()).update(jobs)
+            self._product_jobs.setdefault(key[0], set()).update(jobs)
+
+    def monthly(self):
+        """Return {product: {month: metrics}} with exact distinct job counts."""
+        result = {}
+        for (product, month), sums in sorted(self._sums.items()):
+            metrics = dict(zip(SUM_METRICS, sums.tolist()))
+            metrics['jobs'] = len(self._month_jobs[(product, month)])
+            result.setdefault(product, {})[month] = metrics
+        return result
+
+    def totals(self):
+        """Return {product: metrics} over the whole range with exact distinct job counts."""
+        result = {}
+        for product, months in self.monthly().items():
+            metrics = {name: sum(m[name] for m in months.values()) for name in SUM_METRICS}
+            metrics['jobs'] = len(self._product_jobs[product])
+            result[product] = metrics
+        return result
+
+    def to_report_data(self, account_name=None, budget=None):
+        """Return the REPORT_DATA dict for everything added so far."""
+        start_month = self.start_date[:7] if self.start_date else None
+        end_month = self.end_date[:7] if self.end_date else None
+        return build_report_data(account_name or self.account_name or '', self.totals(), self.monthly(),
+                                 budget=budget, product_types=self.product_types,
+                                 start_month=start_month, end_month=end_month)
+
+
+class MetricsRollup:
+    """Builds totals and monthly metrics from the single-scan job metrics query (see report_queries.py).
+
+    Rows of REPORT_METRICS already carry both levels, the totals being the rows
+    without a month. Rows of JOB_MONTH_METRICS are per product, month and job;
+    their sums are added up here, and the distinct job counts come from the job
+    ids, so totals count a job running in several months once.
+
+    Rows are stored by key rather than added, so a row passed again (by a
+    retried query) does not count twice. The row of rows without a job id
+    (job_id None) adds to the sums but is not a job, as in COUNT(DISTINCT).
+    """
+
+    def __init__(self):
+        self._totals = {}      # product -> metrics, from REPORT_METRICS
+        self._monthly = {}     # product -> {month: metrics}, from REPORT_METRICS
+        self._job_months = {}  # (product, month) -> {job_id: SUM_METRICS values}, from JOB_MONTH_METRICS
+
+    def add_grouped(self, row):
+        """Add a REPORT_METRICS row: (product, month or None, jobs, page_views, started, sent, spend)."""
+        product, month, jobs, *sums = row
+        metrics = {name: value or 0 for name, value in zip(SUM_METRICS, sums)}
+        metrics['jobs'] = jobs or 0
+        if month is None:
+            self._totals[product] = metrics
+        else:
+            self._monthly.setdefault(product, {})[month] = metrics
+
+    def add_job_month(self, row):
+        """Add a JOB_MONTH_METRICS row: (product, month, job_id, page_views, started, sent, spend)."""
+        product, month, job_id, *sums = row
+        self._job_months.setdefault((product, month), {})[job_id] = [value or 0 for value in sums]
+
+    def monthly(self):
+        """Return {product: {month: metrics}} with exact distinct job counts."""
+        result = {product: dict(months) for product, months in self._monthly.items()}
+        for (product, month), jobs in sorted(self._job_months.items()):
+            metrics = {name: sum(values[i] for values in jobs.values()) for i, name in enumerate(SUM_METRICS)}
+            metrics['jobs'] = len(jobs) - (None in jobs)
+            result.setdefault(product, {})[month] = metrics
+        return result
+
+    def totals(self):
+        """Return {product: metrics} over the whole range with exact distinct job counts."""
+        result = dict(self._totals)
+        product_jobs = {}
+        for (product, _), jobs in self._job_months.items():
+            product_jobs.setdefault(product, set()).update(job_id for job_id in jobs if job_id is not None)
+        for product, months in self.monthly().items():
+            if product in result or product not in product_jobs:
+                continue
+            metrics = {name: sum(m[name] for m in months.values()) for name in SUM_METRICS}
+            metrics['jobs'] = len(product_jobs[product])
+            result[product] = metrics
+        return result
+
+
+def _month_label(month, fmt):
+    return datetime.strptime(month, '%Y-%m').strftime(fmt)
+
+
+def _cpa(spend, sent):
+    return round(spend / sent, 2) if sent > 0 else 0
+
+
+def _conversion(started, sent):
+    return round(100.0 * sent / started, 1) if started > 0 else 0
+
+
+def build_report_data(account_name, totals, monthly, budget=None, product_types=PRODUCT_TYPES,
+                      start_month=None, end_month=None):
+    """Assemble the REPORT_DATA dict from aggregated metrics.
+
+    totals: {product: {"jobs", "page_views", "applications_started", "applications_sent", "spend"}}
+    monthly: {product: {"YYYY-MM": same keys as totals}}
+    budget: {product: {"booked": ..., "remaining": ...}} from rds.rep_accounting
+    """
+    budget = budget or {}
+    months = sorted({m for product in monthly.values() for m in product})
+    start_month = start_month or (months[0] if months else None)
+    end_month = end_month or (months[-1] if months else None)
+    if start_month and end_month:
+        start = datetime.strptime(start_month, '%Y-%m')
+        end = datetime.strptime(end_month, '%Y-%m')
+        time_range_months = (end.year - start.year) * 12 + end.month - start.month + 1
+    else:
+        time_range_months = 0
+
+    data = {
+        "account_name": account_name,
+        "time_range_months": time_range_months,
+        "date_from": _month_label(start_month, '%b %Y') if start_month else "",
+        "date_to": _month_label(end_month, '%b %Y') if end_month else "",
+    }
+    total = dict.fromkeys(("booked_budget", "used_budget", "available_budget", "total_jobs", "page_views",
+                           "applications_started", "applications_sent"), 0)
+    for product in product_types:
+        t = totals.get(product, {})
+        b = budget.get(product, {})
+        sent = t.get('applications_sent', 0)
+        started = t.get('applications_started', 0)
+        block = {
+            "booked_budget": round(b.get('booked', 0), 2),
+            "used_budget": round(t.get('spend', 0), 2),
+            "available_budget": round(b.get('remaining', 0), 2),
+            "total_jobs": int(t.get('jobs', 0)),
+            "page_views": int(t.get('page_views', 0)),
+            "applications_started": int(started),
+            "applications_sent": int(sent),
+            "avg_cpa": _cpa(t.get('spend', 0), sent),
+            "conversion_rate": _conversion(started, sent),
+            "monthly_cpa": [],
+            "monthly_apps": [],
+        }
+        for month, m in sorted(monthly.get(product, {}).items()):
+            label = _month_label(month, '%m/%y')
+            block["monthly_cpa"].append([label, _cpa(m['spend'], m['applications_sent']), int(m['jobs'])])
+            block["monthly_apps"].append([label, int(m['applications_started']), int(m['applications_sent'])])
+        for key in total:
+            total[key] += block[key]
+        data[product.lower()] = block
+
+    if tuple(product_types) != PRODUCT_TYPES:
+        # Product sections of the report follow this list (see report_model.py)
+        data["products"] = [product.lower() for product in product_types]
+    for key in ("booked_budget", "used_budget", "available_budget"):
+        total[key] = round(total[key], 2)
+    total["avg_cpa"] = _cpa(total["used_budget"], total["applications_sent"])
+    data["total"] = total
+    return data
+
+
+def iter_chunks(path, chunk_size=100000):
+    """Yield chunks of rows ({column: list}) from a CSV, JSONL or Parquet file."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet requires pyarrow: pip3 install pyarrow")
+        parquet = pq.ParquetFile(path)
+        columns = [c for c in ROW_COLUMNS if c in parquet.schema_arrow.names]
+        for batch in parquet.iter_batches(batch_size=chunk_size, columns=columns):
+            yield {name: batch.column(name).to_numpy(zero_copy_only=False) for name in columns}
+        return
+
+    with open(path, 'r', newline='') as f:
+        if ext in ('.jsonl', '.ndjson'):
+            rows = (json.loads(line) for line in f if line.strip())
+            while True:
+                records = list(islice(rows, chunk_size))
+                if not records:
+                    return
+                columns = [c for c in ROW_COLUMNS if c in records[0]]
+                yield {c: [r.get(c) for r in records] for c in columns}
+        else:
+            reader = csv.reader(f)
+            header = next(reader)
+            positions = [(c, header.index(c)) for c in ROW_COLUMNS if c in header]
+            while True:
+                rows = list(islice(reader, chunk_size))
+                if not rows:
+                    return
+                transposed = list(zip(*rows))
+                yield {c: transposed[i] for c, i in positions}
+
+
+def aggregate_file(path, account_name, start_date=None, end_date=None, budget=None, chunk_size=100000):
+    """Read a raw rows export and return the REPORT_DATA dict for one account."""
+    accumulator = MetricsAccumulator(account_name, start_date, end_date)
+    for chunk in iter_chunks(path, chunk_size):
+        accumulator.add_chunk(chunk)
+    return accumulator.to_report_data(budget=budget)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build REPORT_DATA from raw rep_job_metrics rows.")
+    parser.add_argument("rows_file")
+    parser.add_argument("account_name")
+    parser.add_argument("output_path", nargs="?")
+    parser.add_argument("--start-date")
+    parser.add_argument("--end-date")
+    parser.add_argument("--budget", help="JSON file with booked/remaining budget per product")
+    parser.add_argument("--chunk-size", type=int, default=100000)
+    args = parser.parse_args()
+
+    budget = None
+    if args.budget:
+        with open(args.budget, 'r') as f:
+            budget = json.load(f)
+
+    data = aggregate_file(args.rows_file, args.account_name, args.start_date, args.end_date,
+                          budget=budget, chunk_size=args.chunk_size)
+    if args.output_path:
+        with open(args.output_path, 'w') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        print(f"Report data saved to: {args.output_path}")
+    else:
+        json.dump(data, sys.stdout, indent=2, ensure_ascii=False)
@@ -0,0 +1,199 @@
+"""
+Direct OOXML Writer
+Fast path for the report's simple shapes: text boxes, KPI boxes and tables are
+rendered from pre-compiled XML templates and appended to the slide in a single
+parse, instead of setting every font, colour and fill through python-pptx's
+object model. The emitted XML is the same python-pptx would produce, so the
+output looks identical.
+
+write_package() saves a presentation by writing each part straight into the zip,
+storing already-compressed media (images, embedded workbooks) instead of
+deflating it again.
+"""
+
+import re
+import zipfile
+import zlib
+from xml.sax.saxutils import escape
+
+NSDECLS = (
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+)
+
+EMU_PER_INCH = 914400
+EMU_PER_POINT = 12700
+TABLE_STYLE_ID = "{5C22544A-7EE6-4342-B048-85BDC9FD1C3A}"
+
+TEXTBOX_TMPL = (
+    '<p:sp><p:nvSpPr><p:cNvPr id="{id}" name="TextBox {name_id}"/><p:cNvSpPr txBox="1"/><p:nvPr/></p:nvSpPr>'
+    '<p:spPr><a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+    '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom><a:noFill/></p:spPr>'
+    '<p:txBody><a:bodyPr wrap="square"><a:spAutoFit/></a:bodyPr><a:lstStyle/>'
+    '<a:p><a:pPr algn="{align}"><a:defRPr sz="{sz}" b="{b}"><a:solidFill><a:srgbClr val="{color}"/></a:solidFill>'
+    '</a:defRPr></a:pPr>{runs}</a:p></p:txBody></p:sp>'
+)
+
+ROUNDED_RECT_TMPL = (
+    '<p:sp><p:nvSpPr><p:cNvPr id="{id}" name="Rounded Rectangle {name_id}"/><p:cNvSpPr/><p:nvPr/></p:nvSpPr>'
+    '<p:spPr><a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+    '<a:prstGeom prst="roundRect"><a:avLst/></a:prstGeom>'
+    '<a:solidFill><a:srgbClr val="{fill}"/></a:solidFill><a:ln><a:noFill/></a:ln></p:spPr>'
+    '<p:style><a:lnRef idx="1"><a:schemeClr val="accent1"/></a:lnRef>'
+    '<a:fillRef idx="3"><a:schemeClr val="accent1"/></a:fillRef>'
+    '<a:effectRef idx="2"><a:schemeClr val="accent1"/></a:effectRef>'
+    '<a:fontRef idx="minor"><a:schemeClr val="lt1"/></a:fontRef></p:style>'
+    '<p:txBody><a:bodyPr rtlCol="0" anchor="ctr"/><a:lstStyle/><a:p><a:pPr algn="ctr"/></a:p></p:txBody></p:sp>'
+)
+
+TABLE_TMPL = (
+    '<p:graphicFrame><p:nvGraphicFramePr><p:cNvPr id="{id}" name="Table {name_id}"/>'
+    '<p:cNvGraphicFramePr><a:graphicFrameLocks noGrp="1"/></p:cNvGraphicFramePr><p:nvPr/></p:nvGraphicFramePr>'
+    '<p:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{cx}" cy="{cy}"/></p:xfrm>'
+    '<a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/table">'
+    '<a:tbl><a:tblPr firstRow="1" bandRow="1"><a:tableStyleId>{style_id}</a:tableStyleId></a:tblPr>'
+    '<a:tblGrid>{grid}</a:tblGrid>{rows}</a:tbl></a:graphicData></a:graphic></p:graphicFrame>'
+)
+
+HEADER_CELL_TMPL = (
+    '<a:tc><a:txBody><a:bodyPr/><a:lstStyle/>{paragraphs}</a:txBody>'
+    '<a:tcPr><a:solidFill><a:srgbClr val="{fill}"/></a:solidFill></a:tcPr></a:tc>'
+)
+HEADER_PPR = ('<a:pPr algn="ctr"><a:defRPr b="1" sz="900"><a:solidFill><a:srgbClr val="FFFFFF"/></a:solidFill>'
+              '</a:defRPr></a:pPr>')
+BODY_CELL_TMPL = '<a:tc><a:txBody><a:bodyPr/><a:lstStyle/>{paragraphs}</a:txBody>{tcpr}</a:tc>'
+BODY_PPR = ('<a:pPr algn="ctr"><a:defRPr sz="800"><a:solidFill><a:srgbClr val="{color}"/></a:solidFill>'
+            '</a:defRPr></a:pPr>')
+BAND_TCPR = '<a:tcPr><a:solidFill><a:srgbClr val="F5F5F5"/></a:solidFill></a:tcPr>'
+
+# Parts that are often compressed already: stored unless deflate makes them smaller (chart
+# workbooks and some template images still shrink)
+MAYBE_COMPRESSED_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.xlsx', '.xlsm', '.docx', '.pptx', '.mp4', '.m4a',
+                               '.zip')
+
+_CTRL_CHARS = re.compile(r"([\x00-\x08\x0B-\x1F])")
+
+
+def emu(inches):
+    return int(inches * EMU_PER_INCH)
+
+
+def centipoints(points):
+    return int(points * EMU_PER_POINT) // 127
+
+
+def _escape(text):
+    text = _CTRL_CHARS.sub(lambda match: "_x%04X_" % ord(match.group(1)), text)
+    return escape(text)
+
+
+def runs_xml(text):
+    """Return the a:r / a:br sequence for a paragraph's text (line feeds become breaks)."""
+    parts = []
+    for idx, run in enumerate(re.split("\n|\v", text)):
+        if idx > 0:
+            parts.append('<a:br/>')
+        if run:
+            parts.append(f'<a:r><a:t>{_escape(run)}</a:t></a:r>')
+    return "".join(parts)
+
+
+def textbox_xml(shape_id, left, top, width, height, text, font_size, bold, color, align):
+    return TEXTBOX_TMPL.format(
+        id=shape_id, name_id=shape_id - 1, x=emu(left), y=emu(top), cx=emu(width), cy=emu(height),
+        align=align, sz=centipoints(font_size), b=1 if bold else 0, color=color, runs=runs_xml(text))
+
+
+def rounded_rect_xml(shape_id, left, top, width, height, fill):
+    return ROUNDED_RECT_TMPL.format(
+        id=shape_id, name_id=shape_id - 1, x=emu(left), y=emu(top), cx=emu(width), cy=emu(height), fill=fill)
+
+
+def _cell_paragraphs(text, ppr):
+    return "".join(f'<a:p>{ppr}{runs_xml(line)}</a:p>' for line in text.split("\n"))
+
+
+def table_xml(shape_id, left, top, width, height, table_data, header_color, text_color):
+    rows = len(table_data)
+    cols = len(table_data[0])
+    col_width = emu(width / cols)
+    total_height = emu(height)
+    row_height = total_height // rows
+    body_ppr = BODY_PPR.format(color=text_color)
+
+    rows_xml = []
+    for i, row_data in enumerate(table_data):
+        h = total_height - (rows - 1) * row_height if i == rows - 1 else row_height
+        cells = []
+        for cell_data in row_data:
+            if i == 0:
+                cells.append(HEADER_CELL_TMPL.format(
+                    paragraphs=_cell_paragraphs(str(cell_data), HEADER_PPR), fill=header_color))
+            else:
+                cells.append(BODY_CELL_TMPL.format(
+                    paragraphs=_cell_paragraphs(str(cell_data), body_ppr),
+                    tcpr=BAND_TCPR if i % 2 == 0 else '<a:tcPr/>'))
+        rows_xml.append(f'<a:tr h="{h}">{"".join(cells)}</a:tr>')
+
+    return TABLE_TMPL.format(
+        id=shape_id, name_id=shape_id - 1, x=emu(left), y=emu(top), cx=col_width * cols, cy=total_height,
+        style_id=TABLE_STYLE_ID, grid=f'<a:gridCol w="{col_width}"/>' * cols, rows="".join(rows_xml))
+
+
+def append_shapes(slide, shapes_xml):
+    """Parse shape XML in one go and append the shapes to the slide's shape tree."""
+    from pptx.oxml import parse_xml
+
+    container = parse_xml(f'<p:spTree {NSDECLS}>{shapes_xml}</p:spTree>')
+    sp_tree = slide.shapes._spTree
+    for element in list(container):
+        sp_tree.append(element)
+
+
+def next_shape_id(slide):
+    return slide.shapes._spTree.max_shape_id + 1
+
+
+def _rels_of(obj):
+    rels = getattr(obj, "rels", None)
+    return rels if rels is not None else obj._rels
+
+
+def _deflate_saves(blob, compresslevel):
+    """True if deflating blob at compresslevel (None: zlib's default) makes it smaller."""
+    compressor = zlib.compressobj(-1 if compresslevel is None else compresslevel, zlib.DEFLATED, -15)
+    return len(compressor.compress(blob)) + len(compressor.flush()) < len(blob)
+
+
+def write_package(prs, output, compresslevel=None):
+    """Write a presentation to a path or binary stream, one part at a time."""
+    package = prs.part.package
+    parts = list(package.iter_parts())
+
+    overrides = "".join(
+        f'<Override PartName="{part.partname}" ContentType="{part.content_type}"/>'
+        for part in sorted(parts, key=lambda part: str(part.partname)))
+    content_types = (
+        '<?xml version=\'1.0\' encoding=\'UTF-8\' standalone=\'yes\'?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        f'{overrides}</Types>'
+    ).encode('utf-8')
+
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as zf:
+        def write(membername, blob):
+            info = zipfile.ZipInfo(membername, date_time=(1980, 1, 1, 0, 0, 0))
+            if membername.lower().endswith(MAYBE_COMPRESSED_EXTENSIONS) and not _deflate_saves(blob, compresslevel):
+                zf.writestr(info, blob, compress_type=zipfile.ZIP_STORED)
+            else:
+                zf.writestr(info, blob, compress_type=zipfile.ZIP_DEFLATED, compresslevel=compresslevel)
+
+        write('[Content_Types].xml', content_types)
+        write('_rels/.rels', _rels_of(package).xml)
+        for part in parts:
+            write(part.partname.membername, part.blob)
+            rels = _rels_of(part)
+            if len(rels):
+                write(part.partname.rels_uri.membername, rels.xml)
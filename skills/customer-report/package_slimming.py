@@ -0,0 +1,109 @@
+"""
+Package Slimming
+Drops what a finished report does not need from its package before it is
+saved. By default the report carries everything from the template:
+
+    - slide layouts no slide uses (the report uses three of them), together
+      with the images and other parts only they refer to
+    - slide masters left without a used layout, and their themes
+    - the template's thumbnail and printer settings
+    - identical media stored more than once (same logo on several layouts)
+
+Parts that are no longer referenced are not written, because a package is
+saved by walking its relationships. Identical media parts are detected by
+content hash and merged into one.
+
+    stats = slim_package(prs)
+    write_package(prs, output_path, compresslevel=9)   # see ooxml_writer.py
+
+The slides look the same; only editing the report from an unused layout is
+no longer possible.
+"""
+
+import hashlib
+
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.constants import RELATIONSHIP_TARGET_MODE as RTM
+from pptx.opc.package import _Relationship
+
+# Content type prefixes of media parts merged by content hash
+MEDIA_CONTENT_TYPES = ("image/", "video/", "audio/")
+
+# Relationships to template leftovers that a generated report does not need
+TEMPLATE_EXTRAS = (RT.THUMBNAIL, RT.PRINTER_SETTINGS)
+
+
+def prune_layouts(prs):
+    """Remove slide layouts no slide is based on. Returns the number removed."""
+    used = {slide.slide_layout.part for slide in prs.slides}
+    removed = 0
+    for master in prs.slide_masters:
+        for layout in list(master.slide_layouts):
+            if layout.part not in used:
+                master.slide_layouts.remove(layout)
+                removed += 1
+    return removed
+
+
+def prune_masters(prs):
+    """Remove slide masters without layouts. Returns the number removed."""
+    sldMasterIdLst = prs.part._element.sldMasterIdLst
+    removed = 0
+    for sldMasterId in list(sldMasterIdLst):
+        master = prs.part.related_slide_master(sldMasterId.rId)
+        # A presentation must keep at least one master
+        if len(master.slide_layouts) or len(sldMasterIdLst) == 1:
+            continue
+        sldMasterIdLst.remove(sldMasterId)
+        prs.part.drop_rel(sldMasterId.rId)
+        removed += 1
+    return removed
+
+
+def drop_template_extras(prs):
+    """Drop the template's thumbnail and printer settings. Returns the number of parts dropped."""
+    dropped = 0
+    for source in (prs.part.package, prs.part):
+        for rId, rel in list(source._rels.items()):
+            if not rel.is_external and rel.reltype in TEMPLATE_EXTRAS:
+                source._rels.pop(rId)
+                dropped += 1
+    return dropped
+
+
+def dedupe_media(package):
+    """Point every relationship to identical media at one part. Returns the number of parts merged."""
+    canonical = {}  # sha1 of the blob -> first part with it
+    merged = set()
+    for part in list(package.iter_parts()):
+        rels = part.rels
+        for rId, rel in list(rels.items()):
+            if rel.is_external:
+                continue
+            target = rel.target_part
+            if not target.content_type.startswith(MEDIA_CONTENT_TYPES):
+                continue
+            first = canonical.setdefault(hashlib.sha1(target.blob).hexdigest(), target)
+            if first is not target:
+                # Same rId, so the part's XML needs no change
+                rels._rels[rId] = _Relationship(rels._base_uri, rId, rel.reltype, RTM.INTERNAL, first)
+                merged.add(target.partname)
+    return len(merged)
+
+
+def slim_package(prs):
+    """Run every slimming step on a presentation and return what was removed.
+
+    Returns {"layouts": n, "masters": n, "extras": n, "media": n, "parts_before": n, "parts_after": n}.
+    """
+    package = prs.part.package
+    parts_before = sum(1 for _ in package.iter_parts())
+    stats = {
+        "layouts": prune_layouts(prs) if len(prs.slides) else 0,
+        "masters": prune_masters(prs) if len(prs.slides) else 0,
+        "extras": drop_template_extras(prs),
+        "media": dedupe_media(package),
+    }
+    stats["parts_before"] = parts_before
+    stats["parts_after"] = sum(1 for _ in package.iter_parts())
+    return stats
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Portfolio Benchmarks
+CPA and conversion percentiles across all accounts, precomputed into a small
+JSON artifact, so a report can show how an account compares to its peers
+without querying any other account.
+
+The build reads every account's per product sums with one warehouse scan and
+computes the distributions with NumPy group-bys: per product over all
+accounts, and per product within account size buckets (by spend in the
+period) and, given a segments file, within industries. Segments with fewer
+than MIN_ACCOUNTS accounts are left out; lookups fall back to the next wider
+segment.
+
+A report looks its markers up in the artifact (see benchmark_markers()):
+a dict lookup and a binary search over the stored percentiles per value.
+
+Usage:
+    python portfolio_benchmarks.py build <source_url> <start_month> <end_month> [--segments industries.json]
+    python portfolio_benchmarks.py show [--product Reach]
+
+Options:
+    --benchmarks: Artifact file (default: ~/.cache/customer-report/benchmarks.json)
+    --segments: JSON file mapping account names to an industry
+
+Example:
+    python portfolio_benchmarks.py build redshift://user:pw@host:5439/snowplow 2025-02 2026-01
+    python customer_report_generator.py data.json --benchmarks ~/.cache/customer-report/benchmarks.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from bisect import bisect_left
+from datetime import datetime, timezone
+
+DEFAULT_BENCHMARKS_PATH = os.path.expanduser("~/.cache/customer-report/benchmarks.json")
+
+ARTIFACT_VERSION = 1
+
+# Percentiles stored per distribution; a value's rank is interpolated between them
+PERCENTILES = tuple(range(0, 101, 5))
+
+# Smallest number of accounts a distribution is stored and shown for
+MIN_ACCOUNTS = 10
+
+# Account size buckets by total spend (EUR) in the period: (upper bound, name), last bound None
+SIZE_BUCKETS = ((10000, "small"), (100000, "medium"), (None, "large"))
+
+# Reports warn about benchmarks older than this
+DEFAULT_MAX_AGE_DAYS = 45
+
+# Benchmarked report values: (key in REPORT_DATA product blocks, lower is better)
+METRICS = (("avg_cpa", True), ("conversion_rate", False))
+
+
+def size_bucket(spend):
+    """Return the SIZE_BUCKETS name for an account's total spend."""
+    for bound, name in SIZE_BUCKETS:
+        if bound is None or spend < bound:
+            return name
+
+
+def segment_key(product, segment="all"):
+    return f"{product}|{segment}"
+
+
+def compute_distributions(rows, industries=None, min_accounts=MIN_ACCOUNTS):
+    """Return {segment key: {"accounts": n, metric: [percentile values]}} from PORTFOLIO_METRICS rows.
+
+    rows: (account, product, applications_started, applications_sent, spend).
+    industries: optional {account: industry}.
+    """
+    import numpy as np
+
+    if not rows:
+        return {}
+    accounts = np.array([row[0] for row in rows], dtype=object)
+    products = np.array([row[1] for row in rows], dtype=str)
+    started, sent, spend = (np.nan_to_num(np.array([row[i] for row in rows], dtype=np.float64))
+                            for i in (2, 3, 4))
+
+    # Size bucket by the account's spend over all products
+    account_names, account_idx = np.unique(accounts, return_inverse=True)
+    account_spend = np.bincount(account_idx, weights=spend, minlength=len(account_names))
+    bounds = np.array([bound for bound, _ in SIZE_BUCKETS[:-1]], dtype=np.float64)
+    bucket_names = np.array([f"size:{name}" for _, name in SIZE_BUCKETS])
+    sizes = bucket_names[np.searchsorted(bounds, account_spend, side="right")][account_idx]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = {
+            "avg_cpa": np.where(sent > 0, spend / sent, np.nan),
+            "conversion_rate": np.where(started > 0, 100.0 * sent / started, np.nan),
+        }
+
+    # One segment label per row and segmentation, "" for rows outside it
+    segmentations = [np.full(len(rows), "all"), sizes]
+    if industries:
+        segmentations.append(np.array([f"industry:{industries[account]}" if industries.get(account) else ""
+                                       for account in accounts]))
+
+    distributions = {}
+    for segments in segmentations:
+        present = segments != ""
+        keys = np.char.add(np.char.add(products[present], "|"), segments[present])
+        group_names, group_idx = np.unique(keys, return_inverse=True)
+        counts = np.bincount(group_idx, minlength=len(group_names))
+        for metric, metric_values in values.items():
+            selected = metric_values[present]
+            valid = ~np.isnan(selected)
+            # Sort by group, then value, and split into one sorted run per group
+            order = np.lexsort((selected[valid], group_idx[valid]))
+            sorted_values = selected[valid][order]
+            edges = np.searchsorted(group_idx[valid][order], np.arange(len(group_names) + 1))
+            for g, key in enumerate(group_names):
+                if counts[g] < min_accounts:
+                    continue
+                group_values = sorted_values[edges[g]:edges[g + 1]]
+                entry = distributions.setdefault(key, {"accounts": int(counts[g])})
+                if len(group_values) >= min_accounts:
+                    entry[metric] = np.round(np.percentile(group_values, PERCENTILES), 4).tolist()
+    return distributions
+
+
+def build_benchmarks(conn, dialect, start_month, end_month, industries=None, product_types=None,
+                     min_accounts=MIN_ACCOUNTS):
+    """Read all accounts' metrics for a month range and return the benchmark artifact dict."""
+    from metrics_aggregation import PRODUCT_TYPES
+    from query_cache import next_month
+    from report_queries import PORTFOLIO_METRICS, run_query
+
+    rows = run_query(conn, PORTFOLIO_METRICS, dialect, (f"{start_month}-01", f"{next_month(end_month)}-01"),
+                     product_types or PRODUCT_TYPES)
+    return {
+        "version": ARTIFACT_VERSION,
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "start_month": start_month,
+        "end_month": end_month,
+        "accounts": len({row[0] for row in rows}),
+        "percentiles": list(PERCENTILES),
+        "size_buckets": [list(bucket) for bucket in SIZE_BUCKETS],
+        "distributions": compute_distributions(rows, industries, min_accounts),
+    }
+
+
+class Benchmarks:
+    """A loaded benchmark artifact."""
+
+    def __init__(self, artifact):
+        if artifact.get("version") != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported benchmarks version: {artifact.get('version')}")
+        self.artifact = artifact
+        self.generated_at = datetime.fromisoformat(artifact["generated_at"])
+        self.percentiles = artifact["percentiles"]
+        self.distributions = artifact["distributions"]
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.artifact, f, indent=1)
+        os.replace(tmp_path, path)
+
+    def age_days(self, now=None):
+        now = now or datetime.now(timezone.utc)
+        return (now - self.generated_at).total_seconds() / 86400
+
+    def distribution(self, product, metric, segments=("all",)):
+        """Return (segment, percentile values) of the first segment that has the metric, or (None, None)."""
+        for segment in segments:
+            entry = self.distributions.get(segment_key(product, segment))
+            if entry is not None and metric in entry:
+                return segment, entry[metric]
+        return None, None
+
+    def rank(self, value, values):
+        """Return the percentile (0-100) of value within a stored distribution."""
+        if value <= values[0]:
+            return 0.0
+        if value >= values[-1]:
+            return 100.0
+        i = bisect_left(values, value)
+        low, high = values[i - 1], values[i]
+        fraction = (value - low) / (high - low) if high > low else 0.0
+        return self.percentiles[i - 1] + fraction * (self.percentiles[i] - self.percentiles[i - 1])
+
+
+# Loaded artifacts, keyed by (absolute path, mtime, size)
+_BENCHMARKS_CACHE = {}
+
+
+def load_benchmarks(path):
+    """Load an artifact once per process; a rebuilt file is picked up on the next call."""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if key not in _BENCHMARKS_CACHE:
+        _BENCHMARKS_CACHE.clear()
+        _BENCHMARKS_CACHE[key] = Benchmarks.load(path)
+    return _BENCHMARKS_CACHE[key]
+
+
+def benchmark_markers(benchmarks, data, product_types=None):
+    """Return {product key: {metric: marker}} comparing a report's products with their peers.
+
+    Peers are the account's industry (a top-level "industry" value in the
+    payload), else its size bucket, else all accounts. A marker is
+    {"segment", "median", "better_than"}, better_than being the share of
+    peers (in percent) the account beats. The payload's products are looked
+    up by name regardless of case ("boost" in the payload, "Boost" in the
+    artifact); products without applications or distributions get no markers.
+    """
+    from report_model import load_report_data
+
+    report = load_report_data(data)
+    segments = [f"size:{size_bucket(report['total']['used_budget'])}", "all"]
+    if report.get("industry"):
+        segments.insert(0, f"industry:{report['industry']}")
+    median = benchmarks.percentiles.index(50)
+
+    # Artifact product names by report product key
+    names = {key.split("|", 1)[0].lower(): key.split("|", 1)[0] for key in benchmarks.distributions}
+    keys = [product.lower() for product in product_types] if product_types else list(report.products)
+
+    markers = {}
+    for key in keys:
+        block = report.products.get(key)
+        if not block or not block["applications_sent"] or key not in names:
+            continue
+        for metric, lower_is_better in METRICS:
+            segment, values = benchmarks.distribution(names[key], metric, segments)
+            if values is None:
+                continue
+            rank = benchmarks.rank(block[metric], values)
+            markers.setdefault(key, {})[metric] = {
+                "segment": segment,
+                "median": values[median],
+                "better_than": round(100 - rank if lower_is_better else rank),
+            }
+    return markers
+
+
+def _print_distributions(benchmarks, product=None):
+    print(f"Generated {benchmarks.generated_at:%Y-%m-%d %H:%M} UTC ({benchmarks.age_days():.0f} days ago), "
+          f"{benchmarks.artifact['start_month']} - {benchmarks.artifact['end_month']}, "
+          f"{benchmarks.artifact['accounts']} accounts")
+    quartiles = [benchmarks.percentiles.index(p) for p in (25, 50, 75)]
+    for key, entry in sorted(benchmarks.distributions.items()):
+        if product and not key.startswith(f"{product}|"):
+            continue
+        parts = []
+        for metric, _ in METRICS:
+            if metric in entry:
+                parts.append(f"{metric} " + " / ".join(f"{entry[metric][i]:.2f}" for i in quartiles))
+        print(f"{key:<28} {entry['accounts']:>6} accounts  " + "  ".join(parts))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precomputed portfolio benchmarks.")
+    parser.add_argument("--benchmarks", default=DEFAULT_BENCHMARKS_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Compute percentiles over all accounts")
+    build.add_argument("source_url")
+    build.add_argument("start_month", help="YYYY-MM")
+    build.add_argument("end_month", help="YYYY-MM")
+    build.add_argument("--segments", help="JSON file mapping account names to an industry")
+    build.add_argument("--min-accounts", type=int, default=MIN_ACCOUNTS)
+
+    show = commands.add_parser("show", help="Print the stored quartiles")
+    show.add_argument("--product")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        from report_queries import connect
+        industries = None
+        if args.segments:
+            with open(args.segments) as f:
+                industries = json.load(f)
+        conn, dialect = connect(args.source_url)
+        benchmarks = Benchmarks(build_benchmarks(conn, dialect, args.start_month, args.end_month, industries,
+                                                 min_accounts=args.min_accounts))
+        conn.close()
+        benchmarks.save(args.benchmarks)
+        print(f"{len(benchmarks.distributions)} distributions over {benchmarks.artifact['accounts']} accounts "
+              f"saved to: {args.benchmarks}")
+    elif args.command == "show":
+        try:
+            benchmarks = Benchmarks.load(args.benchmarks)
+        except FileNotFoundError:
+            sys.exit(f"No benchmarks at {args.benchmarks}, run: python portfolio_benchmarks.py build <source_url> ...")
+        _print_distributions(benchmarks, args.product)
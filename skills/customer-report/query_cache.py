@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Query Result Cache
+Local SQLite cache of per account/product/month aggregates, refreshed incrementally.
+
+Closed months never change, so they are fetched from the warehouse once. Every
+report only fetches the months that are missing, still open (current month) or
+older than the TTL, then builds REPORT_DATA from the cache. Reports cover whole
+calendar months.
+
+Usage:
+    python query_cache.py report <source_url> <account_name> <start_month> <end_month> [output_path]
+    python query_cache.py invalidate <account_name>
+    python query_cache.py evict <max_age_days>
+
+Options:
+    --cache: Cache file (default: ~/.cache/customer-report/query_cache.sqlite)
+    --ttl-days: Refetch cached closed months older than this (default: never)
+
+Example:
+    python query_cache.py report redshift://user:pw@host:5439/snowplow REWE 2025-02 2026-01 data.json
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import date
+
+from metrics_aggregation import PRODUCT_TYPES, build_report_data
+from report_queries import JOB_MONTH_METRICS, MONTHLY_BOOKINGS, REMAINING_BUDGET, connect, run_query
+
+DEFAULT_CACHE_PATH = os.path.expanduser("~/.cache/customer-report/query_cache.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS partitions (
+    account TEXT NOT NULL,
+    month TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    closed INTEGER NOT NULL,
+    PRIMARY KEY (account, month)
+);
+CREATE TABLE IF NOT EXISTS month_metrics (
+    account TEXT NOT NULL,
+    product TEXT NOT NULL,
+    month TEXT NOT NULL,
+    page_views REAL NOT NULL,
+    applications_started REAL NOT NULL,
+    applications_sent REAL NOT NULL,
+    spend REAL NOT NULL,
+    PRIMARY KEY (account, product, month)
+);
+CREATE TABLE IF NOT EXISTS month_jobs (
+    account TEXT NOT NULL,
+    product TEXT NOT NULL,
+    month TEXT NOT NULL,
+    job_id NOT NULL,
+    PRIMARY KEY (account, product, month, job_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS month_bookings (
+    account TEXT NOT NULL,
+    product TEXT NOT NULL,
+    month TEXT NOT NULL,
+    booked REAL NOT NULL,
+    PRIMARY KEY (account, product, month)
+);
+"""
+
+DATA_TABLES = ("month_metrics", "month_jobs", "month_bookings", "partitions")
+
+
+def next_month(month):
+    """Return the 'YYYY-MM' month after the given one."""
+    year, mon = int(month[:4]), int(month[5:7])
+    return f"{year + mon // 12}-{mon % 12 + 1:02d}"
+
+
+def month_range(start_month, end_month):
+    """Return all 'YYYY-MM' months from start_month to end_month inclusive."""
+    months = []
+    month = start_month
+    while month <= end_month:
+        months.append(month)
+        month = next_month(month)
+    return months
+
+
+def _contiguous_runs(months):
+    """Group sorted months into (first, last) runs of consecutive months."""
+    runs = []
+    for month in months:
+        if runs and next_month(runs[-1][1]) == month:
+            runs[-1][1] = month
+        else:
+            runs.append([month, month])
+    return [tuple(run) for run in runs]
+
+
+class QueryCache:
+    """Month-partitioned cache of warehouse aggregates in a local SQLite file."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_days=None, product_types=PRODUCT_TYPES):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        self.ttl_days = ttl_days
+        self.product_types = tuple(product_types)
+
+    def close(self):
+        self.db.close()
+
+    def stale_months(self, account, start_month, end_month):
+        """Return the months in range that have to be fetched from the warehouse."""
+        now = time.time()
+        cached = {
+            month: (fetched_at, closed)
+            for month, fetched_at, closed in self.db.execute(
+                "SELECT month, fetched_at, closed FROM partitions WHERE account = ? AND month BETWEEN ? AND ?",
+                (account, start_month, end_month))
+        }
+        stale = []
+        for month in month_range(start_month, end_month):
+            if month not in cached:
+                stale.append(month)
+                continue
+            fetched_at, closed = cached[month]
+            if not closed or (self.ttl_days is not None and now - fetched_at > self.ttl_days * 86400):
+                stale.append(month)
+        return stale
+
+    def refresh(self, conn, dialect, account, start_month, end_month, today=None):
+        """Fetch missing, open or expired months from the warehouse. Returns the fetched months."""
+        today = today or date.today()
+        current_month = today.strftime("%Y-%m")
+        stale = self.stale_months(account, start_month, end_month)
+        for first, last in _contiguous_runs(stale):
+            params = (account, f"{first}-01", f"{next_month(last)}-01")
+            # One scan gives both the monthly sums and the job ids behind the distinct counts
+            job_months = run_query(conn, JOB_MONTH_METRICS, dialect, params, self.product_types)
+            bookings = run_query(conn, MONTHLY_BOOKINGS, dialect, params, self.product_types)
+            self._store(account, month_range(first, last), job_months, bookings, current_month)
+        return stale
+
+    def _store(self, account, months, job_months, bookings, current_month):
+        fetched_at = time.time()
+        metrics = {}
+        for product, month, _, *sums in job_months:
+            totals = metrics.setdefault((product, month), [0, 0, 0, 0])
+            for i, value in enumerate(sums):
+                totals[i] += value or 0
+        with self.db:
+            for table in DATA_TABLES:
+                self.db.executemany(f"DELETE FROM {table} WHERE account = ? AND month = ?",
+                                    [(account, m) for m in months])
+            self.db.executemany(
+                "INSERT INTO month_metrics VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(account, product, month, *sums) for (product, month), sums in metrics.items()])
+            self.db.executemany(
+                "INSERT OR IGNORE INTO month_jobs VALUES (?, ?, ?, ?)",
+                [(account, product, month, job_id) for product, month, job_id, *_ in job_months
+                 if job_id is not None])
+            self.db.executemany(
+                "INSERT INTO month_bookings VALUES (?, ?, ?, ?)",
+                [(account, product, month, booked or 0) for product, month, booked in bookings])
+            self.db.executemany(
+                "INSERT INTO partitions VALUES (?, ?, ?, ?)",
+                [(account, m, fetched_at, int(m < current_month)) for m in months])
+
+    def cached_aggregates(self, account, start_month, end_month):
+        """Return (totals, monthly, booked) for a month range, read from the cache only."""
+        where = "account = ? AND month BETWEEN ? AND ?"
+        params = (account, start_month, end_month)
+        monthly = {}
+        for product, month, pv, started, sent, spend in self.db.execute(
+                f"SELECT product, month, page_views, applications_started, applications_sent, spend "
+                f"FROM month_metrics WHERE {where}", params):
+            monthly.setdefault(product, {})[month] = {
+                "page_views": pv, "applications_started": started, "applications_sent": sent,
+                "spend": spend, "jobs": 0,
+            }
+        for product, month, jobs in self.db.execute(
+                f"SELECT product, month, COUNT(*) FROM month_jobs WHERE {where} GROUP BY product, month", params):
+            if month in monthly.get(product, {}):
+                monthly[product][month]["jobs"] = jobs
+
+        totals = {}
+        for product, months in monthly.items():
+            totals[product] = {
+                key: sum(m[key] for m in months.values())
+                for key in ("page_views", "applications_started", "applications_sent", "spend")
+            }
+            totals[product]["jobs"] = 0
+        for product, jobs in self.db.execute(
+                f"SELECT product, COUNT(DISTINCT job_id) FROM month_jobs WHERE {where} GROUP BY product", params):
+            if product in totals:
+                totals[product]["jobs"] = jobs
+
+        booked = dict(self.db.execute(
+            f"SELECT product, SUM(booked) FROM month_bookings WHERE {where} GROUP BY product", params))
+        return totals, monthly, booked
+
+    def report_data(self, conn, dialect, account, start_month, end_month, today=None):
+        """Refresh the cache for a month range and return the REPORT_DATA dict."""
+        self.refresh(conn, dialect, account, start_month, end_month, today)
+        totals, monthly, booked = self.cached_aggregates(account, start_month, end_month)
+        # Remaining credit is current state, not a monthly partition: always fetched
+        remaining = dict(run_query(conn, REMAINING_BUDGET, dialect, (account,), self.product_types))
+        budget = {
+            product: {"booked": booked.get(product) or 0, "remaining": remaining.get(product) or 0}
+            for product in self.product_types
+        }
+        return build_report_data(account, totals, monthly, budget=budget, product_types=self.product_types,
+                                 start_month=start_month, end_month=end_month)
+
+    def invalidate(self, account):
+        """Drop everything cached for an account."""
+        with self.db:
+            for table in DATA_TABLES:
+                self.db.execute(f"DELETE FROM {table} WHERE account = ?", (account,))
+
+    def evict(self, max_age_days):
+        """Drop cached months fetched more than max_age_days ago. Returns the number of months dropped."""
+        cutoff = time.time() - max_age_days * 86400
+        with self.db:
+            expired = self.db.execute(
+                "SELECT account, month FROM partitions WHERE fetched_at < ?", (cutoff,)).fetchall()
+            for table in DATA_TABLES:
+                self.db.executemany(f"DELETE FROM {table} WHERE account = ? AND month = ?", expired)
+        return len(expired)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Month-partitioned cache of report query results.")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH)
+    parser.add_argument("--ttl-days", type=float, default=None)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    report = commands.add_parser("report", help="Build REPORT_DATA, fetching only missing months")
+    report.add_argument("source_url")
+    report.add_argument("account_name")
+    report.add_argument("start_month", help="YYYY-MM")
+    report.add_argument("end_month", help="YYYY-MM")
+    report.add_argument("output_path", nargs="?")
+
+    invalidate = commands.add_parser("invalidate", help="Drop the cached data of an account")
+    invalidate.add_argument("account_name")
+
+    evict = commands.add_parser("evict", help="Drop cached months older than a number of days")
+    evict.add_argument("max_age_days", type=float)
+
+    args = parser.parse_args()
+    cache = QueryCache(args.cache, ttl_days=args.ttl_days)
+
+    if args.command == "report":
+        conn, dialect = connect(args.source_url)
+        fetched = cache.stale_months(args.account_name, args.start_month, args.end_month)
+        data = cache.report_data(conn, dialect, args.account_name, args.start_month, args.end_month)
+        print(f"Fetched {len(fetched)} month(s) from the warehouse: {', '.join(fetched) or '-'}", file=sys.stderr)
+        if args.output_path:
+            with open(args.output_path, 'w') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            print(f"Report data saved to: {args.output_path}", file=sys.stderr)
+        else:
+            json.dump(data, sys.stdout, indent=2, ensure_ascii=False)
+    elif args.command == "invalidate":
+        cache.invalidate(args.account_name)
+        print(f"Cache invalidated for: {args.account_name}")
+    elif args.command == "evict":
+        print(f"Evicted {cache.evict(args.max_age_days)} cached month(s)")
+    cache.close()
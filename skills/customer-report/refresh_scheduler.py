@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Change-Driven Report Refresh
+Regenerates the scheduled reports of key accounts, but only for accounts whose
+data moved since their last report.
+
+Every run reads one watermark per account with two cheap warehouse scans:
+the latest date_dt, row count and spend of its job metrics in the report
+period, and its current remaining credit from rep_accounting. Accounts whose
+watermark differs from the one stored with their last report (or whose report
+file is gone) are queued, largest deadline pressure and spend first, and
+rebuilt with report_fetch.py and generate_report in a bounded process pool.
+At most --max-pending accounts are in flight; the rest wait in the queue.
+
+The state file records the stored watermarks and the jobs of the current
+run, and is rewritten after every finished account. A run is closed once
+every job was tried. A run that crashed before that is resumed by the next
+invocation with the same period: finished accounts are skipped, the others
+are run again. Failed accounts keep their old stored watermark, so the next
+run finds them changed and queues them again with any other changed account.
+
+Usage:
+    python refresh_scheduler.py <source_url> <accounts_file> [template_path] [output_dir] [options]
+
+Arguments:
+    accounts_file: JSON list of account names, or of {"account": name, "deadline": "YYYY-MM-DD"}
+    template_path: Path to HeyJobs template (default: ~/Desktop/Template.pptx)
+    output_dir: Directory for the reports (default: ~/Desktop/Customer_Reports)
+
+Options:
+    --end-month: Last month of the reports (default: current month)
+    --months: Months per report (default: 12)
+    --workers: Number of worker processes (default: number of CPUs)
+    --max-pending: Accounts in flight at once (default: 2x workers)
+    --state: State file (default: <output_dir>/refresh_state.json)
+    --force: Rebuild every account, changed or not
+    --dry-run: Print the queue and exit
+    Report options --fast, --chart-workbooks, --slim, --compress-level, --benchmarks as in batch_report.py
+
+Example:
+    python refresh_scheduler.py redshift://user:pw@host:5439/snowplow key_accounts.json --slim
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date, datetime
+
+from batch_report import report_filename
+from customer_report_generator import CHART_WORKBOOK_MODES, generate_report, preload
+from metrics_aggregation import PRODUCT_TYPES
+from query_cache import next_month
+from report_queries import ACCOUNT_CREDIT, ACCOUNT_WATERMARKS, connect, run_query
+
+STATE_VERSION = 1
+
+# Job states in the state file; "running" is only seen after a crash and is run again
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+# Deadline used for accounts without one, so they sort after all accounts with a deadline
+NO_DEADLINE = "9999-12-31"
+
+# Worker process state: the connection pool opened by _init_worker
+_WORKER = {}
+
+
+def shift_month(month, months):
+    """Return the 'YYYY-MM' month that is `months` months after (or before, if negative) month."""
+    year, m = map(int, month.split("-"))
+    index = year * 12 + m - 1 + months
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def load_accounts(path):
+    """Return [{"account", "deadline"}] from a JSON list of names or objects."""
+    with open(path) as f:
+        entries = json.load(f)
+    accounts = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"account": entry}
+        accounts.append({"account": entry["account"], "deadline": entry.get("deadline")})
+    return accounts
+
+
+def read_watermarks(conn, dialect, start_month, end_month, product_types=PRODUCT_TYPES):
+    """Return {account: watermark} for every account with data, read with one scan per table.
+
+    A watermark is {"period", "last_date", "rows", "spend", "remaining"}; any
+    difference between two watermarks of an account means its report changed.
+    """
+    period = f"{start_month}..{end_month}"
+    params = (f"{start_month}-01", f"{next_month(end_month)}-01")
+    watermarks = {}
+    for account, last_date, rows, spend in run_query(conn, ACCOUNT_WATERMARKS, dialect, params, product_types):
+        watermarks[account] = {"period": period, "last_date": str(last_date), "rows": rows,
+                               "spend": round(float(spend or 0), 2), "remaining": 0}
+    for account, remaining in run_query(conn, ACCOUNT_CREDIT, dialect, (), product_types):
+        watermarks.setdefault(account, {"period": period, "last_date": None, "rows": 0, "spend": 0})
+        watermarks[account]["remaining"] = round(float(remaining or 0), 2)
+    return watermarks
+
+
+class RefreshState:
+    """The persistent state file: stored watermarks per account and the jobs of the current run."""
+
+    def __init__(self, path):
+        self.path = path
+        self.watermarks = {}   # account -> watermark of its last successful report
+        self.outputs = {}      # account -> path of its last successful report
+        self.run = None        # {"period", "started_at", "jobs": {account: job}}, None when no run is open
+        if os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            if saved.get("version") == STATE_VERSION:
+                self.watermarks = saved["watermarks"]
+                self.outputs = saved["outputs"]
+                self.run = saved["run"]
+
+    def save(self):
+        """Write the state atomically, so a crash never leaves a half-written file."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": STATE_VERSION, "watermarks": self.watermarks, "outputs": self.outputs,
+                       "run": self.run}, f, indent=1, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def changed(self, account, watermark):
+        """True if an account's report is missing or its data moved since it was built."""
+        output_path = self.outputs.get(account)
+        if not output_path or not os.path.exists(output_path):
+            return True
+        return self.watermarks.get(account) != watermark
+
+
+def plan_run(state, accounts, watermarks, period, force=False):
+    """Open a new run in state with a job for every changed account. Returns the number of jobs."""
+    jobs = {}
+    for entry in accounts:
+        account = entry["account"]
+        watermark = watermarks.get(account)
+        if watermark is None:
+            # No data in the period and no credit: nothing to report
+            continue
+        if force or state.changed(account, watermark):
+            jobs[account] = {"status": PENDING, "deadline": entry["deadline"], "watermark": watermark,
+                             "attempts": 0}
+    state.run = {"period": period, "started_at": datetime.now().isoformat(timespec="seconds"), "jobs": jobs}
+    return len(jobs)
+
+
+def queue_order(jobs):
+    """Return the accounts of unfinished jobs, earliest deadline first, then by spend (largest first)."""
+    pending = [account for account, job in jobs.items() if job["status"] != DONE]
+    return sorted(pending, key=lambda account: (jobs[account]["deadline"] or NO_DEADLINE,
+                                                -jobs[account]["watermark"]["spend"]))
+
+
+def _init_worker(template_path, source_url, pool_size):
+    from report_fetch import ConnectionPool
+    preload(template_path)
+    _WORKER["pool"] = ConnectionPool(source_url, pool_size)
+
+
+def _refresh_one(account, start_month, end_month, template_path, output_path, options):
+    """Fetch one account's data and build its report, returning a result dict instead of raising."""
+    from report_fetch import fetch_report_data
+    start = time.perf_counter()
+    result = {"output_path": output_path}
+    try:
+        data = fetch_report_data(_WORKER["pool"], account, start_month, end_month)
+        generate_report(data, template_path, output_path, **options)
+        result["status"] = DONE
+    except Exception as e:
+        result["status"] = FAILED
+        result["error"] = "".join(traceback.format_exception_only(type(e), e)).strip()
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def _pool_failure(error):
+    """Result of a job whose worker process died before returning one."""
+    return {"status": FAILED, "seconds": 0,
+            "error": "".join(traceback.format_exception_only(type(error), error)).strip()}
+
+
+def _record_result(state, account, result):
+    """Store a finished job's result in the open run, and its watermark and report if it succeeded."""
+    job = state.run["jobs"][account]
+    job.update(status=result["status"], seconds=result["seconds"])
+    if result["status"] == DONE:
+        job.pop("error", None)
+        state.watermarks[account] = job["watermark"]
+        state.outputs[account] = result["output_path"]
+    else:
+        job["error"] = result["error"]
+    print(f"[{result['status']}] {account} ({result['seconds']}s)")
+
+
+def run_refresh(source_url, accounts, template_path, output_dir, end_month=None, months=12, workers=None,
+                max_pending=None, state_path=None, force=False, dry_run=False, options=None):
+    """Rebuild the reports of changed accounts, resuming an unfinished run. Returns the run dict."""
+    end_month = end_month or date.today().strftime("%Y-%m")
+    start_month = shift_month(end_month, 1 - months)
+    period = f"{start_month}..{end_month}"
+    state = RefreshState(state_path or os.path.join(output_dir, "refresh_state.json"))
+
+    if state.run is not None and state.run["period"] == period and not force:
+        finished = sum(1 for job in state.run["jobs"].values() if job["status"] == DONE)
+        print(f"Resuming run from {state.run['started_at']}: {finished}/{len(state.run['jobs'])} accounts done")
+    else:
+        conn, dialect = connect(source_url)
+        try:
+            watermarks = read_watermarks(conn, dialect, start_month, end_month)
+        finally:
+            conn.close()
+        queued = plan_run(state, accounts, watermarks, period, force)
+        print(f"{queued} of {len(accounts)} accounts changed since their last report")
+    jobs = state.run["jobs"]
+    queue = queue_order(jobs)
+    if dry_run:
+        for account in queue:
+            job = jobs[account]
+            print(f"{job['deadline'] or '-':<10}  {job['watermark']['spend']:>14,.2f}  {account}")
+        return state.run
+    state.save()
+
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 2
+    taken = {os.path.basename(path) for account, path in state.outputs.items() if account not in jobs}
+    start = time.perf_counter()
+    # One connection per query of an account (see report_fetch.report_queries)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(template_path, source_url, 3)) as pool:
+        inflight = {}
+        queue.reverse()
+        while queue or inflight:
+            # Backpressure: only max_pending accounts are submitted, the rest wait here
+            while queue and len(inflight) < max_pending:
+                account = queue.pop()
+                output_path = state.outputs.get(account) or os.path.join(output_dir,
+                                                                         report_filename(account, taken))
+                jobs[account]["status"] = RUNNING
+                jobs[account]["attempts"] += 1
+                try:
+                    inflight[pool.submit(_refresh_one, account, start_month, end_month, template_path,
+                                         output_path, options or {})] = account
+                except Exception as e:
+                    # The pool broke (a worker died); the job fails like the ones in flight
+                    _record_result(state, account, _pool_failure(e))
+            done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+            for future in done:
+                account = inflight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = _pool_failure(e)
+                _record_result(state, account, result)
+            state.save()
+
+    failed = sum(1 for job in jobs.values() if job["status"] == FAILED)
+    print(f"Refresh finished: {len(jobs) - failed}/{len(jobs)} accounts in {time.perf_counter() - start:.1f}s")
+    run = state.run
+    # Every job was tried: close the run, failed accounts are queued again by changed() in the next one
+    state.run = None
+    state.save()
+    return run
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the reports of accounts whose data changed.")
+    parser.add_argument("source_url")
+    parser.add_argument("accounts_file", help="JSON list of account names or {account, deadline} objects")
+    parser.add_argument("template_path", nargs="?", default=os.path.expanduser("~/Desktop/Template.pptx"))
+    parser.add_argument("output_dir", nargs="?", default=os.path.expanduser("~/Desktop/Customer_Reports"))
+    parser.add_argument("--end-month", help="Last month of the reports, YYYY-MM (default: current month)")
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--max-pending", type=int, default=None, help="Accounts in flight at once")
+    parser.add_argument("--state", help="State file (default: <output_dir>/refresh_state.json)")
+    parser.add_argument("--force", action="store_true", help="Rebuild every account")
+    parser.add_argument("--dry-run", action="store_true", help="Print the queue and exit")
+    parser.add_argument("--fast", action="store_true", help="Use the direct OOXML writer")
+    parser.add_argument("--chart-workbooks", choices=CHART_WORKBOOK_MODES, default="embedded")
+    parser.add_argument("--slim", action="store_true")
+    parser.add_argument("--compress-level", type=int, choices=range(10), metavar="0-9")
+    parser.add_argument("--benchmarks", metavar="PATH", help="Benchmark artifact (see portfolio_benchmarks.py)")
+    args = parser.parse_args()
+
+    options = {"fast": args.fast, "chart_workbooks": args.chart_workbooks, "slim": args.slim,
+               "compresslevel": args.compress_level, "benchmarks": args.benchmarks}
+    run = run_refresh(args.source_url, load_accounts(args.accounts_file), args.template_path, args.output_dir,
+                      end_month=args.end_month, months=args.months, workers=args.workers,
+                      max_pending=args.max_pending, state_path=args.state, force=args.force,
+                      dry_run=args.dry_run, options=options)
+    sys.exit(1 if any(job["status"] == FAILED for job in run["jobs"].values()) else 0)
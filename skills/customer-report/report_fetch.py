@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Concurrent Report Data Fetch
+Runs the independent report queries (job metrics, booked and remaining
+budget; SKILL.md Steps 3-6) at the same time over a pool of warehouse
+connections and streams their rows into REPORT_DATA, so fetching an account
+takes about as long as its slowest query instead of all of them one after
+another. Totals and monthly series come from a single scan of
+rep_job_metrics (see report_queries.metrics_query()).
+
+Every query attempt has a timeout enforced by the database (statement_timeout
+on Redshift, a progress handler on SQLite) and is retried with backoff after
+timeouts and connection errors. A connection that failed is closed and
+replaced instead of being handed out again.
+
+Usage:
+    python report_fetch.py <source_url> <account_name> <start_month> <end_month> [output_path]
+
+Options:
+    --pool-size: Connections to open (default: 3, one per query)
+    --timeout: Seconds per query attempt (default: 120)
+    --retries: Further attempts after a failed one (default: 2)
+
+Example:
+    python report_fetch.py redshift://user:pw@host:5439/snowplow REWE 2025-02 2026-01 data.json
+    python report_fetch.py sqlite:standin.db REWE 2025-02 2026-01 data.crd
+
+A sqlite: URL must name a file; every pooled connection to sqlite::memory:
+would open its own empty database.
+"""
+
+import argparse
+import json
+import queue
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from metrics_aggregation import PRODUCT_TYPES, MetricsRollup, build_report_data
+from query_cache import next_month
+from report_queries import MONTHLY_BOOKINGS, REMAINING_BUDGET, connect, iter_query, metrics_query
+
+DEFAULT_TIMEOUT = 120.0
+DEFAULT_RETRIES = 2
+
+# First retry delay in seconds, doubled for every further attempt (with jitter)
+RETRY_BACKOFF = 0.5
+
+# DB-API error classes worth retrying: lost connections, timeouts, transient server errors.
+# ProgrammingError and DataError point at the query itself and are raised at once.
+RETRYABLE_ERRORS = ("OperationalError", "InterfaceError", "InternalError")
+
+# SQLite virtual machine steps between deadline checks
+SQLITE_PROGRESS_STEPS = 10000
+
+
+class QueryError(RuntimeError):
+    """A report query failed after all its attempts."""
+
+
+def is_retryable(error):
+    """Return True for errors a fresh attempt on a fresh connection may not hit again."""
+    if any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__):
+        return True
+    # Redshift reports statement_timeout cancellations as a plain database error
+    return "statement timeout" in str(error).lower()
+
+
+class ConnectionPool:
+    """Thread-safe pool of DB-API connections opened from a report_queries URL.
+
+    Connections are opened on demand, up to size. Use as
+
+        with pool.connection() as conn:
+            ...
+
+    A connection is returned to the pool when the block ends normally, and
+    closed when it raises.
+    """
+
+    def __init__(self, url, size=4):
+        self.url = url
+        self.size = max(1, size)
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        # The first connection is opened right away: it tells the dialect and fails fast on a bad URL
+        conn, self.dialect = connect(url)
+        self._opened = 1
+        self._idle.put(conn)
+
+    def _acquire(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_open = self._opened < self.size
+                    if can_open:
+                        self._opened += 1
+                if can_open:
+                    try:
+                        return connect(self.url)[0]
+                    except BaseException:
+                        with self._lock:
+                            self._opened -= 1
+                        raise
+                conn = self._idle.get()
+            # None only wakes up a waiter after a connection was discarded
+            if conn is not None:
+                return conn
+
+    def _discard(self, conn):
+        with self._lock:
+            self._opened -= 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self._idle.put(None)
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        except BaseException:
+            self._discard(conn)
+            raise
+        self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if conn is not None:
+                conn.close()
+        with self._lock:
+            self._opened = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _set_timeout(conn, dialect, timeout):
+    """Make the database abort statements on conn that run longer than timeout seconds."""
+    if not timeout:
+        return
+    if dialect == "sqlite":
+        deadline = time.monotonic() + timeout
+        conn.set_progress_handler(lambda: time.monotonic() > deadline, SQLITE_PROGRESS_STEPS)
+    elif dialect == "redshift":
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"SET statement_timeout TO {int(timeout * 1000)}")
+        finally:
+            cursor.close()
+
+
+def _clear_timeout(conn, dialect):
+    if dialect == "sqlite":
+        conn.set_progress_handler(None, 0)
+
+
+def run_pooled(pool, sql, params, on_row, product_types=PRODUCT_TYPES, timeout=DEFAULT_TIMEOUT,
+               retries=DEFAULT_RETRIES):
+    """Run one query on a pooled connection, passing every row to on_row as it is fetched.
+
+    Retries timeouts and connection errors up to `retries` times. on_row must
+    tolerate rows of a failed attempt being passed again. Returns
+    {"seconds", "attempts", "rows"} of the successful attempt; seconds do not
+    include waiting for a free connection.
+    """
+    for attempt in range(retries + 1):
+        rows = 0
+        try:
+            with pool.connection() as conn:
+                start = time.perf_counter()
+                _set_timeout(conn, pool.dialect, timeout)
+                try:
+                    for row in iter_query(conn, sql, pool.dialect, params, product_types):
+                        on_row(row)
+                        rows += 1
+                    # End the read transaction, so the pooled connection holds no snapshot
+                    conn.rollback()
+                finally:
+                    _clear_timeout(conn, pool.dialect)
+            return {"seconds": round(time.perf_counter() - start, 6), "attempts": attempt + 1, "rows": rows}
+        except Exception as e:
+            if attempt == retries or not is_retryable(e):
+                raise
+            time.sleep(RETRY_BACKOFF * 2 ** attempt * (0.5 + random.random()))
+
+
+class ReportDataSink:
+    """Collects query rows as they arrive and builds REPORT_DATA from them.
+
+    Every row sets values keyed by product (and month, and job) instead of
+    adding to them, so rows passed again by a retried query do not count twice.
+    """
+
+    def __init__(self, product_types=PRODUCT_TYPES):
+        self.product_types = tuple(product_types)
+        self._lock = threading.Lock()
+        self.metrics = MetricsRollup()
+        self.booked = {}     # {product: {month: booked}}
+        self.remaining = {}
+
+    def add_grouped(self, row):
+        with self._lock:
+            self.metrics.add_grouped(row)
+
+    def add_job_month(self, row):
+        with self._lock:
+            self.metrics.add_job_month(row)
+
+    def add_bookings(self, row):
+        product, month, booked = row
+        with self._lock:
+            self.booked.setdefault(product, {})[month] = booked or 0
+
+    def add_remaining(self, row):
+        product, remaining = row
+        with self._lock:
+            self.remaining[product] = remaining or 0
+
+    def report_data(self, account_name, start_month, end_month):
+        budget = {
+            product: {
+                "booked": sum(self.booked.get(product, {}).values()),
+                "remaining": self.remaining.get(product, 0),
+            }
+            for product in self.product_types
+        }
+        return build_report_data(account_name, self.metrics.totals(), self.metrics.monthly(), budget=budget,
+                                 product_types=self.product_types, start_month=start_month, end_month=end_month)
+
+
+def report_queries(sink, dialect, account, start_month, end_month):
+    """Return [(name, sql, params, on_row)] for the queries behind one report."""
+    params = (account, f"{start_month}-01", f"{next_month(end_month)}-01")
+    metrics_sql, per_job = metrics_query(dialect)
+    return [
+        ("metrics", metrics_sql, params, sink.add_job_month if per_job else sink.add_grouped),
+        ("booked_budget", MONTHLY_BOOKINGS, params, sink.add_bookings),
+        ("remaining_budget", REMAINING_BUDGET, (account,), sink.add_remaining),
+    ]
+
+
+def fetch_report_data(pool, account, start_month, end_month, product_types=PRODUCT_TYPES,
+                      timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, timings=None):
+    """Run the report queries concurrently and return the REPORT_DATA dict.
+
+    start_month and end_month are 'YYYY-MM'; whole calendar months are
+    fetched. If timings is a dict, it receives {query name: {"seconds",
+    "attempts", "rows"}}. Raises QueryError naming the failed queries.
+    """
+    sink = ReportDataSink(product_types)
+    queries = report_queries(sink, pool.dialect, account, start_month, end_month)
+    with ThreadPoolExecutor(max_workers=len(queries), thread_name_prefix="report-query") as executor:
+        futures = {
+            name: executor.submit(run_pooled, pool, sql, params, on_row, product_types, timeout, retries)
+            for name, sql, params, on_row in queries
+        }
+    failed = []
+    for name, future in futures.items():
+        error = future.exception()
+        if error is not None:
+            failed.append(f"{name}: {type(error).__name__}: {error}")
+        elif timings is not None:
+            timings[name] = future.result()
+    if failed:
+        raise QueryError("; ".join(failed))
+    return sink.report_data(account, start_month, end_month)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch REPORT_DATA with concurrent warehouse queries.")
+    parser.add_argument("source_url")
+    parser.add_argument("account_name")
+    parser.add_argument("start_month", help="YYYY-MM")
+    parser.add_argument("end_month", help="YYYY-MM")
+    parser.add_argument("output_path", nargs="?")
+    parser.add_argument("--pool-size", type=int, default=3, help="Connections to open")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Seconds per query attempt")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="Further attempts after a failure")
+    args = parser.parse_args()
+
+    timings = {}
+    start = time.perf_counter()
+    with ConnectionPool(args.source_url, args.pool_size) as pool:
+        try:
+            data = fetch_report_data(pool, args.account_name, args.start_month, args.end_month,
+                                     timeout=args.timeout, retries=args.retries, timings=timings)
+        except QueryError as e:
+            sys.exit(f"Fetch failed: {e}")
+    elapsed = time.perf_counter() - start
+    for name, timing in sorted(timings.items(), key=lambda item: -item[1]["seconds"]):
+        retried = f", {timing['attempts']} attempts" if timing["attempts"] > 1 else ""
+        print(f"{name:<17} {timing['seconds'] * 1000:>8.1f} ms  {timing['rows']:>6} rows{retried}", file=sys.stderr)
+    print(f"Fetched in {elapsed * 1000:.1f} ms", file=sys.stderr)
+
+    if args.output_path and args.output_path.endswith(".crd"):
+        from report_model import load_report_data
+        with open(args.output_path, 'wb') as f:
+            f.write(load_report_data(data).to_bytes())
+    elif args.output_path:
+        with open(args.output_path, 'w') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+    else:
+        print(json.dumps(data, indent=2, ensure_ascii=False))
+    if args.output_path:
+        print(f"Report data saved to: {args.output_path}")
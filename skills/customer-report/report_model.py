@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+Report Data Model
+Typed records for the REPORT_DATA payload, checked and coerced in one pass
+when a payload is loaded, so a missing key or a malformed month row fails
+with a clear message before the template is opened.
+
+    data = load_report_data(json.load(f))   # ReportData, or ReportDataError listing every problem
+    data['reach']['monthly_cpa']             # CpaSeries: month labels plus array-backed columns
+    blob = data.to_bytes()                   # compact binary form, ReportData.from_bytes(blob)
+
+The product blocks are the ones named in the payload's optional "products"
+list, in that order (default: reach, hire); data.products maps each key to
+its block.
+
+Records keep the dict-style access of the JSON payload (data['total']['avg_cpa'])
+and use __slots__; monthly series store their numbers in array columns
+instead of one list per month. Month labels are interned, so thousands of
+queued payloads share them.
+
+Binary records are self-delimiting and can be concatenated into one file
+(.crd): magic, header length, body length, a JSON header with the scalars and
+month labels, then the series columns as little-endian arrays (8-byte integers and doubles).
+
+Usage:
+    python report_model.py check <file> [<file> ...]
+    python report_model.py convert <input> <output>
+
+Files are .json (one payload), .crd (binary records) or JSONL (one payload per line).
+"""
+
+import argparse
+import json
+import math
+import struct
+import sys
+from array import array
+from decimal import Decimal
+
+MAGIC = b"CRD\x01"
+_RECORD_HEADER = struct.Struct("<4sII")
+
+BINARY_EXTENSIONS = (".crd",)
+
+# Products with their own block in the payload, in report order, unless the payload lists its own
+PRODUCT_KEYS = ("reach", "hire")
+
+# Top-level keys that cannot name a product block: the other payload fields, and the
+# generator's own section slides ("section_budget", "section_summary")
+RESERVED_KEYS = ("account_name", "time_range_months", "date_from", "date_to", "total", "products", "industry",
+                 "budget", "summary")
+
+# Array typecodes of the series columns. Fixed widths, as the binary form stores the raw arrays
+# (the C sizes behind "i" and "l" differ between platforms)
+INT_TYPECODE, FLOAT_TYPECODE = "q", "d"
+assert array(INT_TYPECODE).itemsize == 8 and array(FLOAT_TYPECODE).itemsize == 8
+
+# Errors listed in a ReportDataError message; all of them are kept in .errors
+MAX_LISTED_ERRORS = 10
+
+
+class ReportDataError(ValueError):
+    """A payload does not match the REPORT_DATA structure. .errors lists every problem."""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        listed = "; ".join(self.errors[:MAX_LISTED_ERRORS])
+        more = len(self.errors) - MAX_LISTED_ERRORS
+        super().__init__(f"Invalid report data: {listed}" + (f" (and {more} more)" if more > 0 else ""))
+
+
+def _number(value, kind, path, errors):
+    """Return value as kind (int or float), or record an error and return 0."""
+    if isinstance(value, str):
+        try:
+            value = float(value.strip())
+        except ValueError:
+            pass
+    if isinstance(value, bool) or not isinstance(value, (int, float, Decimal)):
+        errors.append(f"{path}: expected a number, got {value!r}")
+        return 0
+    if isinstance(value, int):
+        return value if kind is int else float(value)
+    value = float(value)
+    if not math.isfinite(value):
+        errors.append(f"{path}: expected a finite number, got {value!r}")
+        return 0
+    if kind is int:
+        if not value.is_integer():
+            errors.append(f"{path}: expected a whole number, got {value!r}")
+            return 0
+        return int(value)
+    return value
+
+
+def product_keys(payload, errors):
+    """Return the payload's product block keys in report order: its "products" list, or PRODUCT_KEYS.
+
+    Invalid entries are reported to errors and left out.
+    """
+    keys = payload.get("products")
+    if keys is None:
+        return PRODUCT_KEYS
+    if not isinstance(keys, list) or not keys:
+        errors.append(f"products: expected a non-empty list of product keys, got {keys!r}")
+        return ()
+    valid = []
+    for index, key in enumerate(keys):
+        if not isinstance(key, str) or not key or key in RESERVED_KEYS:
+            errors.append(f"products[{index}]: not a product key: {key!r}")
+        elif key in valid:
+            errors.append(f"products[{index}]: {key!r} is listed twice")
+        else:
+            valid.append(key)
+    return tuple(valid)
+
+
+def _text(value, path, errors):
+    if not isinstance(value, str):
+        errors.append(f"{path}: expected a string, got {value!r}")
+        return ""
+    return value
+
+
+class _Record:
+    """Base for the payload records: __slots__ fields with read-only dict-style access."""
+
+    __slots__ = ("extra",)
+    FIELDS = ()  # ((name, int | float), ...)
+    SERIES = ()  # ((name, MonthlySeries subclass), ...)
+
+    def __getitem__(self, key):
+        if key in self.extra:
+            return self.extra[key]
+        if key in self._names():
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key in self.extra or key in self._names()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.NAMES = tuple(name for name, _ in cls.FIELDS) + tuple(name for name, _ in cls.SERIES)
+
+    def _names(self):
+        return self.NAMES
+
+    def keys(self):
+        return list(self._names()) + list(self.extra)
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_json() == other.to_json()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_json()!r})"
+
+    def to_json(self):
+        return {key: value.to_json() if hasattr(value, "to_json") else value for key, value in self.items()}
+
+    @classmethod
+    def load(cls, block, path, errors):
+        """Return a record from a payload block, recording problems in errors."""
+        record = cls()
+        if not isinstance(block, dict):
+            errors.append(f"{path}: expected an object, got {type(block).__name__}")
+            block = {}
+        for name, kind in cls.FIELDS:
+            if name not in block:
+                errors.append(f"{path}.{name}: missing")
+                setattr(record, name, kind())
+            else:
+                setattr(record, name, _number(block[name], kind, f"{path}.{name}", errors))
+        for name, series_cls in cls.SERIES:
+            if name not in block:
+                errors.append(f"{path}.{name}: missing")
+                setattr(record, name, series_cls())
+            else:
+                setattr(record, name, series_cls.load(block[name], f"{path}.{name}", errors))
+        record.extra = {key: value for key, value in block.items() if key not in cls.NAMES}
+        return record
+
+
+class MonthlySeries:
+    """Month labels with one array column per value, iterated as (label, value, value) rows."""
+
+    __slots__ = ("labels", "columns")
+    COLUMNS = ()  # ((name, array typecode, int | float), ...)
+
+    def __init__(self, labels=None, columns=None):
+        self.labels = labels if labels is not None else []
+        self.columns = columns or tuple(array(typecode) for _, typecode, _ in self.COLUMNS)
+
+    @classmethod
+    def load(cls, rows, path, errors):
+        """Return a series from [[label, value, value], ...], recording problems in errors."""
+        if not isinstance(rows, (list, tuple)):
+            errors.append(f"{path}: expected a list of [month, value, value] rows, got {type(rows).__name__}")
+            return cls()
+        width = len(cls.COLUMNS) + 1
+        if all(isinstance(row, (list, tuple)) and len(row) == width for row in rows):
+            series = cls._load_columns(list(zip(*rows)) or [()] * width)
+            if series is not None:
+                return series
+        return cls._load_rows(rows, path, errors)
+
+    @classmethod
+    def _load_columns(cls, columns):
+        """Fast path for rows that need no coercion: labels are strings, values plain finite numbers."""
+        labels = columns[0]
+        if not set(map(type, labels)) <= {str}:
+            return None
+        arrays = []
+        for values, (_, typecode, kind) in zip(columns[1:], cls.COLUMNS):
+            types = set(map(type, values))
+            if kind is int and not types <= {int}:
+                return None
+            if kind is float and not (types <= {int, float} and all(map(math.isfinite, values))):
+                return None
+            try:
+                arrays.append(array(typecode, values))
+            except OverflowError:
+                return None
+        return cls(list(map(sys.intern, labels)), tuple(arrays))
+
+    @classmethod
+    def _load_rows(cls, rows, path, errors):
+        """Check and coerce row by row, recording every problem."""
+        series = cls()
+        names = ", ".join(name for name, _, _ in cls.COLUMNS)
+        for i, row in enumerate(rows):
+            if not isinstance(row, (list, tuple)) or len(row) != len(cls.COLUMNS) + 1:
+                errors.append(f"{path}[{i}]: expected [month, {names}], got {row!r}")
+                continue
+            label = row[0]
+            if not isinstance(label, str):
+                errors.append(f"{path}[{i}][0]: expected a month label, got {label!r}")
+                continue
+            series.labels.append(sys.intern(label))
+            for j, (_, _, kind) in enumerate(cls.COLUMNS):
+                value = _number(row[j + 1], kind, f"{path}[{i}][{j + 1}]", errors)
+                try:
+                    series.columns[j].append(value)
+                except OverflowError:
+                    errors.append(f"{path}[{i}][{j + 1}]: out of range, got {value!r}")
+                    series.columns[j].append(0)
+        return series
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __iter__(self):
+        return zip(self.labels, *self.columns)
+
+    def __getitem__(self, index):
+        return (self.labels[index],) + tuple(column[index] for column in self.columns)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.labels == other.labels and self.columns == other.columns
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_json()!r})"
+
+    def to_json(self):
+        return [list(row) for row in self]
+
+
+class CpaSeries(MonthlySeries):
+    """monthly_cpa: (month label, CPA, jobs) rows."""
+
+    __slots__ = ()
+    COLUMNS = (("cpa", FLOAT_TYPECODE, float), ("jobs", INT_TYPECODE, int))
+
+
+class AppsSeries(MonthlySeries):
+    """monthly_apps: (month label, applications started, applications sent) rows."""
+
+    __slots__ = ()
+    COLUMNS = (("started", INT_TYPECODE, int), ("sent", INT_TYPECODE, int))
+
+
+class TotalMetrics(_Record):
+    """The "total" block: REACH and HIRE together."""
+
+    __slots__ = ("booked_budget", "used_budget", "available_budget", "total_jobs", "page_views",
+                 "applications_started", "applications_sent", "avg_cpa")
+    FIELDS = (
+        ("booked_budget", float),
+        ("used_budget", float),
+        ("available_budget", float),
+        ("total_jobs", int),
+        ("page_views", int),
+        ("applications_started", int),
+        ("applications_sent", int),
+        ("avg_cpa", float),
+    )
+
+
+class ProductMetrics(TotalMetrics):
+    """A product block ("reach", "hire", ...): totals, conversion rate and monthly series."""
+
+    __slots__ = ("conversion_rate", "monthly_cpa", "monthly_apps")
+    FIELDS = TotalMetrics.FIELDS + (("conversion_rate", float),)
+    SERIES = (("monthly_cpa", CpaSeries), ("monthly_apps", AppsSeries))
+
+
+class ReportData(_Record):
+    """A validated REPORT_DATA payload. Unknown top-level keys are kept in .extra."""
+
+    __slots__ = ("account_name", "time_range_months", "date_from", "date_to", "total", "products")
+    HEADER_FIELDS = ("account_name", "time_range_months", "date_from", "date_to")
+
+    def _names(self):
+        return self.HEADER_FIELDS + ("total",) + tuple(self.products)
+
+    def __getitem__(self, key):
+        if key in self.products:
+            return self.products[key]
+        return super().__getitem__(key)
+
+    def to_json(self):
+        payload = super().to_json()
+        if tuple(self.products) != PRODUCT_KEYS:
+            payload["products"] = list(self.products)
+        return payload
+
+    @classmethod
+    def load(cls, payload):
+        """Check and coerce a payload dict in one pass. Raises ReportDataError listing every problem."""
+        if not isinstance(payload, dict):
+            raise ReportDataError([f"payload: expected an object, got {type(payload).__name__}"])
+        errors = []
+        keys = product_keys(payload, errors)
+        for name in ("account_name", "time_range_months", "total") + keys:
+            if name not in payload:
+                errors.append(f"{name}: missing")
+        record = cls()
+        record.account_name = _text(payload.get("account_name", ""), "account_name", errors)
+        if "account_name" in payload and isinstance(record.account_name, str) and not record.account_name.strip():
+            errors.append("account_name: must not be empty")
+        record.time_range_months = _number(payload.get("time_range_months", 0), int, "time_range_months", errors)
+        record.date_from = _text(payload.get("date_from", ""), "date_from", errors)
+        record.date_to = _text(payload.get("date_to", ""), "date_to", errors)
+        # A missing block is one error, not one per field
+        record.total = TotalMetrics.load(payload.get("total", {}), "total", errors if "total" in payload else [])
+        record.products = {key: ProductMetrics.load(payload.get(key, {}), key, errors if key in payload else [])
+                           for key in keys}
+        known = set(cls.__slots__) | set(keys)
+        record.extra = {key: value for key, value in payload.items() if key not in known}
+        if errors:
+            raise ReportDataError(errors)
+        return record
+
+    def to_bytes(self):
+        """Return the record in the binary form read by from_bytes and iter_records."""
+        header = self.to_json()
+        # Series usually share their months: each distinct label list is stored once
+        label_lists = []
+        columns = []
+        for key, product in self.products.items():
+            for name, _ in product.SERIES:
+                series = getattr(product, name)
+                if series.labels not in label_lists:
+                    label_lists.append(series.labels)
+                header[key][name] = label_lists.index(series.labels)
+                columns.extend(series.columns)
+        header["_labels"] = label_lists
+        body = b"".join(_little_endian(column).tobytes() for column in columns)
+        header = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return _RECORD_HEADER.pack(MAGIC, len(header), len(body)) + header + body
+
+    @classmethod
+    def from_bytes(cls, blob):
+        """Read one binary record (as written by to_bytes)."""
+        record, end = _read_record(memoryview(blob), 0)
+        return record
+
+
+def _little_endian(column):
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column
+
+
+def _read_record(view, offset):
+    """Return (ReportData, offset after it) for the binary record at offset."""
+    if len(view) - offset < _RECORD_HEADER.size:
+        raise ReportDataError(["binary record: truncated"])
+    magic, header_len, body_len = _RECORD_HEADER.unpack_from(view, offset)
+    if magic != MAGIC:
+        raise ReportDataError(["binary record: not a report data record"])
+    start = offset + _RECORD_HEADER.size
+    end = start + header_len + body_len
+    if len(view) < end:
+        raise ReportDataError(["binary record: truncated"])
+    payload = json.loads(bytes(view[start:start + header_len]))
+    label_lists = [list(map(sys.intern, labels)) for labels in payload.pop("_labels", [])]
+    # Columns are read in the order to_bytes wrote them; the labels give each column's length
+    position = start + header_len
+    columns = {}
+    for key in product_keys(payload, []):
+        block = payload.get(key)
+        if not isinstance(block, dict):
+            continue
+        for name, series_cls in ProductMetrics.SERIES:
+            try:
+                labels = label_lists[block[name]]
+            except (KeyError, IndexError, TypeError):
+                raise ReportDataError([f"binary record: {key}.{name} has no month labels"])
+            series_columns = []
+            for _, typecode, _ in series_cls.COLUMNS:
+                column = array(typecode)
+                size = column.itemsize * len(labels)
+                column.frombytes(view[position:position + size])
+                if sys.byteorder == "big":
+                    column.byteswap()
+                series_columns.append(column)
+                position += size
+            block[name] = []
+            columns[(key, name)] = series_cls(labels, tuple(series_columns))
+    if position != end:
+        raise ReportDataError(["binary record: body does not match its header"])
+    # Scalars are re-checked like JSON payloads; the series are taken over as they are
+    record = ReportData.load(payload)
+    for (key, name), series in columns.items():
+        setattr(record.products[key], name, series)
+    return record, end
+
+
+def iter_records(blob):
+    """Yield the ReportData records of concatenated binary records."""
+    view = memoryview(blob)
+    offset = 0
+    while offset < len(view):
+        record, offset = _read_record(view, offset)
+        yield record
+
+
+def load_report_data(data):
+    """Return data as a validated ReportData (already validated records are returned as they are)."""
+    if isinstance(data, ReportData):
+        return data
+    return ReportData.load(data)
+
+
+def read_report_file(path):
+    """Read the single payload of a JSON or binary (.crd) file."""
+    if path.lower().endswith(BINARY_EXTENSIONS):
+        with open(path, 'rb') as f:
+            return ReportData.from_bytes(f.read())
+    with open(path, 'r') as f:
+        return load_report_data(json.load(f))
+
+
+def _error(e):
+    return str(e) if isinstance(e, ReportDataError) else f"{type(e).__name__}: {e}"
+
+
+def read_payloads(path):
+    """Yield (source, ReportData or None, error) for every payload in a file.
+
+    .json files hold one payload, .crd files binary records, any other file
+    one JSON payload per line. Problems are yielded as error text instead of
+    raised, so one broken payload does not stop the others.
+    """
+    lower = path.lower()
+    if lower.endswith(BINARY_EXTENSIONS):
+        try:
+            with open(path, 'rb') as f:
+                view = memoryview(f.read())
+        except OSError as e:
+            yield path, None, _error(e)
+            return
+        offset, index = 0, 1
+        while offset < len(view):
+            try:
+                record, offset = _read_record(view, offset)
+            except ValueError as e:
+                # The rest of the file cannot be located without this record's lengths
+                yield f"{path}#{index}", None, _error(e)
+                return
+            yield f"{path}#{index}", record, None
+            index += 1
+    elif lower.endswith('.json'):
+        try:
+            yield path, read_report_file(path), None
+        except (OSError, ValueError) as e:
+            yield path, None, _error(e)
+    else:
+        with open(path, 'r') as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield f"{path}:{line_no}", ReportData.load(json.loads(line)), None
+                except ValueError as e:
+                    yield f"{path}:{line_no}", None, _error(e)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check report payloads or convert them between JSON and binary.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    check = commands.add_parser("check", help="Validate payload files")
+    check.add_argument("files", nargs="+")
+    convert = commands.add_parser("convert", help="Convert JSON/JSONL to .crd or back (by output extension)")
+    convert.add_argument("input")
+    convert.add_argument("output")
+    args = parser.parse_args()
+
+    if args.command == "check":
+        failed = 0
+        for path in args.files:
+            for source, _, error in read_payloads(path):
+                if error is not None:
+                    failed += 1
+                    print(f"{source}: {error}", file=sys.stderr)
+        print(f"{failed} invalid payload(s)")
+        sys.exit(1 if failed else 0)
+
+    records = []
+    for source, record, error in read_payloads(args.input):
+        if error is not None:
+            sys.exit(f"{source}: {error}")
+        records.append(record)
+    if args.output.lower().endswith(BINARY_EXTENSIONS):
+        with open(args.output, 'wb') as f:
+            for record in records:
+                f.write(record.to_bytes())
+    elif args.output.lower().endswith(('.jsonl', '.ndjson')):
+        with open(args.output, 'w') as f:
+            for record in records:
+                f.write(json.dumps(record.to_json(), ensure_ascii=False) + "\n")
+    else:
+        if len(records) != 1:
+            sys.exit("Write several payloads to a .jsonl or .crd file")
+        with open(args.output, 'w') as f:
+            json.dump(records[0].to_json(), f, indent=2, ensure_ascii=False)
+    print(f"Converted {len(records)} payload(s) to: {args.output}")
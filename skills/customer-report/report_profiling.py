@@ -0,0 +1,181 @@
+"""
+Report Profiling
+Records how long each stage of generate_report takes: loading the template,
+building every slide (and the KPI boxes, tables and charts on it), embedding
+chart workbooks and saving the package. Optionally records the tracemalloc
+allocation peak of every stage as well.
+
+    profiler = Profiler(memory=True)
+    generate_report(data, template_path, output_path, profiler=profiler)
+    profiler.seconds("slide")   # {"title": 0.004, "executive_summary": 0.021, ...}
+    write_profile(profiler, output_path, "chrome")   # REWE_Customer_Report.trace.json
+
+Profiles are written as plain JSON or in the Chrome trace event format, which
+chrome://tracing and https://ui.perfetto.dev open directly.
+
+TimingStats aggregates the stage timings of many reports (batch and server
+runs) into percentiles.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+PROFILE_FORMATS = ("json", "chrome")
+
+# Percentiles reported by TimingStats
+PERCENTILES = (50, 90, 95, 99)
+
+
+class Profiler:
+    """Collects named, timed stages of one or more report runs.
+
+    Stages may be nested (a chart inside a slide). With memory=True, every
+    stage also records peak_kb: the highest traced allocation above the
+    memory in use when the stage started, including nested stages.
+    """
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.origin = time.perf_counter()
+        self.stages = []  # [{"name", "category", "start", "seconds"[, "peak_kb"]}], start relative to origin
+        self._open = []   # [[memory at start, peak so far]] of the stages being recorded
+        self._started_tracing = False
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def close(self):
+        """Stop tracemalloc if this profiler started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name, category="stage"):
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._open:
+                self._open[-1][1] = max(self._open[-1][1], peak)
+            tracemalloc.reset_peak()
+            self._open.append([current, current])
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = {
+                "name": name,
+                "category": category,
+                "start": start - self.origin,
+                "seconds": time.perf_counter() - start,
+            }
+            if self.memory:
+                baseline, peak = self._open.pop()
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+                if self._open:
+                    self._open[-1][1] = max(self._open[-1][1], peak)
+                record["peak_kb"] = round((peak - baseline) / 1024, 1)
+            self.stages.append(record)
+
+    def wrap(self, function, name, category="stage"):
+        """Return function recorded as a stage every time it is called."""
+        def wrapper(*args, **kwargs):
+            with self.stage(name, category):
+                return function(*args, **kwargs)
+        return wrapper
+
+    def seconds(self, category=None):
+        """Return {stage name: total seconds}, optionally for one category only."""
+        totals = {}
+        for stage in self.stages:
+            if category is None or stage["category"] == category:
+                totals[stage["name"]] = totals.get(stage["name"], 0.0) + stage["seconds"]
+        return totals
+
+    def to_dict(self):
+        return {
+            "memory": self.memory,
+            "stages": sorted(self.stages, key=lambda stage: stage["start"]),
+        }
+
+    def to_chrome_trace(self):
+        """Return the stages as Chrome trace events (complete events, microseconds)."""
+        pid = os.getpid()
+        events = []
+        for stage in sorted(self.stages, key=lambda stage: stage["start"]):
+            event = {
+                "name": stage["name"],
+                "cat": stage["category"],
+                "ph": "X",
+                "ts": round(stage["start"] * 1e6, 1),
+                "dur": round(stage["seconds"] * 1e6, 1),
+                "pid": pid,
+                "tid": 0,
+            }
+            if "peak_kb" in stage:
+                event["args"] = {"peak_kb": stage["peak_kb"]}
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def profile_path(output_path, fmt):
+    """Return the profile file path next to a report: <report>.profile.json or <report>.trace.json."""
+    suffix = ".trace.json" if fmt == "chrome" else ".profile.json"
+    return os.path.splitext(output_path)[0] + suffix
+
+
+def write_profile(profiler, output_path, fmt="json"):
+    """Write a profile next to the report at output_path and return its path."""
+    if fmt not in PROFILE_FORMATS:
+        raise ValueError(f"Profile format must be one of {', '.join(PROFILE_FORMATS)}")
+    path = profile_path(output_path, fmt)
+    payload = profiler.to_chrome_trace() if fmt == "chrome" else profiler.to_dict()
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=2)
+    return path
+
+
+def percentiles(values, points=PERCENTILES):
+    """Return {"p50": ..., ...} of values by the nearest-rank method, plus count and max."""
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0}
+    result = {"count": len(ordered)}
+    for point in points:
+        rank = max(1, math.ceil(point / 100 * len(ordered)))
+        result[f"p{point}"] = round(ordered[rank - 1], 6)
+    result["max"] = round(ordered[-1], 6)
+    return result
+
+
+class TimingStats:
+    """Thread-safe collector of per-report timings, summarised as percentiles.
+
+    With a window, only the most recent `window` reports are kept.
+    """
+
+    def __init__(self, window=None):
+        self._lock = threading.Lock()
+        self._reports = deque(maxlen=window)
+
+    def add(self, total_seconds, stage_seconds):
+        """Record one report: its total seconds and {stage name: seconds}."""
+        with self._lock:
+            self._reports.append((total_seconds, dict(stage_seconds)))
+
+    def summary(self):
+        with self._lock:
+            reports = list(self._reports)
+        stages = {}
+        for _, stage_seconds in reports:
+            for name, seconds in stage_seconds.items():
+                stages.setdefault(name, []).append(seconds)
+        return {
+            "total": percentiles([total for total, _ in reports]),
+            "stages": {name: percentiles(values) for name, values in stages.items()},
+        }
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Customer Report Server
+Keeps python-pptx and the parsed template warm and serves reports over localhost HTTP.
+
+Usage:
+    python report_server.py [template_path] [--port 8765] [--workers N] [--max-pending N] [--max-body-bytes N]
+                            [--fast] [--chart-workbooks MODE] [--max-chart-points N] [--downsample lttb|calendar]
+                            [--slim] [--compress-level N] [--benchmarks PATH] [--profile] [--profile-memory]
+
+Endpoints:
+    POST /report   Body: REPORT_DATA JSON or a binary record (see report_model.py). Returns the .pptx file,
+                   or 400 with {"error", "errors"} listing every problem of an invalid payload.
+                   411 without Content-Length, 413 for a body over --max-body-bytes.
+    GET  /health   Returns {"status": "ok"}.
+    GET  /stats    With --profile: latency percentiles of the last 1000 reports, overall and per stage.
+
+Example:
+    curl -s --data @data.json http://127.0.0.1:8765/report -o REWE_Customer_Report.pptx
+"""
+
+import argparse
+import io
+import json
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote
+
+from customer_report_generator import CHART_WORKBOOK_MODES, chart_points, generate_report, preload
+from report_model import MAGIC, ReportData, ReportDataError, load_report_data
+from report_profiling import Profiler, TimingStats
+
+PPTX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+# Number of recent reports /stats summarises
+STATS_WINDOW = 1000
+
+# Largest POST body accepted by default; a payload with 15 years of monthly series is well under 1 MB
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+
+def render_report(data, template_path, **options):
+    """Build a report in memory and return the .pptx bytes. options are passed to generate_report."""
+    buffer = io.BytesIO()
+    generate_report(data, template_path, buffer, **options)
+    return buffer.getvalue()
+
+
+def render_report_profiled(data, template_path, memory=False, **options):
+    """Like render_report, but returns (pptx bytes, {stage name: seconds})."""
+    profiler = Profiler(memory=memory)
+    buffer = io.BytesIO()
+    try:
+        generate_report(data, template_path, buffer, profiler=profiler, **options)
+    finally:
+        profiler.close()
+    return buffer.getvalue(), profiler.seconds()
+
+
+class ReportRequestHandler(BaseHTTPRequestHandler):
+    server_version = "CustomerReportServer/1.0"
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/stats" and self.server.stats is not None:
+            self._send_json(200, self.server.stats.summary())
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path != "/report":
+            self._send_json(404, {"error": "Not found"})
+            return
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self._send_json(411, {"error": "Content-Length header required"})
+            return
+        if not (length.isascii() and length.isdigit()):
+            self._send_json(400, {"error": f"Invalid Content-Length: {length!r}"})
+            return
+        length = int(length)
+        if length > self.server.max_body:
+            self._send_json(413, {"error": f"Body of {length} bytes exceeds the limit of {self.server.max_body}"})
+            return
+        try:
+            body = self.rfile.read(length)
+            # Checked here, so an invalid payload never takes a worker
+            data = ReportData.from_bytes(body) if body.startswith(MAGIC) else load_report_data(json.loads(body))
+        except ReportDataError as e:
+            self._send_json(400, {"error": str(e), "errors": e.errors})
+            return
+        except ValueError as e:
+            self._send_json(400, {"error": f"Invalid JSON: {e}"})
+            return
+
+        # Backpressure: refuse instead of queueing without bound
+        if not self.server.slots.acquire(blocking=False):
+            self._send_json(503, {"error": "Server busy, retry later"})
+            return
+        start = time.perf_counter()
+        try:
+            if self.server.stats is not None:
+                future = self.server.pool.submit(render_report_profiled, data, self.server.template_path,
+                                                 self.server.profile_memory, **self.server.report_options)
+                blob, stages = future.result()
+                # Request latency includes the wait for a free worker
+                self.server.stats.add(time.perf_counter() - start, stages)
+            else:
+                future = self.server.pool.submit(render_report, data, self.server.template_path,
+                                                 **self.server.report_options)
+                blob = future.result()
+        except Exception as e:
+            self._send_json(500, {"error": "".join(traceback.format_exception_only(type(e), e)).strip()})
+            return
+        finally:
+            self.server.slots.release()
+
+        filename = f"{data.get('account_name') or 'Customer'}_Customer_Report.pptx"
+        self.send_response(200)
+        self.send_header("Content-Type", PPTX_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(blob)))
+        self.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{quote(filename)}")
+        self.end_headers()
+        self.wfile.write(blob)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def make_server(template_path, host="127.0.0.1", port=8765, workers=None, max_pending=None, fast=False,
+                chart_workbooks="embedded", profile=False, profile_memory=False, max_chart_points=None,
+                downsample="lttb", slim=False, compresslevel=None, benchmarks=None, max_body=MAX_BODY_BYTES):
+    """Create the HTTP server with a warm, bounded pool of report workers."""
+    workers = workers or os.cpu_count() or 1
+    server = ThreadingHTTPServer((host, port), ReportRequestHandler)
+    server.template_path = template_path
+    server.max_body = max_body
+    server.report_options = {"fast": fast, "chart_workbooks": chart_workbooks,
+                             "max_chart_points": max_chart_points, "downsample": downsample,
+                             "slim": slim, "compresslevel": compresslevel, "benchmarks": benchmarks}
+    server.stats = TimingStats(window=STATS_WINDOW) if profile or profile_memory else None
+    server.profile_memory = profile_memory
+    server.pool = ProcessPoolExecutor(max_workers=workers, initializer=preload, initargs=(template_path,))
+    # Requests being built plus requests waiting for a free worker
+    server.slots = threading.BoundedSemaphore(max_pending or workers * 2)
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve customer reports over localhost HTTP.")
+    parser.add_argument("template_path", nargs="?", default=os.path.expanduser("~/Desktop/Template.pptx"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="Maximum requests in flight before answering 503 (default: 2x workers)")
+    parser.add_argument("--max-body-bytes", type=int, default=MAX_BODY_BYTES, metavar="N",
+                        help=f"Answer 413 to larger POST bodies (default: {MAX_BODY_BYTES})")
+    parser.add_argument("--fast", action="store_true", help="Use the direct OOXML writer")
+    parser.add_argument("--chart-workbooks", choices=CHART_WORKBOOK_MODES, default="embedded",
+                        help="Embed a workbook per chart, one shared workbook, or none")
+    parser.add_argument("--max-chart-points", type=chart_points, metavar="N",
+                        help="Downsample longer monthly series to this many points (at least 2)")
+    parser.add_argument("--downsample", choices=("lttb", "calendar"), default="lttb")
+    parser.add_argument("--slim", action="store_true",
+                        help="Leave unused layouts, masters and template extras out and merge identical media")
+    parser.add_argument("--compress-level", type=int, choices=range(10), metavar="0-9",
+                        help="Deflate level of the served packages")
+    parser.add_argument("--benchmarks", metavar="PATH",
+                        help="Benchmark artifact to compare CPA and conversion with (see portfolio_benchmarks.py)")
+    parser.add_argument("--profile", action="store_true", help="Collect stage timings, served at /stats")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="Also record tracemalloc allocation peaks per stage")
+    args = parser.parse_args()
+
+    server = make_server(args.template_path, args.host, args.port, args.workers, args.max_pending, args.fast,
+                         args.chart_workbooks, args.profile, args.profile_memory, args.max_chart_points,
+                         args.downsample, args.slim, args.compress_level, args.benchmarks, args.max_body_bytes)
+    print(f"Report server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.pool.shutdown()
@@ -0,0 +1,154 @@
+"""
+Series Downsampling
+Reduces the monthly_cpa / monthly_apps series to a point budget before they
+are charted, so long reports (24-60 months, or daily drill-downs) keep small,
+readable charts.
+
+Two methods:
+    lttb      Largest-Triangle-Three-Buckets: keeps a subset of the original
+              points, chosen to preserve peaks and dips. All series of a chart
+              are considered together, so they keep the same x positions.
+    calendar  Aggregates into calendar buckets (1, 2, 3, 6 or 12 months; the
+              smallest that fits the budget). Applications are summed, CPA is
+              weighted by applications sent, jobs are averaged. Falls back to
+              lttb for labels that are not months or dates, and when even
+              yearly buckets exceed the budget.
+
+Labels may be 'MM/YY' (the report format), 'YYYY-MM' or 'YYYY-MM-DD'.
+"""
+
+import re
+
+import numpy as np
+
+DOWNSAMPLE_METHODS = ("lttb", "calendar")
+
+# Calendar bucket sizes in months, smallest first
+CALENDAR_STEPS = (1, 2, 3, 6, 12)
+
+_SHORT_MONTH = re.compile(r"^(\d{2})/(\d{2})$")
+_ISO_DATE = re.compile(r"^(\d{4})-(\d{2})(?:-\d{2})?$")
+
+
+def lttb_indices(columns, budget):
+    """Return the sorted indices of at most `budget` points picked by LTTB.
+
+    columns: one series or an (n, k) array of k series sharing the x axis.
+    Each series is scaled to 0-1 so all of them weigh the same.
+    """
+    y = np.asarray(columns, dtype=np.float64)
+    if y.ndim == 1:
+        y = y[:, None]
+    n = len(y)
+    if budget >= n:
+        return np.arange(n)
+    if budget < 3:
+        return np.array([0, n - 1][:max(budget, 1)])
+
+    low = y.min(axis=0)
+    span = y.max(axis=0) - low
+    span[span == 0] = 1.0
+    y = (y - low) / span
+    x = np.arange(n, dtype=np.float64)
+
+    # budget - 2 buckets over the inner points; first and last point are always kept
+    edges = np.linspace(1, n - 1, budget - 1).astype(np.int64)
+    kept = np.empty(budget, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(budget - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[hi:next_hi].mean()
+        avg_y = y[hi:next_hi].mean(axis=0)
+        # Triangle area between the last kept point, each candidate and the next bucket's average
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi])[:, None] * (avg_y - y[a])).sum(axis=1)
+        a = lo + int(area.argmax())
+        kept[i + 1] = a
+    return kept
+
+
+def month_number(label):
+    """Return year * 12 + month - 1 for a 'MM/YY', 'YYYY-MM' or 'YYYY-MM-DD' label, or None."""
+    label = str(label)
+    match = _SHORT_MONTH.match(label)
+    if match:
+        return (2000 + int(match.group(2))) * 12 + int(match.group(1)) - 1
+    match = _ISO_DATE.match(label)
+    if match:
+        return int(match.group(1)) * 12 + int(match.group(2)) - 1
+    return None
+
+
+def _bucket_label(bucket, step):
+    first = bucket * step
+    year, month = divmod(first, 12)
+    if step == 3:
+        return f"Q{month // 3 + 1}/{year % 100:02d}"
+    if step == 6:
+        return f"H{month // 6 + 1}/{year % 100:02d}"
+    if step == 12:
+        return str(year)
+    return f"{month + 1:02d}/{year % 100:02d}"
+
+
+def calendar_buckets(labels, budget):
+    """Return (bucket index per point, bucket labels), or None.
+
+    None means the labels are not months or dates, or even yearly buckets
+    are more than budget.
+    """
+    months = [month_number(label) for label in labels]
+    if None in months:
+        return None
+    months = np.asarray(months, dtype=np.int64)
+    for step in CALENDAR_STEPS:
+        buckets = np.unique(months // step)
+        if len(buckets) <= budget:
+            break
+    else:
+        return None
+    return np.searchsorted(buckets, months // step), [_bucket_label(int(b), step) for b in buckets]
+
+
+def _weighted_mean(values, weights, index, count):
+    totals = np.bincount(index, weights=values * weights, minlength=count)
+    weight_sums = np.bincount(index, weights=weights, minlength=count)
+    means = np.bincount(index, weights=values, minlength=count) / np.bincount(index, minlength=count)
+    return np.where(weight_sums > 0, totals / np.where(weight_sums > 0, weight_sums, 1), means)
+
+
+def downsample_apps(monthly_apps, budget, method="lttb"):
+    """Reduce [[label, started, sent], ...] to at most `budget` rows."""
+    if not budget or len(monthly_apps) <= budget:
+        return [list(row) for row in monthly_apps]
+    values = np.array([row[1:3] for row in monthly_apps], dtype=np.float64)
+    if method == "calendar":
+        buckets = calendar_buckets([row[0] for row in monthly_apps], budget)
+        if buckets is not None:
+            index, labels = buckets
+            started = np.bincount(index, weights=values[:, 0], minlength=len(labels))
+            sent = np.bincount(index, weights=values[:, 1], minlength=len(labels))
+            return [[label, int(round(s)), int(round(t))] for label, s, t in zip(labels, started, sent)]
+    return [list(monthly_apps[i]) for i in lttb_indices(values, budget)]
+
+
+def downsample_cpa(monthly_cpa, budget, method="lttb", monthly_apps=None):
+    """Reduce [[label, cpa, jobs], ...] to at most `budget` rows.
+
+    For calendar buckets, CPA is weighted by the applications sent per month
+    from monthly_apps (matched by label); months without them weigh equally.
+    """
+    if not budget or len(monthly_cpa) <= budget:
+        return [list(row) for row in monthly_cpa]
+    values = np.array([row[1:3] for row in monthly_cpa], dtype=np.float64)
+    if method == "calendar":
+        buckets = calendar_buckets([row[0] for row in monthly_cpa], budget)
+        if buckets is not None:
+            index, labels = buckets
+            sent = {row[0]: row[2] for row in monthly_apps or []}
+            weights = np.array([sent.get(row[0], 0) for row in monthly_cpa], dtype=np.float64)
+            cpa = _weighted_mean(values[:, 0], weights, index, len(labels))
+            jobs = np.bincount(index, weights=values[:, 1], minlength=len(labels)) / np.bincount(index)
+            return [[label, round(float(c), 2), int(round(j))] for label, c, j in zip(labels, cpa, jobs)]
+    return [list(monthly_cpa[i]) for i in lttb_indices(values, budget)]
@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from standin import build_standin, make_accounting_rows, make_job_metric_rows, write_rows_csv  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def standin_rows():
+    """(job metric rows, accounting rows) of the default stand-in."""
+    return make_job_metric_rows(), make_accounting_rows()
+
+
+@pytest.fixture(scope="session")
+def standin_db(tmp_path_factory, standin_rows):
+    """Path of a SQLite stand-in database, shared by all tests (read only)."""
+    return build_standin(str(tmp_path_factory.mktemp("standin") / "standin.db"), *standin_rows)
+
+
+@pytest.fixture(scope="session")
+def standin_csv(tmp_path_factory, standin_rows):
+    """Path of the stand-in's job metric rows as a CSV export."""
+    return write_rows_csv(str(tmp_path_factory.mktemp("standin") / "rows.csv"), standin_rows[0])
+
+
+@pytest.fixture(scope="session")
+def template(tmp_path_factory):
+    """Path of a stand-in template: the python-pptx default with the template's two leading slides."""
+    from pptx import Presentation
+
+    prs = Presentation()
+    prs.slides.add_slide(prs.slide_layouts[0])
+    prs.slides.add_slide(prs.slide_layouts[1])
+    path = str(tmp_path_factory.mktemp("template") / "Template.pptx")
+    prs.save(path)
+    return path
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+SQLite Stand-in Fixtures
+Builds a small SQLite database with rep_job_metrics and rep_accounting tables
+in the warehouse layout (without the rds. schema), so report_queries,
+report_fetch and query_cache can run against a sqlite: URL. The same job
+metric rows can be written as a CSV export for
+metrics_aggregation.aggregate_file, which gives an independent result to
+compare the SQL path with.
+
+Rows are random but deterministic per seed. Jobs run for one to four
+months, so distinct job counts over a range are lower than the sum of the
+monthly counts. Rows of a product outside PRODUCT_TYPES are mixed in and
+must be filtered out. A few rows have no job id; they count in the sums
+but are not jobs, as in COUNT(DISTINCT job_id). Metric values are multiples of 0.5, so sums are exact
+in any order.
+
+Usage:
+    python tests/standin.py <db_path> [--rows-csv rows.csv] [--jobs 40] [--seed 0]
+
+Example:
+    python tests/standin.py /tmp/standin.db --rows-csv /tmp/rows.csv
+    python report_fetch.py sqlite:/tmp/standin.db REWE 2025-03 2025-10
+"""
+
+import argparse
+import csv
+import os
+import random
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from metrics_aggregation import PRODUCT_TYPES, ROW_COLUMNS  # noqa: E402
+from query_cache import month_range  # noqa: E402
+
+ACCOUNTS = ("REWE", "Lidl", "dm-drogerie markt")
+
+# Rows of products the reports do not cover
+EXTRA_PRODUCTS = ("Boost",)
+
+START_MONTH = "2025-01"
+END_MONTH = "2025-12"
+
+ACCOUNTING_COLUMNS = (
+    "ultimate_parent_company_name",
+    "product_type",
+    "purchase_id",
+    "date",
+    "booking_amount_eur",
+    "remaining_total_credit_eur",
+)
+
+
+def make_job_metric_rows(accounts=ACCOUNTS, start_month=START_MONTH, end_month=END_MONTH, jobs=40, seed=0):
+    """Return rep_job_metrics rows as tuples in ROW_COLUMNS order."""
+    rng = random.Random(seed)
+    months = month_range(start_month, end_month)
+    rows = []
+    for account in accounts:
+        for product in PRODUCT_TYPES + EXTRA_PRODUCTS:
+            for job_id in rng.sample(range(100000, 999999), jobs):
+                first = rng.randrange(len(months))
+                for month in months[first:first + rng.randint(1, 4)]:
+                    for day in sorted(rng.sample(range(1, 29), rng.randint(1, 3))):
+                        rows.append((
+                            account,
+                            product,
+                            f"{month}-{day:02d}",
+                            None if rng.random() < 0.02 else job_id,
+                            None if rng.random() < 0.05 else rng.randint(0, 500),
+                            rng.randint(0, 40),
+                            rng.randint(0, 10),
+                            rng.randint(0, 15),
+                            rng.randint(0, 5),
+                            rng.randint(0, 800) / 2,
+                        ))
+    return rows
+
+
+def make_accounting_rows(accounts=ACCOUNTS, start_month=START_MONTH, end_month=END_MONTH, seed=0):
+    """Return rep_accounting rows as tuples in ACCOUNTING_COLUMNS order.
+
+    Every purchase has a booking row on its first day, then one row per
+    following month with booking_amount_eur 0 and the remaining credit of
+    that day.
+    """
+    rng = random.Random(seed + 1)
+    months = month_range(start_month, end_month)
+    rows = []
+    for account in accounts:
+        for product in PRODUCT_TYPES + EXTRA_PRODUCTS:
+            for n in range(rng.randint(1, 3)):
+                purchase_id = f"{account}-{product}-{n}"
+                first = rng.randrange(len(months))
+                remaining = rng.randint(2000, 100000) / 2
+                rows.append((account, product, purchase_id, f"{months[first]}-{rng.randint(1, 28):02d}",
+                             remaining, remaining))
+                for month in months[first + 1:]:
+                    remaining = max(0.0, remaining - rng.randint(0, 10000) / 2)
+                    rows.append((account, product, purchase_id, f"{month}-28", 0, remaining))
+    return rows
+
+
+def build_standin(path, job_metric_rows=None, accounting_rows=None):
+    """Create (or replace) the stand-in tables in a SQLite file and return its path."""
+    job_metric_rows = make_job_metric_rows() if job_metric_rows is None else job_metric_rows
+    accounting_rows = make_accounting_rows() if accounting_rows is None else accounting_rows
+    db = sqlite3.connect(path)
+    with db:
+        db.execute("DROP TABLE IF EXISTS rep_job_metrics")
+        db.execute("DROP TABLE IF EXISTS rep_accounting")
+        db.execute(f"CREATE TABLE rep_job_metrics ({', '.join(ROW_COLUMNS)})")
+        db.execute(f"CREATE TABLE rep_accounting ({', '.join(ACCOUNTING_COLUMNS)})")
+        db.executemany(f"INSERT INTO rep_job_metrics VALUES ({', '.join('?' * len(ROW_COLUMNS))})",
+                       job_metric_rows)
+        db.executemany(f"INSERT INTO rep_accounting VALUES ({', '.join('?' * len(ACCOUNTING_COLUMNS))})",
+                       accounting_rows)
+    db.close()
+    return path
+
+
+def write_rows_csv(path, job_metric_rows):
+    """Write job metric rows as a CSV export readable by metrics_aggregation.aggregate_file."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(ROW_COLUMNS)
+        writer.writerows(["" if value is None else value for value in row] for row in job_metric_rows)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a SQLite stand-in of the warehouse tables.")
+    parser.add_argument("db_path")
+    parser.add_argument("--rows-csv", help="Also write the job metric rows as a CSV export")
+    parser.add_argument("--jobs", type=int, default=40, help="Jobs per account and product")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    job_metric_rows = make_job_metric_rows(jobs=args.jobs, seed=args.seed)
+    build_standin(args.db_path, job_metric_rows, make_accounting_rows(seed=args.seed))
+    print(f"{len(job_metric_rows)} job metric rows saved to: {args.db_path}")
+    if args.rows_csv:
+        write_rows_csv(args.rows_csv, job_metric_rows)
+        print(f"Rows export saved to: {args.rows_csv}")
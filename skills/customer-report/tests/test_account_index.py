@@ -0,0 +1,64 @@
+import pytest
+
+from account_index import AccountIndex, normalize
+
+NAMES = [
+    "Bauer Media Group", "Baur Versand GmbH", "Müller Holding GmbH", "Mueller Logistik", "Queen Mary Ltd",
+    "Blue Yonder GmbH", "DB AG", "DB Cargo AG", "Sandbox GmbH", "BMW AG", "REWE Markt GmbH", "Deutsche Bahn AG",
+]
+
+
+@pytest.fixture
+def index():
+    index = AccountIndex(":memory:")
+    index.add((name, "2025-01-01") for name in NAMES)
+    yield index
+    index.close()
+
+
+def names(candidates):
+    return [name for name, _, _ in candidates]
+
+
+@pytest.mark.parametrize("name, normalized", [
+    ("Müller Holding GmbH", "mueller"),
+    ("Mueller GmbH", "mueller"),
+    ("Müller", "mueller"),
+    ("Bauer Media Group", "bauer media group"),
+    ("Queen Mary Ltd", "queen mary"),
+    ("Straße AG & Co. KG", "strasse"),
+    ("DB AG", "db"),
+    ("AG", "ag"),
+])
+def test_normalize(name, normalized):
+    assert normalize(name) == normalized
+
+
+def test_ue_in_plain_words_is_kept(index):
+    # "Bauer" contains the query; "Baur" is only a fuzzy match
+    assert names(index.lookup("Bauer"))[:2] == ["Bauer Media Group", "Baur Versand GmbH"]
+    assert names(index.lookup("Baur"))[0] == "Baur Versand GmbH"
+    assert names(index.lookup("Queen"))[0] == "Queen Mary Ltd"
+    assert names(index.lookup("Blue"))[0] == "Blue Yonder GmbH"
+
+
+def test_umlaut_spellings_match(index):
+    for query in ("Müller", "Mueller", "MÜLLER HOLDING"):
+        assert index.lookup(query)[0][:2] == ("Müller Holding GmbH", 1.0)
+    # Without the e it is a close match, ranked below exact and contained names
+    candidates = index.lookup("Muller")
+    assert candidates[0][0] == "Müller Holding GmbH" and candidates[0][1] < 0.8
+
+
+def test_ranking_is_exact_then_contains_then_fuzzy(index):
+    candidates = index.lookup("Mueller")
+    assert candidates[0] == ("Müller Holding GmbH", 1.0, "2025-01-01")
+    assert 0.8 < candidates[1][1] < 1.0 and candidates[1][0] == "Mueller Logistik"
+
+
+def test_short_names_match_exactly_or_by_prefix(index):
+    assert names(index.lookup("DB AG")) == ["DB AG", "DB Cargo AG"]
+    assert names(index.lookup("db")) == ["DB AG", "DB Cargo AG"]
+    assert names(index.lookup("bm")) == ["BMW AG"]
+    assert index.lookup("xy") == []
+
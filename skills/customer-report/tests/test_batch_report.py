@@ -0,0 +1,36 @@
+import json
+import os
+
+import batch_report
+from batch_report import run_batch
+from standin import ACCOUNTS
+from synthetic_data import make_report_data
+
+
+def write_payloads(path, accounts):
+    with open(path, "w") as f:
+        for account in accounts:
+            f.write(json.dumps(make_report_data(account)) + "\n")
+    return str(path)
+
+
+def test_dead_worker_is_recorded_and_manifest_written(tmp_path, template, monkeypatch):
+    generate_report = batch_report.generate_report
+
+    def dies_for_lidl(data, *args, **kwargs):
+        if data["account_name"] == "Lidl":
+            os._exit(1)
+        return generate_report(data, *args, **kwargs)
+
+    # Patched before the pool forks its workers
+    monkeypatch.setattr(batch_report, "generate_report", dies_for_lidl)
+    payloads = write_payloads(tmp_path / "payloads.jsonl", ACCOUNTS)
+    manifest = run_batch(payloads, template, str(tmp_path / "out"), workers=1, fast=True)
+
+    with open(tmp_path / "out" / "manifest.json") as f:
+        assert json.load(f) == manifest
+    assert [report["account_name"] for report in manifest["reports"]] == list(ACCOUNTS)
+    lidl = manifest["reports"][ACCOUNTS.index("Lidl")]
+    assert lidl["status"] == "failed" and "BrokenProcessPool" in lidl["error"]
+    assert manifest["total"] == len(ACCOUNTS)
+    assert manifest["failed"] == len(ACCOUNTS) - manifest["succeeded"] >= 1
@@ -0,0 +1,95 @@
+import copy
+import io
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+
+from customer_report_generator import generate_report, preload
+from report_profiling import Profiler
+from synthetic_data import make_report_data
+
+
+def with_products(data, count):
+    """data with count products: REACH, HIRE and copies of REACH's block."""
+    data = dict(data)
+    keys = ["reach", "hire"] + [f"extra{n}" for n in range(count - 2)]
+    for key in keys[2:]:
+        data[key] = data["reach"]
+    data["products"] = keys
+    return data
+
+
+def slides(report):
+    """[(slide XML, [chart XML by rId])] of a saved report."""
+    return [(slide.part.blob, [rel.target_part.blob for _, rel in sorted(slide.part.rels.items())
+                               if rel.reltype == RT.CHART])
+            for slide in Presentation(report).slides]
+
+
+def build(data, template, **options):
+    output = io.BytesIO()
+    generate_report(data, template, output, **options)
+    output.seek(0)
+    return output
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_product_workers_match_serial_build(template, fast):
+    data = with_products(make_report_data("REWE"), 6)
+    serial = slides(build(data, template, fast=fast))
+    profiler = Profiler()
+    with ProcessPoolExecutor(max_workers=2, initializer=preload, initargs=(template,)) as executor:
+        parallel = slides(build(data, template, fast=fast, product_workers=executor, profiler=profiler))
+    # Every product section came from the executor
+    assert set(profiler.seconds("sections")) == {f"wait_{key}" for key in data["products"]}
+    assert len(parallel) == len(serial)
+    # A CPA and an applications chart per product
+    assert sum(len(charts) for _, charts in serial) >= 2 * 6
+    for index, (slide, expected) in enumerate(zip(parallel, serial)):
+        assert slide == expected, f"slide {index + 1} differs"
+
+
+def test_product_workers_must_be_an_executor(template):
+    with pytest.raises(TypeError, match="Executor"):
+        build(make_report_data("REWE"), template, product_workers=4)
+
+
+def reused(capsys):
+    """(reused, total) slides of the last incremental build, from its output."""
+    return tuple(map(int, re.findall(r"Reused (\d+) of (\d+) slides", capsys.readouterr().out)[-1]))
+
+
+@pytest.mark.parametrize("chart_workbooks", ["embedded", "shared"])
+@pytest.mark.parametrize("fast", [False, True])
+def test_incremental_build_reuses_unchanged_slides(template, tmp_path, capsys, chart_workbooks, fast):
+    data = make_report_data("REWE")
+    changed = copy.deepcopy(data)
+    changed["hire"] = make_report_data("Lidl")["hire"]
+    output = str(tmp_path / "REWE.pptx")
+
+    def incremental(data):
+        generate_report(data, template, output, incremental=True, fast=fast, chart_workbooks=chart_workbooks)
+        return reused(capsys)
+
+    assert incremental(data) == (0, 12)
+    assert incremental(data) == (12, 12)
+    # HIRE's charts, and the executive summary, budget details and dashboard that show its KPIs
+    assert incremental(changed) == (7, 12)
+    assert incremental(changed) == (12, 12)
+
+    # Reused slides and charts are the ones a full build makes
+    assert slides(output) == slides(build(changed, template, fast=fast, chart_workbooks=chart_workbooks))
+    workbooks = [name for name in zipfile.ZipFile(output).namelist() if name.startswith("ppt/embeddings/")]
+    assert len(workbooks) == (1 if chart_workbooks == "shared" else 4)
+
+
+def test_incremental_build_without_manifest_rebuilds_everything(template, tmp_path, capsys):
+    output = str(tmp_path / "REWE.pptx")
+    generate_report(make_report_data("REWE"), template, output, incremental=True)
+    (tmp_path / "REWE.manifest.json").unlink()
+    generate_report(make_report_data("REWE"), template, output, incremental=True)
+    assert reused(capsys) == (0, 12)
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from metrics_aggregation import PRODUCT_TYPES, ROW_COLUMNS, MetricsAccumulator, aggregate_file
+
+
+def chunk(rows):
+    return {column: [row[i] for row in rows] for i, column in enumerate(ROW_COLUMNS)}
+
+
+def brute_force_jobs(rows):
+    """({product: {month: distinct jobs}}, {product: distinct jobs}), ids compared as integers, nulls skipped."""
+    monthly, totals = {}, {}
+    for _, product, day, job_id, *_ in rows:
+        if product not in PRODUCT_TYPES:
+            continue
+        jobs = monthly.setdefault(product, {}).setdefault(day[:7], set())
+        if job_id is not None:
+            jobs.add(int(job_id))
+            totals.setdefault(product, set()).add(int(job_id))
+    return ({product: {month: len(jobs) for month, jobs in months.items()} for product, months in monthly.items()},
+            {product: len(jobs) for product, jobs in totals.items()})
+
+
+def job_counts(accumulator):
+    return ({product: {month: metrics["jobs"] for month, metrics in months.items()}
+             for product, months in accumulator.monthly().items()},
+            {product: metrics["jobs"] for product, metrics in accumulator.totals().items()})
+
+
+def as_float_chunk(rows):
+    # A chunk read with pandas: a column with nulls becomes float64 with NaN
+    return [row[:3] + (float("nan") if row[3] is None else float(row[3]),) + row[4:] for row in rows]
+
+
+def as_text_chunk(rows):
+    # A CSV chunk: ids are text, nulls are empty strings
+    return [row[:3] + ("" if row[3] is None else str(row[3]),) + row[4:] for row in rows]
+
+
+@pytest.mark.parametrize("chunk_size", [7, 50, 1000])
+def test_distinct_jobs_match_brute_force_across_chunks(standin_rows, chunk_size):
+    rows = [row for row in standin_rows[0] if row[0] == "REWE"]
+    assert any(row[3] is None for row in rows)
+    accumulator = MetricsAccumulator("REWE")
+    rng = random.Random(chunk_size)
+    for start in range(0, len(rows), chunk_size):
+        piece = rows[start:start + chunk_size]
+        # Chunks without nulls keep integer ids; the others come as floats or text
+        if any(row[3] is None for row in piece):
+            piece = rng.choice([as_float_chunk, as_text_chunk])(piece)
+        accumulator.add_chunk(chunk(piece))
+
+    assert job_counts(accumulator) == brute_force_jobs(rows)
+
+
+def test_same_job_in_int_and_text_chunks_counts_once():
+    row = ("REWE", "Reach", "2025-01-05", 2, 10, 1, 0, 1, 0, 5.0)
+    accumulator = MetricsAccumulator("REWE")
+    accumulator.add_chunk(chunk([row]))
+    accumulator.add_chunk(chunk([row[:3] + ("2",) + row[4:], row[:3] + (None,) + row[4:]]))
+    accumulator.add_chunk(chunk([row[:3] + (2.0,) + row[4:], row[:3] + (float("nan"),) + row[4:]]))
+    assert accumulator.totals()["Reach"]["jobs"] == 1
+    # Rows without a job id still count in the sums
+    assert accumulator.totals()["Reach"]["page_views"] == 50
+
+
+@pytest.mark.parametrize("chunk_size", [13, 100000])
+def test_aggregate_file_counts_do_not_depend_on_chunks(standin_csv, chunk_size):
+    assert aggregate_file(standin_csv, "Lidl", chunk_size=chunk_size) == aggregate_file(standin_csv, "Lidl")
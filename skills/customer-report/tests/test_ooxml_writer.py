@@ -0,0 +1,39 @@
+import io
+import zipfile
+import zlib
+
+import pytest
+
+from customer_report_generator import generate_report
+from ooxml_writer import MAYBE_COMPRESSED_EXTENSIONS
+from synthetic_data import make_report_data
+
+
+def build(template, **options):
+    output = io.BytesIO()
+    generate_report(make_report_data("REWE"), template, output, **options)
+    return output.getvalue()
+
+
+def deflate(blob):
+    compressor = zlib.compressobj(-1, zlib.DEFLATED, -15)
+    return compressor.compress(blob) + compressor.flush()
+
+
+@pytest.mark.parametrize("options", [{"fast": True}, {"compresslevel": 9}, {"slim": True, "compresslevel": 9}])
+def test_own_writer_is_not_larger_than_prs_save(template, options):
+    baseline = build(template, slim=options.get("slim", False))
+    # Zip headers differ a little between the writers
+    assert len(build(template, **options)) <= len(baseline) * 1.005
+
+
+def test_parts_are_stored_only_when_deflate_does_not_help(template):
+    package = zipfile.ZipFile(io.BytesIO(build(template, fast=True)))
+    parts = [info for info in package.infolist() if info.filename.endswith(MAYBE_COMPRESSED_EXTENSIONS)]
+    assert parts
+    for info in parts:
+        if info.compress_type == zipfile.ZIP_STORED:
+            assert len(deflate(package.read(info))) >= info.file_size
+        else:
+            assert info.compress_size < info.file_size
+
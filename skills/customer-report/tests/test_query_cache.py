@@ -0,0 +1,99 @@
+from datetime import date
+
+import pytest
+
+from query_cache import DATA_TABLES, QueryCache, month_range
+from report_fetch import ConnectionPool, fetch_report_data
+from report_queries import connect
+
+# All stand-in months are closed on this day
+AFTER_RANGE = date(2026, 3, 1)
+
+
+@pytest.fixture
+def warehouse(standin_db):
+    conn, dialect = connect(f"sqlite:{standin_db}")
+    yield conn, dialect
+    conn.close()
+
+
+@pytest.fixture
+def cache():
+    cache = QueryCache(":memory:")
+    yield cache
+    cache.close()
+
+
+def age(cache, account, months, days):
+    """Make cached months look fetched `days` days earlier."""
+    with cache.db:
+        cache.db.executemany("UPDATE partitions SET fetched_at = fetched_at - ? WHERE account = ? AND month = ?",
+                             [(days * 86400, account, month) for month in months])
+
+
+def cached_months(cache, account, table):
+    return {month for month, in cache.db.execute(f"SELECT DISTINCT month FROM {table} WHERE account = ?",
+                                                  (account,))}
+
+
+def test_second_run_fetches_nothing(cache, warehouse):
+    assert cache.refresh(*warehouse, "REWE", "2025-02", "2025-11", today=AFTER_RANGE) == \
+        month_range("2025-02", "2025-11")
+    assert cache.refresh(*warehouse, "REWE", "2025-02", "2025-11", today=AFTER_RANGE) == []
+    # A wider range only fetches the months around the cached ones
+    assert cache.refresh(*warehouse, "REWE", "2025-01", "2025-12", today=AFTER_RANGE) == ["2025-01", "2025-12"]
+
+
+def test_open_month_is_refetched(cache, warehouse):
+    cache.refresh(*warehouse, "REWE", "2025-01", "2025-06", today=date(2025, 6, 15))
+    assert cache.refresh(*warehouse, "REWE", "2025-01", "2025-06", today=date(2025, 6, 20)) == ["2025-06"]
+    # Fetched after the month ended, it stays cached
+    cache.refresh(*warehouse, "REWE", "2025-01", "2025-06", today=date(2025, 7, 2))
+    assert cache.refresh(*warehouse, "REWE", "2025-01", "2025-06", today=date(2025, 7, 3)) == []
+
+
+def test_expired_months_are_refetched(warehouse):
+    cache = QueryCache(":memory:", ttl_days=7)
+    cache.refresh(*warehouse, "REWE", "2025-01", "2025-06", today=AFTER_RANGE)
+    age(cache, "REWE", ["2025-02", "2025-03"], days=8)
+    age(cache, "REWE", ["2025-04"], days=6)
+    assert cache.refresh(*warehouse, "REWE", "2025-01", "2025-06", today=AFTER_RANGE) == ["2025-02", "2025-03"]
+    cache.close()
+
+
+def test_invalidate_forces_refetch(cache, warehouse):
+    cache.refresh(*warehouse, "REWE", "2025-01", "2025-06", today=AFTER_RANGE)
+    cache.refresh(*warehouse, "Lidl", "2025-01", "2025-06", today=AFTER_RANGE)
+    cache.invalidate("REWE")
+    for table in DATA_TABLES:
+        assert cached_months(cache, "REWE", table) == set()
+    assert cache.refresh(*warehouse, "REWE", "2025-01", "2025-06", today=AFTER_RANGE) == \
+        month_range("2025-01", "2025-06")
+    # Other accounts keep their cache
+    assert cache.refresh(*warehouse, "Lidl", "2025-01", "2025-06", today=AFTER_RANGE) == []
+
+
+def test_evicted_partitions_are_gone(cache, warehouse):
+    cache.refresh(*warehouse, "REWE", "2025-01", "2025-06", today=AFTER_RANGE)
+    before = cached_months(cache, "REWE", "month_metrics")
+    age(cache, "REWE", ["2025-01", "2025-02"], days=40)
+
+    assert cache.evict(30) == 2
+    for table in DATA_TABLES:
+        assert not cached_months(cache, "REWE", table) & {"2025-01", "2025-02"}
+    assert cached_months(cache, "REWE", "month_metrics") == before - {"2025-01", "2025-02"}
+    assert cache.stale_months("REWE", "2025-01", "2025-06") == ["2025-01", "2025-02"]
+    assert cache.evict(30) == 0
+
+
+@pytest.mark.parametrize("account", ["REWE", "Lidl"])
+def test_cached_report_equals_direct_fetch(cache, warehouse, standin_db, account):
+    # Fill the cache in pieces, so the report is assembled from partitions of several refreshes
+    cache.refresh(*warehouse, account, "2025-04", "2025-06", today=AFTER_RANGE)
+    cache.refresh(*warehouse, account, "2025-09", "2025-10", today=AFTER_RANGE)
+    cached = cache.report_data(*warehouse, account, "2025-02", "2025-11", today=AFTER_RANGE)
+    assert cache.refresh(*warehouse, account, "2025-02", "2025-11", today=AFTER_RANGE) == []
+
+    with ConnectionPool(f"sqlite:{standin_db}", 3) as pool:
+        direct = fetch_report_data(pool, account, "2025-02", "2025-11")
+    assert cached == direct
@@ -0,0 +1,112 @@
+import shutil
+import sqlite3
+
+import pytest
+
+import refresh_scheduler
+from refresh_scheduler import DONE, FAILED, RefreshState, run_refresh
+from standin import ACCOUNTS
+
+
+class Crash(Exception):
+    pass
+
+
+@pytest.fixture
+def source(tmp_path, standin_db):
+    """A copy of the stand-in whose data the test may change."""
+    path = str(tmp_path / "warehouse.db")
+    shutil.copy(standin_db, path)
+    return path
+
+
+@pytest.fixture
+def refresh(tmp_path, source, template):
+    def refresh(**kwargs):
+        return run_refresh(f"sqlite:{source}", [{"account": account, "deadline": None} for account in ACCOUNTS],
+                           template, str(tmp_path / "reports"), end_month="2025-12", workers=1,
+                           options={"fast": True}, **kwargs)
+    return refresh
+
+
+def fail_reports(monkeypatch, accounts, exit_worker=False):
+    """Make the report of accounts fail in the workers (forked after this patch), or kill the worker."""
+    generate_report = refresh_scheduler.generate_report
+
+    def failing(data, *args, **kwargs):
+        if data["account_name"] in accounts:
+            if exit_worker:
+                refresh_scheduler.os._exit(1)
+            raise RuntimeError(f"no report for {data['account_name']}")
+        return generate_report(data, *args, **kwargs)
+
+    monkeypatch.setattr(refresh_scheduler, "generate_report", failing)
+
+
+def change_spend(source, account):
+    with sqlite3.connect(source) as db:
+        db.execute("UPDATE rep_job_metrics SET net_revenue_eur = net_revenue_eur + 10 WHERE rowid = "
+                   "(SELECT MIN(rowid) FROM rep_job_metrics WHERE ultimate_parent_company_name = ? "
+                   "AND product_type = 'Reach')", (account,))
+    db.close()
+
+
+def statuses(run):
+    return {account: job["status"] for account, job in run["jobs"].items()}
+
+
+def test_failing_account_does_not_block_other_changes(refresh, source, monkeypatch, tmp_path):
+    fail_reports(monkeypatch, {"Lidl"})
+    assert statuses(refresh()) == {"REWE": DONE, "Lidl": FAILED, "dm-drogerie markt": DONE}
+    # The run is closed although Lidl failed
+    assert RefreshState(str(tmp_path / "reports" / "refresh_state.json")).run is None
+
+    change_spend(source, "REWE")
+    assert statuses(refresh()) == {"REWE": DONE, "Lidl": FAILED}
+
+    monkeypatch.undo()
+    assert statuses(refresh()) == {"Lidl": DONE}
+    assert refresh()["jobs"] == {}
+
+
+def test_crashed_run_is_resumed_then_changes_are_detected(refresh, source, monkeypatch, tmp_path):
+    wait = refresh_scheduler.wait
+    calls = []
+
+    def crash_on_second_wait(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise Crash()
+        return wait(*args, **kwargs)
+
+    monkeypatch.setattr(refresh_scheduler, "wait", crash_on_second_wait)
+    with pytest.raises(Crash):
+        refresh()
+    monkeypatch.undo()
+
+    run = RefreshState(str(tmp_path / "reports" / "refresh_state.json")).run
+    assert len(run["jobs"]) == len(ACCOUNTS)
+    finished = [account for account, job in run["jobs"].items() if job["status"] == DONE]
+    assert len(finished) == 1
+
+    # Resuming does not read watermarks again: the change is picked up by the next run
+    change_spend(source, finished[0])
+    resumed = refresh()
+    assert set(statuses(resumed).values()) == {DONE}
+    # The account finished before the crash is not built again
+    assert resumed["jobs"][finished[0]]["attempts"] == 1
+    assert statuses(refresh()) == {finished[0]: DONE}
+    assert refresh()["jobs"] == {}
+
+
+def test_dead_worker_fails_its_jobs(refresh, monkeypatch, tmp_path):
+    fail_reports(monkeypatch, {"Lidl"}, exit_worker=True)
+    run = refresh()
+    assert run["jobs"]["Lidl"]["status"] == FAILED
+    assert "BrokenProcessPool" in run["jobs"]["Lidl"]["error"]
+    assert RefreshState(str(tmp_path / "reports" / "refresh_state.json")).run is None
+
+    monkeypatch.undo()
+    # Every account the broken pool did not finish is queued again
+    failed = {account for account, status in statuses(run).items() if status == FAILED}
+    assert statuses(refresh()) == {account: DONE for account in failed}
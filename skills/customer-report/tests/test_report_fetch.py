@@ -0,0 +1,117 @@
+import sqlite3
+import time
+
+import pytest
+
+import report_fetch
+from metrics_aggregation import PRODUCT_TYPES, aggregate_file
+from query_cache import next_month
+from report_fetch import ConnectionPool, QueryError, ReportDataSink, fetch_report_data, run_pooled
+from report_queries import MONTHLY_BOOKINGS
+
+# Runs until the progress handler aborts it
+ENDLESS_QUERY = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT COUNT(*) FROM c"
+
+
+def expected_budget(accounting_rows, account, start_month, end_month):
+    """Booked budget in the range and current remaining credit per product, computed without SQL."""
+    start, end = f"{start_month}-01", f"{next_month(end_month)}-01"
+    budget = {product: {"booked": 0, "remaining": 0} for product in PRODUCT_TYPES}
+    latest = {}
+    for name, product, purchase_id, day, booked, remaining in accounting_rows:
+        if name != account or product not in budget:
+            continue
+        if booked > 0 and start <= day < end:
+            budget[product]["booked"] += booked
+        if purchase_id not in latest or day > latest[purchase_id][0]:
+            latest[purchase_id] = (day, product, remaining)
+    for _, product, remaining in latest.values():
+        budget[product]["remaining"] += remaining
+    return budget
+
+
+@pytest.fixture
+def pool(standin_db):
+    with ConnectionPool(f"sqlite:{standin_db}", 3) as pool:
+        yield pool
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(report_fetch, "RETRY_BACKOFF", 0)
+
+
+@pytest.mark.parametrize("account, start_month, end_month", [
+    ("REWE", "2025-01", "2025-12"),
+    ("Lidl", "2025-03", "2025-10"),
+    ("dm-drogerie markt", "2025-06", "2025-06"),
+])
+def test_fetch_matches_aggregate_file(pool, standin_rows, standin_csv, account, start_month, end_month):
+    timings = {}
+    data = fetch_report_data(pool, account, start_month, end_month, timings=timings)
+
+    budget = expected_budget(standin_rows[1], account, start_month, end_month)
+    expected = aggregate_file(standin_csv, account, f"{start_month}-01", f"{end_month}-31", budget=budget)
+    assert data == expected
+    assert set(timings) == {"metrics", "booked_budget", "remaining_budget"}
+    if start_month < end_month:
+        # Jobs running over several months are counted once in the totals
+        reach = data["reach"]
+        assert reach["total_jobs"] < sum(jobs for _, _, jobs in reach["monthly_cpa"])
+
+
+def test_fetch_reports_failed_queries(tmp_path):
+    with ConnectionPool(f"sqlite:{tmp_path / 'empty.db'}", 3) as pool:
+        with pytest.raises(QueryError) as error:
+            fetch_report_data(pool, "REWE", "2025-01", "2025-12", retries=0)
+    for name in ("metrics", "booked_budget", "remaining_budget"):
+        assert f"{name}: OperationalError" in str(error.value)
+
+
+def test_run_pooled_retries_after_timeout(pool, monkeypatch, no_backoff):
+    """The first attempt streams some rows and then times out; the retry must not count them twice."""
+    real_iter_query = report_fetch.iter_query
+    calls = []
+
+    def first_attempt_times_out(conn, sql, dialect, params, products):
+        calls.append(conn)
+        if len(calls) == 1:
+            yield from list(real_iter_query(conn, sql, dialect, params, products))[:3]
+            yield from real_iter_query(conn, ENDLESS_QUERY, dialect, (), products)
+        else:
+            yield from real_iter_query(conn, sql, dialect, params, products)
+
+    monkeypatch.setattr(report_fetch, "iter_query", first_attempt_times_out)
+    sink = ReportDataSink()
+    params = ("REWE", "2025-01-01", "2026-01-01")
+    stats = run_pooled(pool, MONTHLY_BOOKINGS, params, sink.add_bookings, timeout=0.2, retries=2)
+
+    assert stats["attempts"] == 2
+    assert stats["rows"] > 0
+    # The timed-out connection was closed, not handed out again
+    assert calls[1] is not calls[0]
+    with pytest.raises(sqlite3.ProgrammingError):
+        calls[0].cursor()
+
+    expected = ReportDataSink()
+    monkeypatch.setattr(report_fetch, "iter_query", real_iter_query)
+    run_pooled(pool, MONTHLY_BOOKINGS, params, expected.add_bookings)
+    assert sink.booked == expected.booked
+
+
+def test_run_pooled_gives_up_after_retries(pool, no_backoff):
+    with pytest.raises(sqlite3.OperationalError, match="interrupted"):
+        run_pooled(pool, ENDLESS_QUERY, (), lambda row: None, timeout=0.05, retries=2)
+    # Every failed connection was discarded, so the pool can open fresh ones
+    assert pool._opened == 0
+    stats = run_pooled(pool, MONTHLY_BOOKINGS, ("REWE", "2025-01-01", "2026-01-01"), lambda row: None)
+    assert stats["attempts"] == 1
+
+
+def test_timeout_is_cleared_after_a_query(pool):
+    run_pooled(pool, MONTHLY_BOOKINGS, ("REWE", "2025-01-01", "2026-01-01"), lambda row: None, timeout=0.05)
+    time.sleep(0.1)
+    with pool.connection() as conn:
+        # A later query on the same connection is not cut short by the old deadline
+        conn.execute("WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 300000) "
+                     "SELECT COUNT(*) FROM c").fetchall()
@@ -0,0 +1,125 @@
+import copy
+import json
+import struct
+from array import array
+
+import pytest
+
+from report_model import (INT_TYPECODE, MAX_LISTED_ERRORS, RESERVED_KEYS, ReportData, ReportDataError, iter_records,
+                          load_report_data, read_payloads)
+from synthetic_data import make_report_data
+
+
+@pytest.fixture
+def payload():
+    return make_report_data("REWE")
+
+
+def errors_of(payload):
+    with pytest.raises(ReportDataError) as error:
+        load_report_data(payload)
+    return error.value.errors
+
+
+def test_valid_payload_keeps_dict_access(payload):
+    data = load_report_data(payload)
+    assert data.to_json() == payload
+    assert list(data.products) == ["reach", "hire"]
+    assert data["reach"]["monthly_cpa"][0] == tuple(payload["reach"]["monthly_cpa"][0])
+    assert load_report_data(data) is data
+
+
+def test_every_problem_is_listed_with_its_path(payload):
+    del payload["account_name"]
+    payload["total"]["avg_cpa"] = float("inf")
+    payload["reach"]["total_jobs"] = "12x"
+    payload["reach"]["monthly_cpa"] = [["01/25", 1.5, 2.5], "bad", [3, 1.0, 1]]
+    del payload["hire"]["monthly_apps"]
+    assert errors_of(payload) == [
+        "account_name: missing",
+        "total.avg_cpa: expected a finite number, got inf",
+        "reach.total_jobs: expected a number, got '12x'",
+        "reach.monthly_cpa[0][2]: expected a whole number, got 2.5",
+        "reach.monthly_cpa[1]: expected [month, cpa, jobs], got 'bad'",
+        "reach.monthly_cpa[2][0]: expected a month label, got 3",
+        "hire.monthly_apps: missing",
+    ]
+
+
+def test_numbers_in_strings_are_coerced(payload):
+    payload["reach"]["total_jobs"] = " 12 "
+    payload["reach"]["monthly_apps"][0][1] = "7"
+    data = load_report_data(payload)
+    assert data["reach"]["total_jobs"] == 12
+    assert data["reach"]["monthly_apps"][0][1] == 7
+
+
+def test_long_error_lists_are_cut_in_the_message(payload):
+    payload["reach"]["monthly_apps"] = [["01/25", "x", "y"]] * 20
+    error = ReportDataError(errors_of(payload))
+    assert len(error.errors) == 40
+    assert str(error).endswith(f"(and {40 - MAX_LISTED_ERRORS} more)")
+
+
+@pytest.mark.parametrize("key", [key for key in RESERVED_KEYS if key != "products"])
+def test_reserved_keys_cannot_name_products(payload, key):
+    payload["products"] = ["reach", key]
+    payload[key] = payload["hire"]
+    assert "products[1]: not a product key: " + repr(key) in errors_of(payload)
+
+
+def test_product_list_is_checked(payload):
+    payload["products"] = ["reach", "reach", "boost", 3]
+    assert errors_of(payload) == [
+        "products[1]: 'reach' is listed twice",
+        "products[3]: not a product key: 3",
+        "boost: missing",
+    ]
+
+
+def test_industry_stays_a_top_level_value(payload):
+    payload["industry"] = "Retail"
+    data = load_report_data(payload)
+    assert data["industry"] == "Retail" and "industry" not in data.products
+
+
+def test_binary_round_trip(payload):
+    payload["products"] = ["reach", "hire", "boost"]
+    payload["boost"] = copy.deepcopy(payload["reach"])
+    payload["boost"]["monthly_cpa"] = payload["boost"]["monthly_cpa"][:3]
+    payload["boost"]["monthly_apps"][0][1] = 2 ** 40
+    payload["industry"] = "Retail"
+    data = load_report_data(payload)
+    blob = data.to_bytes()
+    assert ReportData.from_bytes(blob) == data
+    assert ReportData.from_bytes(blob).to_json() == payload
+    assert list(iter_records(blob * 3)) == [data] * 3
+
+
+def test_series_columns_have_a_fixed_width(payload):
+    data = load_report_data(payload)
+    assert array(INT_TYPECODE).itemsize == 8
+    assert data["reach"]["monthly_apps"].columns[0].itemsize == 8
+    # Header: magic, header length, body length; the body is two 8-byte columns per series
+    _, _, body_len = struct.unpack_from("<4sII", data.to_bytes())
+    assert body_len == sum(8 * 2 * (len(data[key]["monthly_cpa"]) + len(data[key]["monthly_apps"]))
+                           for key in data.products)
+
+
+@pytest.mark.parametrize("damage, message", [
+    (lambda blob: blob[:-1], "binary record: truncated"),
+    (lambda blob: b"XXXX" + blob[4:], "binary record: not a report data record"),
+    (lambda blob: blob[:10], "binary record: truncated"),
+])
+def test_damaged_records_are_reported(payload, damage, message):
+    with pytest.raises(ReportDataError, match=message):
+        ReportData.from_bytes(damage(load_report_data(payload).to_bytes()))
+
+
+def test_read_payloads_reports_broken_lines(tmp_path, payload):
+    path = tmp_path / "payloads.jsonl"
+    broken = dict(payload, time_range_months="twelve")
+    path.write_text("\n".join(map(json.dumps, [payload, broken])) + "\n")
+    results = list(read_payloads(str(path)))
+    assert [error for _, _, error in results] == [
+        None, "Invalid report data: time_range_months: expected a number, got 'twelve'"]
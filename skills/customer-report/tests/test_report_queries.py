@@ -0,0 +1,90 @@
+import sqlite3
+
+import pytest
+
+from metrics_aggregation import PRODUCT_TYPES, MetricsRollup
+from report_queries import JOB_MONTH_METRICS, REPORT_METRICS, metrics_query, render, run_query
+
+PARAMS = ("REWE", "2025-02-01", "2025-12-01")
+
+GROUPING_SETS = "GROUP BY GROUPING SETS ((product_type, {month_dt}), (product_type))"
+
+
+def union_all_rewrite(sql):
+    """REPORT_METRICS with its two grouping sets as two GROUP BY queries, for engines without GROUPING SETS."""
+    select, grouping = sql.split("GROUP BY", 1)
+    assert "GROUP BY" + grouping.rstrip() == GROUPING_SETS, "REPORT_METRICS changed, update the rewrite"
+    monthly = select + "GROUP BY product_type, {month_dt}\n"
+    totals = select.replace("{month_dt} as month", "NULL as month") + "GROUP BY product_type\n"
+    return monthly + "UNION ALL\n" + totals
+
+
+def rollup(rows, per_job):
+    metrics = MetricsRollup()
+    for row in rows:
+        if per_job:
+            metrics.add_job_month(row)
+        else:
+            metrics.add_grouped(row)
+    return metrics
+
+
+@pytest.fixture
+def conn(standin_db):
+    conn = sqlite3.connect(standin_db)
+    yield conn
+    conn.close()
+
+
+def test_metrics_query_by_dialect():
+    assert metrics_query("redshift") == (REPORT_METRICS, False)
+    assert metrics_query("sqlite") == (JOB_MONTH_METRICS, True)
+
+
+def test_grouping_sets_match_job_month_rollup(conn):
+    # Both halves of the rewrite take the account and date range
+    grouped_rows = run_query(conn, union_all_rewrite(REPORT_METRICS), "sqlite", PARAMS * 2, PRODUCT_TYPES)
+    job_month_rows = run_query(conn, JOB_MONTH_METRICS, "sqlite", PARAMS, PRODUCT_TYPES)
+    grouped = rollup(grouped_rows, per_job=False)
+    per_job = rollup(job_month_rows, per_job=True)
+
+    # Rows with month NULL are the totals, with distinct jobs over the whole range
+    total_rows = [row for row in grouped_rows if row[1] is None]
+    assert sorted(row[0] for row in total_rows) == sorted(PRODUCT_TYPES)
+    assert grouped.totals() == per_job.totals()
+    assert grouped.monthly() == per_job.monthly()
+    for product, _, jobs, *_ in total_rows:
+        # COUNT(DISTINCT job_id) skips rows without a job id
+        distinct = {job_id for p, _, job_id, *_ in job_month_rows if p == product and job_id is not None}
+        assert jobs == len(distinct)
+        # The exact count is lower than adding up the months, as jobs run over several months
+        assert jobs < sum(m["jobs"] for m in per_job.monthly()[product].values())
+
+
+def test_rollup_ignores_rows_passed_again(conn):
+    rows = run_query(conn, JOB_MONTH_METRICS, "sqlite", PARAMS, PRODUCT_TYPES)
+    once = rollup(rows, per_job=True)
+    twice = rollup(rows + rows[: len(rows) // 2], per_job=True)
+    assert twice.totals() == once.totals()
+    assert twice.monthly() == once.monthly()
+
+
+def test_grouping_sets_on_duckdb(standin_db):
+    """REPORT_METRICS as written, on an engine with GROUPING SETS (skipped without duckdb)."""
+    duckdb = pytest.importorskip("duckdb")
+    db = duckdb.connect()
+    try:
+        db.execute("INSTALL sqlite; LOAD sqlite;")
+    except duckdb.Error as e:
+        pytest.skip(f"duckdb sqlite extension not available: {e}")
+    db.execute(f"ATTACH '{standin_db}' AS standin (TYPE sqlite); USE standin;")
+    # The SQLite dialect's month expression and placeholders also work in DuckDB
+    sql = render(REPORT_METRICS, "sqlite", PRODUCT_TYPES)
+    grouped_rows = [tuple(row) for row in db.execute(sql, PARAMS).fetchall()]
+
+    conn = sqlite3.connect(standin_db)
+    per_job = rollup(run_query(conn, JOB_MONTH_METRICS, "sqlite", PARAMS, PRODUCT_TYPES), per_job=True)
+    conn.close()
+    grouped = rollup(grouped_rows, per_job=False)
+    assert grouped.totals() == per_job.totals()
+    assert grouped.monthly() == per_job.monthly()
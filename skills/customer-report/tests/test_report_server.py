@@ -0,0 +1,67 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from report_server import PPTX_CONTENT_TYPE, make_server
+from synthetic_data import make_report_data
+
+PAYLOAD = json.dumps(make_report_data("REWE")).encode("utf-8")
+
+
+@pytest.fixture(scope="module")
+def server(template):
+    server = make_server(template, port=0, workers=1, fast=True, max_body=len(PAYLOAD))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    server.pool.shutdown()
+
+
+def post(server, headers, body=b""):
+    """POST /report with exactly these headers; returns (status, content type, body)."""
+    conn = http.client.HTTPConnection(*server.server_address, timeout=60)
+    try:
+        conn.putrequest("POST", "/report")
+        for name, value in headers.items():
+            conn.putheader(name, value)
+        conn.endheaders(body)
+        response = conn.getresponse()
+        return response.status, response.getheader("Content-Type"), response.read()
+    finally:
+        conn.close()
+
+
+def test_report_is_served(server):
+    status, content_type, body = post(server, {"Content-Length": str(len(PAYLOAD))}, PAYLOAD)
+    assert status == 200 and content_type == PPTX_CONTENT_TYPE
+    assert body.startswith(b"PK")
+
+
+def test_missing_content_length_is_411(server):
+    status, _, body = post(server, {})
+    assert status == 411
+    assert json.loads(body) == {"error": "Content-Length header required"}
+
+
+@pytest.mark.parametrize("length", ["abc", "-1", "1.5", ""])
+def test_invalid_content_length_is_400(server, length):
+    status, _, body = post(server, {"Content-Length": length})
+    assert status == 400
+    assert json.loads(body)["error"] == f"Invalid Content-Length: {length!r}"
+
+
+def test_body_over_the_limit_is_413_before_it_is_read(server):
+    # Only the headers are sent: the server must answer without waiting for the body
+    status, _, body = post(server, {"Content-Length": str(len(PAYLOAD) + 1)})
+    assert status == 413
+    assert json.loads(body)["error"] == f"Body of {len(PAYLOAD) + 1} bytes exceeds the limit of {len(PAYLOAD)}"
+
+
+def test_invalid_json_is_still_reported_as_such(server):
+    status, _, body = post(server, {"Content-Length": "5"}, b"{nope")
+    assert status == 400
+    assert json.loads(body)["error"].startswith("Invalid JSON: ")
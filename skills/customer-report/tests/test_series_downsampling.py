@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+from series_downsampling import DOWNSAMPLE_METHODS, calendar_buckets, downsample_apps, downsample_cpa, lttb_indices
+
+
+def monthly_series(months, first_year=2000):
+    rng = random.Random(months)
+    labels = [f"{first_year + i // 12}-{i % 12 + 1:02d}" for i in range(months)]
+    apps = [[label, rng.randint(0, 500), rng.randint(0, 200)] for label in labels]
+    cpa = [[label, round(rng.uniform(5, 80), 2), rng.randint(1, 300)] for label in labels]
+    return cpa, apps
+
+
+@pytest.mark.parametrize("method", DOWNSAMPLE_METHODS)
+@pytest.mark.parametrize("months", [1, 5, 13, 60, 26 * 12])
+@pytest.mark.parametrize("budget", [2, 3, 5, 12, 40])
+def test_downsampled_series_fit_the_budget(method, months, budget):
+    cpa, apps = monthly_series(months)
+    sampled_apps = downsample_apps(apps, budget, method)
+    sampled_cpa = downsample_cpa(cpa, budget, method, apps)
+    assert 0 < len(sampled_apps) <= budget and 0 < len(sampled_cpa) <= budget
+    if months <= budget:
+        assert sampled_apps == apps and sampled_cpa == cpa
+
+
+def test_calendar_gives_up_when_years_exceed_the_budget():
+    cpa, apps = monthly_series(26 * 12)
+    assert calendar_buckets([row[0] for row in apps], 5) is None
+    # Falls back to lttb, which keeps original points
+    assert downsample_apps(apps, 5, "calendar") == downsample_apps(apps, 5, "lttb")
+    assert len(calendar_buckets([row[0] for row in apps], 26)[1]) == 26
+
+
+@pytest.mark.parametrize("budget", [1, 2, 3, 7])
+def test_lttb_keeps_first_and_last_points(budget):
+    values = [random.Random(budget).random() for _ in range(50)]
+    indices = lttb_indices(values, budget)
+    assert len(indices) == budget
+    assert list(indices) == sorted(set(indices))
+    assert indices[0] == 0 and (budget == 1 or indices[-1] == 49)